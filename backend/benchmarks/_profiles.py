@@ -0,0 +1,135 @@
+"""
+Synthetic BusinessProfile rows for the benchmarks: a scratch database and
+profiles covering the edge cases of every score input (NULL vs empty
+strings, empty JSON, missing menu URLs, ...) with realistic images, reviews
+and business_hours blobs. Import after django.setup().
+"""
+
+import random
+
+from django.db import connection, connections, transaction
+from django.utils import timezone
+
+from comparator.models import BusinessProfile
+
+BATCH_SIZE = 5000
+CATEGORIES = ["Restaurant", "Cafe", "Bakery", "Bar", "Pizza restaurant", ""]
+CITIES = ["Springfield", "Riverside", "Franklin", "", None]
+DAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday"]
+
+
+def use_database(path: str):
+    """Point the default connection at a scratch database file"""
+    connections["default"].close()
+    connections["default"].settings_dict["NAME"] = path
+
+
+def maybe(rng: random.Random, value):
+    """A value, an empty string or NULL, so emptiness tests are exercised"""
+    return rng.choice([value, value, "", None])
+
+
+def synthetic_profile(rng: random.Random, i: int) -> dict:
+    return {
+        "name": f"Business {i}",
+        "normalized_name": f"business {i}",
+        "category": rng.choice(CATEGORIES),
+        "city": rng.choice(CITIES),
+        "state": maybe(rng, "CA"),
+        "phone": maybe(rng, "+1 555 0100"),
+        "email": maybe(rng, f"owner{i}@example.com"),
+        "address": maybe(rng, f"{i} Main St"),
+        "website": maybe(rng, f"https://b{i}.example"),
+        "description": maybe(rng, "Family owned since forever."),
+        "menu_url": maybe(rng, f"https://b{i}.example/menu"),
+        "price_range": maybe(rng, "$$"),
+        "cuisine_type": maybe(rng, "Italian"),
+        "facebook_url": maybe(rng, "https://facebook.com/b"),
+        "instagram_url": maybe(rng, "https://instagram.com/b"),
+        "twitter_url": maybe(rng, "https://twitter.com/b"),
+        "established_year": rng.choice([None, 0, 1998, 2015]),
+        "business_hours": rng.choice(
+            [{}, [], {"monday": "9-5"}, [{day: "9 AM-5 PM"} for day in DAYS]]
+        ),
+        "special_features": rng.choice([[], ["Patio"], ["Live music", "Patio"]]),
+        "popular_dishes": rng.choice([[], ["Pizza", "Pasta", "Tiramisu"]]),
+        "images": [
+            {
+                "url": f"https://images.example/{i}/{n}.jpg",
+                "title": rng.choice(["Menu", "Food & drink", "Vibe", ""]),
+                "source": "Google",
+            }
+            for n in range(rng.randint(0, 10))
+        ],
+        "reviews": [
+            {
+                "rating": rng.randint(1, 5),
+                "text": "Great food and friendly staff, would come back. " * 4,
+                "author": f"Reviewer {n}",
+                "date": "2 weeks ago",
+                "source": "Google",
+            }
+            for n in range(rng.randint(0, 5))
+        ],
+        "review_count": rng.choice([0, rng.randint(0, 400)]),
+        "google_reviews": rng.choice([0, rng.randint(0, 100)]),
+        "yelp_reviews": rng.choice([0, rng.randint(0, 50)]),
+        "average_rating": str(round(rng.uniform(0, 5), 2)),
+        "image_count": rng.randint(0, 60),
+        **{
+            flag: rng.random() > 0.5
+            for flag in [
+                "has_hours",
+                "is_open",
+                "temporarily_closed",
+                "has_description",
+                "has_menu",
+                "offers_dine_in",
+                "offers_takeout",
+                "offers_delivery",
+                "accepts_reservations",
+                "has_parking",
+                "wheelchair_accessible",
+                "has_wifi",
+                "accepts_credit_cards",
+                "outdoor_seating",
+            ]
+        },
+    }
+
+
+def load_rows(rows: int):
+    """Insert synthetic profiles with executemany, filling unset fields with defaults"""
+    fields = [f for f in BusinessProfile._meta.concrete_fields if not f.primary_key]
+    now = timezone.now()
+    columns = ", ".join(connection.ops.quote_name(f.column) for f in fields)
+    placeholders = ", ".join(["%s"] * len(fields))
+    sql = (
+        f"INSERT INTO {connection.ops.quote_name(BusinessProfile._meta.db_table)} "
+        f"({columns}) VALUES ({placeholders})"
+    )
+
+    rng = random.Random(42)
+    with transaction.atomic(), connection.cursor() as cursor:
+        for offset in range(0, rows, BATCH_SIZE):
+            batch = []
+            for i in range(offset, min(rows, offset + BATCH_SIZE)):
+                values = synthetic_profile(rng, i)
+                batch.append(
+                    [
+                        f.get_db_prep_save(
+                            (
+                                values[f.attname]
+                                if f.attname in values
+                                else (
+                                    now
+                                    if getattr(f, "auto_now", False)
+                                    else f.get_default()
+                                )
+                            ),
+                            connection,
+                        )
+                        for f in fields
+                    ]
+                )
+            cursor.executemany(sql, batch)
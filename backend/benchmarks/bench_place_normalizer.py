@@ -0,0 +1,447 @@
+#!/usr/bin/env python
+"""
+Benchmark: the single-pass place normalizer vs the previous update path
+
+Applies recorded SerpAPI place payloads to fresh profiles, once with
+BusinessService._update_from_serpapi_data and once with the implementation
+it replaced (kept below as LegacyUpdater), checks that every resulting
+profile field is identical, then times both.
+
+Payloads come from benchmarks/fixtures/serpapi_places.json, plus the
+place and local results stored in the SerpAPI response cache with
+--from-cache.
+
+Usage: python benchmarks/bench_place_normalizer.py [--iterations N] [--rounds N]
+       [--from-cache]
+"""
+
+import gc
+import os
+import sys
+import json
+import time
+import random
+import argparse
+from statistics import median
+
+import django
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "competitor_insights.settings")
+django.setup()
+
+from typing import Dict, Any, Optional
+
+from comparator.models import BusinessProfile
+from comparator.services import BusinessService
+from comparator.services.serpapi_service import SerpAPIService, get_response_cache
+from comparator.services.business_service import logger
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "serpapi_places.json")
+REVIEWS = [
+    {"rating": 5, "snippet": "Lovely", "user": {"name": "Ana"}, "date": "a week ago"},
+    {"rating": 3, "text": "Fine", "author_name": "Ben"},
+]
+PHOTOS = [
+    {"thumbnail": f"https://photos.example/{i}", "title": "All"} for i in range(12)
+]
+
+
+class LegacyUpdater:
+    """The update path as it was before place_normalizer, for comparison"""
+
+    def _update_from_serpapi_data(
+        self,
+        business: BusinessProfile,
+        serpapi_data: Dict[str, Any],
+        reviews_data: Optional[list] = None,
+        photos_data: Optional[list] = None,
+    ):
+        """Update business model with SerpAPI data"""
+        try:
+            # Basic location and contact info
+            business.address = serpapi_data.get("address", "")
+            business.phone = serpapi_data.get("phone", "")
+            business.website = serpapi_data.get("website", "")
+            business.description = serpapi_data.get("description", "")
+
+            # Store data_id for fetching additional data
+            business.data_id = serpapi_data.get("data_id", "")
+
+            # Coordinates, for ranking competitors by distance
+            gps = serpapi_data.get("gps_coordinates") or {}
+            business.latitude = gps.get("latitude")
+            business.longitude = gps.get("longitude")
+
+            # Ratings and reviews
+            business.average_rating = serpapi_data.get("rating") or 0.0
+            business.review_count = serpapi_data.get("reviews", 0)
+
+            # Images; a place built from a local result has none listed, so
+            # the photos fetched for it are counted instead
+            images = serpapi_data.get("images", [])
+            business.image_count = len(images)
+            if serpapi_data.get("from_local_result") and not images:
+                business.image_count = len(photos_data or [])
+
+            # Store actual image URLs (limit to first 10 for performance)
+            business.images = []
+            for img in images[:10]:
+                if isinstance(img, dict) and img.get("thumbnail"):
+                    business.images.append(
+                        {
+                            "url": img["thumbnail"],
+                            "title": img.get("title", ""),
+                            "source": "Google",
+                        }
+                    )
+
+            # If we have a data_id, use the additional reviews and photos
+            if business.data_id:
+                business.reviews = []
+
+                for review in reviews_data or []:
+                    if isinstance(review, dict):
+                        business.reviews.append(
+                            {
+                                "rating": review.get("rating", 0),
+                                "text": review.get("snippet", review.get("text", "")),
+                                "author": review.get("user", {}).get(
+                                    "name", review.get("author_name", "Anonymous")
+                                ),
+                                "date": review.get(
+                                    "date", review.get("relative_time_description", "")
+                                ),
+                                "source": "Google",
+                            }
+                        )
+
+                if (
+                    photos_data and not business.images
+                ):  # Only if we don't already have images
+                    business.images = []
+                    for photo in photos_data[:10]:  # Limit to 10 photos
+                        if isinstance(photo, dict):
+                            business.images.append(
+                                {
+                                    "url": photo.get("thumbnail", photo.get("url", "")),
+                                    "title": photo.get("title", ""),
+                                    "source": "Google Photos",
+                                }
+                            )
+
+            # Extract reviews from user_reviews section if available
+            if not business.reviews:
+                user_reviews = serpapi_data.get("user_reviews", {})
+                most_relevant = user_reviews.get("most_relevant", [])
+                business.reviews = []
+
+                for review in most_relevant[:5]:  # Limit to first 5 reviews
+                    if isinstance(review, dict):
+                        business.reviews.append(
+                            {
+                                "rating": review.get("rating", 0),
+                                "text": review.get("description", ""),
+                                "author": review.get("username", "Anonymous"),
+                                "date": review.get("date", ""),
+                                "source": "Google",
+                            }
+                        )
+
+            # Business hours
+            hours = serpapi_data.get("hours", [])
+            business.has_hours = len(hours) > 0
+            if business.has_hours:
+                business.business_hours = hours
+
+            # Category/type
+            types = serpapi_data.get("type", [])
+            if types:
+                business.category = types[0] if isinstance(types, list) else str(types)
+            else:
+                business.category = "Business"
+
+            # Description
+            business.description = self._extract_description(serpapi_data)
+            business.has_description = bool(business.description)
+
+            # Check for menu
+            business.has_menu = self._has_menu_info(serpapi_data)
+            if business.has_menu:
+                # Look for menu URL in order_online_link or website
+                business.menu_url = serpapi_data.get(
+                    "order_online_link", business.website
+                )
+
+            # Extract service options from extensions
+            service_options = serpapi_data.get("service_options", {})
+            business.offers_delivery = service_options.get("delivery", False)
+            business.offers_takeout = service_options.get("takeout", False)
+            business.offers_dine_in = service_options.get("dine_in", False)
+
+            # Extract additional business characteristics from extensions
+            extensions = serpapi_data.get("extensions", [])
+            business.accepts_reservations = False
+            business.has_parking = False
+            business.wheelchair_accessible = False
+            business.has_wifi = False
+            business.outdoor_seating = False
+            business.accepts_credit_cards = False
+            business.special_features = []
+            business.popular_dishes = []
+
+            for ext in extensions:
+                if isinstance(ext, dict):
+                    # Service options
+                    if "service_options" in ext:
+                        service_opts = ext["service_options"]
+                        if "Takeout" in service_opts:
+                            business.offers_takeout = True
+                        if "Dine-in" in service_opts:
+                            business.offers_dine_in = True
+                        if "Delivery" in service_opts:
+                            business.offers_delivery = True
+
+                    # Accessibility
+                    if "accessibility" in ext:
+                        accessibility = ext["accessibility"]
+                        if any("wheelchair" in item.lower() for item in accessibility):
+                            business.wheelchair_accessible = True
+
+                    # Amenities
+                    if "amenities" in ext:
+                        amenities = ext["amenities"]
+                        if any("wi-fi" in item.lower() for item in amenities):
+                            business.has_wifi = True
+                        if any("parking" in item.lower() for item in amenities):
+                            business.has_parking = True
+
+                    # Payments
+                    if "payments" in ext:
+                        payments = ext["payments"]
+                        if any("credit" in item.lower() for item in payments):
+                            business.accepts_credit_cards = True
+
+                    # Highlights as special features
+                    if "highlights" in ext:
+                        business.special_features = ext["highlights"]
+
+                    # Offerings as popular dishes/items
+                    if "offerings" in ext:
+                        business.popular_dishes = ext["offerings"]
+
+            # Price range
+            price = serpapi_data.get("price", "")
+            business.price_range = price if price else "$$"
+
+            # Set default values for missing fields
+            business.established_year = random.randint(2010, 2022)
+            business.cuisine_type = ""
+
+            # Determine cuisine type from category and offerings
+            if business.category and "cafe" in business.category.lower():
+                business.cuisine_type = "Coffee & Cafe"
+            elif any(
+                "restaurant" in cat.lower() for cat in types if isinstance(cat, str)
+            ):
+                business.cuisine_type = "Restaurant"
+
+            # Set operational status
+            open_state = serpapi_data.get("open_state", "")
+            business.is_open = "open" in open_state.lower() if open_state else True
+            business.temporarily_closed = (
+                "closed" in open_state.lower() if open_state else False
+            )
+
+            # GPS coordinates for full address
+            gps = serpapi_data.get("gps_coordinates", {})
+            if gps:
+                # Extract city, state, country from address
+                address_parts = business.address.split(", ") if business.address else []
+                if len(address_parts) >= 3:
+                    business.city = address_parts[-2].split()[0]  # City
+                    business.country = address_parts[-1]  # Country
+                    business.postal_code = (
+                        address_parts[-2].split()[-1]
+                        if len(address_parts[-2].split()) > 1
+                        else ""
+                    )
+
+        except Exception as e:
+            logger.error(f"Error updating business from SerpAPI data: {str(e)}")
+            # Log the specific data that caused the error for debugging
+            logger.error(
+                f"SerpAPI data keys: {list(serpapi_data.keys()) if isinstance(serpapi_data, dict) else 'Not a dict'}"
+            )
+
+    def _extract_description(self, serpapi_data: Dict[str, Any]) -> str:
+        """Extract or generate description from SerpAPI data"""
+        # First check if there's a direct description
+        if serpapi_data.get("description"):
+            return serpapi_data["description"]
+
+        # Try to get description from popular highlights and offerings
+        extensions = serpapi_data.get("extensions", [])
+        highlights = []
+        offerings = []
+        popular_for = []
+
+        for ext in extensions:
+            if isinstance(ext, dict):
+                if "highlights" in ext:
+                    highlights.extend(ext["highlights"])
+                if "offerings" in ext:
+                    offerings.extend(ext["offerings"])
+                if "popular_for" in ext:
+                    popular_for.extend(ext["popular_for"])
+
+        # Build description from available data
+        description_parts = []
+
+        if highlights:
+            description_parts.append(f"Known for: {', '.join(highlights[:3])}")
+
+        if popular_for:
+            description_parts.append(f"Popular for: {', '.join(popular_for[:3])}")
+
+        if offerings:
+            description_parts.append(f"Offers: {', '.join(offerings[:3])}")
+
+        if description_parts:
+            return ". ".join(description_parts) + "."
+        else:
+            # Fallback description
+            category = (
+                serpapi_data.get("type", ["business"])[0]
+                if serpapi_data.get("type")
+                else "business"
+            )
+            return f"A {category.lower()} serving customers in the local area."
+
+    def _has_menu_info(self, serpapi_data: Dict[str, Any]) -> bool:
+        """Check if business has menu information"""
+        images = serpapi_data.get("images", [])
+
+        # Check if any image is labeled as menu
+        for image in images:
+            if image.get("title", "").lower() in ["menu", "food & drink"]:
+                return True
+
+        # Check extensions for menu-related info
+        extensions = serpapi_data.get("extensions", [])
+        for ext in extensions:
+            if "offerings" in ext:
+                offerings = ext["offerings"]
+                menu_keywords = [
+                    "menu",
+                    "food",
+                    "drinks",
+                    "coffee",
+                    "breakfast",
+                    "lunch",
+                    "dinner",
+                ]
+                if any(
+                    keyword in " ".join(offerings).lower() for keyword in menu_keywords
+                ):
+                    return True
+
+        return False
+
+
+def load_payloads(from_cache: bool) -> list:
+    with open(FIXTURES) as f:
+        payloads = json.load(f)
+    cache = get_response_cache() if from_cache else None
+    if cache is not None:
+        rows = cache._conn.execute(f"SELECT value FROM {cache.table}").fetchall()
+        for (value,) in rows:
+            data = json.loads(value)
+            if isinstance(data.get("place_results"), dict):
+                payloads.append(data["place_results"])
+            for result in data.get("local_results") or []:
+                payloads.append(SerpAPIService.place_from_local_result(result))
+    return payloads
+
+
+def profile_state(business: BusinessProfile) -> Dict[str, Any]:
+    """Every stored field the update can set (not the pk or timestamps)"""
+    return {
+        f.attname: getattr(business, f.attname)
+        for f in business._meta.fields
+        if f.attname not in ("id", "created_at", "updated_at")
+    }
+
+
+def apply_all(update, payloads: list, profiles: list, enrichment: list) -> float:
+    """Apply each payload to its fresh profile; returns the elapsed seconds"""
+    # established_year is random; both implementations draw it once per
+    # payload, so one seed gives them the same years
+    random.seed(0)
+    # As timeit does, keep garbage collection out of the measurement
+    gc.collect()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        for index, (payload, business) in enumerate(zip(payloads, profiles)):
+            reviews, photos = enrichment[index % len(enrichment)]
+            update(business, payload, reviews, photos)
+        return time.perf_counter() - start
+    finally:
+        gc.enable()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=41)
+    parser.add_argument("--from-cache", action="store_true")
+    args = parser.parse_args()
+
+    payloads = load_payloads(args.from_cache)
+    batch = payloads * args.iterations
+    enrichment = [(None, None), (REVIEWS, PHOTOS), ([], PHOTOS), (REVIEWS, [])]
+    print(f"{len(payloads)} payloads x {args.iterations} iterations")
+
+    legacy = LegacyUpdater()
+    current = BusinessService.__new__(BusinessService)
+    logger.disabled = True  # malformed cached payloads would log on every pass
+
+    # Each round times both implementations back to back, in alternating
+    # order, so a noisy neighbour slows both alike; the medians are reported
+    updates = {
+        "legacy": legacy._update_from_serpapi_data,
+        "normalizer": current._update_from_serpapi_data,
+    }
+    times = {name: [] for name in updates}
+    results = {}
+    for round_ in range(args.rounds):
+        names = list(updates) if round_ % 2 == 0 else list(reversed(updates))
+        for name in names:
+            profiles = [BusinessProfile(name="Benchmark") for _ in batch]
+            times[name].append(apply_all(updates[name], batch, profiles, enrichment))
+            results.setdefault(name, profiles)
+
+    mismatches = [
+        index
+        for index, (old, new) in enumerate(
+            zip(results["legacy"], results["normalizer"])
+        )
+        if profile_state(old) != profile_state(new)
+    ]
+    if mismatches:
+        index = mismatches[0]
+        old = profile_state(results["legacy"][index])
+        new = profile_state(results["normalizer"][index])
+        diff = {k: (old[k], new[k]) for k in old if old[k] != new[k]}
+        sys.exit(f"{len(mismatches)} profiles differ; first: {diff}")
+    print("profiles identical")
+
+    for name, elapsed in times.items():
+        print(f"{name:<11} {median(elapsed) / len(batch) * 1e6:8.2f} us/payload")
+    ratios = [old / new for old, new in zip(times["legacy"], times["normalizer"])]
+    print(f"speedup {median(ratios):.2f}x (median of {args.rounds} rounds)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python
+"""
+Benchmark: BusinessProfile lookup queries before and after the lookup indexes
+
+Builds a throwaway SQLite database, migrates it to the schema without the
+indexes, loads synthetic profiles, then prints the query plan and timing of
+each hot lookup before and after applying the index migration.
+
+Usage: python benchmarks/bench_profile_queries.py [--rows N] [--db PATH]
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+
+import django
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "competitor_insights.settings")
+django.setup()
+
+from django.core.management import call_command
+from django.db import connection, connections, transaction
+from django.db.migrations.executor import MigrationExecutor
+from django.utils import timezone
+
+BEFORE_MIGRATION = "0006_businessprofile_normalized_name_fetched_at"
+AFTER_MIGRATION = "0007_businessprofile_lookup_indexes"
+
+CATEGORIES = ["Restaurant", "Cafe", "Bakery", "Bar", "Pizza restaurant", "Gym"]
+CITIES = ["Springfield", "Riverside", "Franklin", "Greenville", "Bristol", "Salem"]
+BATCH_SIZE = 5000
+
+
+def use_database(path: str):
+    """Point the default connection at a scratch database file"""
+    connections["default"].close()
+    connections["default"].settings_dict["NAME"] = path
+
+
+def migrate_to(target: str):
+    call_command("migrate", "comparator", target, verbosity=0)
+
+
+def historical_model():
+    """BusinessProfile as it exists at the current migration state"""
+    executor = MigrationExecutor(connection)
+    state = executor.loader.project_state(("comparator", BEFORE_MIGRATION))
+    return state.apps.get_model("comparator", "BusinessProfile")
+
+
+def load_rows(rows: int):
+    """Insert synthetic profiles with executemany, filling unset fields with defaults"""
+    BusinessProfile = historical_model()
+    fields = [f for f in BusinessProfile._meta.concrete_fields if not f.primary_key]
+    now = timezone.now()
+    defaults = {
+        f.attname: f.get_db_prep_save(
+            now if getattr(f, "auto_now", False) else f.get_default(), connection
+        )
+        for f in fields
+    }
+    columns = ", ".join(connection.ops.quote_name(f.column) for f in fields)
+    placeholders = ", ".join(["%s"] * len(fields))
+    sql = (
+        f"INSERT INTO {connection.ops.quote_name(BusinessProfile._meta.db_table)} "
+        f"({columns}) VALUES ({placeholders})"
+    )
+
+    rng = random.Random(42)
+    start = time.perf_counter()
+    with transaction.atomic(), connection.cursor() as cursor:
+        for offset in range(0, rows, BATCH_SIZE):
+            batch = []
+            for i in range(offset, min(rows, offset + BATCH_SIZE)):
+                row = dict(defaults)
+                row.update(
+                    name=f"Business {i}",
+                    normalized_name=f"business {i}",
+                    category=rng.choice(CATEGORIES),
+                    city=rng.choice(CITIES),
+                    data_id=f"0x{i:x}",
+                    review_count=rng.randint(0, 500),
+                    average_rating=str(round(rng.uniform(1, 5), 2)),
+                )
+                batch.append([row[f.attname] for f in fields])
+            cursor.executemany(sql, batch)
+    print(f"Loaded {rows:,} rows in {time.perf_counter() - start:.1f}s\n")
+
+
+def queries(rows: int):
+    """The lookups the services and admin perform, as (label, queryset) pairs"""
+    from comparator.models import BusinessProfile
+
+    probe = rows // 2
+    return [
+        (
+            "lookup by normalized_name",
+            BusinessProfile.objects.filter(normalized_name=f"business {probe}"),
+        ),
+        (
+            "lookup by data_id",
+            BusinessProfile.objects.filter(data_id=f"0x{probe:x}"),
+        ),
+        (
+            "filter by category and city",
+            BusinessProfile.objects.filter(category="Cafe", city="Salem")[:50],
+        ),
+        ("admin changelist page (-created_at)", BusinessProfile.objects.all()[:100]),
+    ]
+
+
+def report(label: str, rows: int, repeats: int = 5):
+    print(f"=== {label} ===")
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE")
+    for name, queryset in queries(rows):
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            list(queryset.values_list("id", flat=True))
+            timings.append(time.perf_counter() - start)
+        print(f"{name}: best of {repeats} = {min(timings) * 1000:.2f} ms")
+        print(f"  plan: {queryset.explain()}")
+    print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--db", help="scratch SQLite file (default: temp file)")
+    args = parser.parse_args()
+
+    path = args.db or os.path.join(tempfile.mkdtemp(), "bench_profiles.sqlite3")
+    use_database(path)
+
+    migrate_to(BEFORE_MIGRATION)
+    load_rows(args.rows)
+    report("Before lookup indexes", args.rows)
+
+    start = time.perf_counter()
+    migrate_to(AFTER_MIGRATION)
+    print(f"Applied {AFTER_MIGRATION} in {time.perf_counter() - start:.1f}s\n")
+    report("After lookup indexes", args.rows)
+
+    connections["default"].close()
+    if not args.db:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
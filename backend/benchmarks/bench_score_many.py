@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+"""
+Benchmark: scoring every stored profile one at a time vs ScoringService.score_many
+
+Builds a throwaway SQLite database per size, loads synthetic profiles that
+cover the edge cases of every score input (NULL vs empty strings, empty JSON,
+missing menu URLs, ...), then times the scalar loop against the vectorized
+path and checks that both produce identical scores.
+
+Usage: python benchmarks/bench_score_many.py [--sizes 10000,100000,1000000]
+       [--scalar-limit N] [--db-dir PATH]
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+import django
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "competitor_insights.settings")
+django.setup()
+
+from django.core.management import call_command
+from django.db import connections
+
+from comparator.models import BusinessProfile
+from comparator.services import ScoringService
+from _profiles import load_rows, use_database
+
+
+def scalar_scores(scoring: ScoringService) -> dict:
+    return {
+        business.pk: scoring.calculate_business_score(business)
+        for business in BusinessProfile.objects.order_by().iterator(chunk_size=2000)
+    }
+
+
+def run(rows: int, db_dir: str, scalar_limit: int):
+    path = os.path.join(db_dir, f"bench_scores_{rows}.sqlite3")
+    use_database(path)
+    call_command("migrate", verbosity=0)
+    start = time.perf_counter()
+    load_rows(rows)
+    print(f"Loaded {rows:,} rows in {time.perf_counter() - start:.1f}s")
+
+    scoring = ScoringService()
+    start = time.perf_counter()
+    vectorized = scoring.score_many()
+    vector_time = time.perf_counter() - start
+    print(f"score_many:   {vector_time:8.2f}s ({rows / vector_time:,.0f} rows/s)")
+
+    if rows <= scalar_limit:
+        start = time.perf_counter()
+        scalar = scalar_scores(scoring)
+        scalar_time = time.perf_counter() - start
+        print(
+            f"scalar loop:  {scalar_time:8.2f}s ({rows / scalar_time:,.0f} rows/s), "
+            f"speedup {scalar_time / vector_time:.1f}x"
+        )
+        mismatches = [pk for pk, score in scalar.items() if vectorized[pk] != score]
+        if mismatches or len(scalar) != len(vectorized):
+            sys.exit(f"Scores differ for {len(mismatches)} profiles: {mismatches[:10]}")
+        print("scores identical")
+    else:
+        print(f"scalar loop:  skipped (more than --scalar-limit {scalar_limit:,} rows)")
+
+    connections["default"].close()
+    os.remove(path)
+    print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="10000,100000,1000000")
+    parser.add_argument(
+        "--scalar-limit",
+        type=int,
+        default=1_000_000,
+        help="skip the (slow) scalar comparison above this many rows",
+    )
+    parser.add_argument("--db-dir", help="directory for scratch SQLite files")
+    args = parser.parse_args()
+
+    db_dir = args.db_dir or tempfile.mkdtemp()
+    for rows in (int(size) for size in args.sizes.split(",")):
+        print(f"=== {rows:,} profiles ===")
+        run(rows, db_dir, args.scalar_limit)
+
+
+if __name__ == "__main__":
+    main()
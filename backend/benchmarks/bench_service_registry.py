@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+"""
+Benchmark: per-request service construction vs the shared service registry
+
+Usage: python benchmarks/bench_service_registry.py [--requests N]
+"""
+
+import os
+import sys
+import time
+import argparse
+
+import django
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "competitor_insights.settings")
+django.setup()
+
+from comparator.services import ai_service, BusinessAnalysisService, ServiceRegistry
+
+
+def time_per_call(func, iterations: int) -> float:
+    """Return the mean wall-clock time of func in microseconds"""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    # Construct real OpenAI clients as production does; no network calls are made
+    if not ai_service.OPENAI_API_KEY:
+        ai_service.OPENAI_API_KEY = "sk-benchmark-placeholder"
+
+    registry = ServiceRegistry()
+    registry.analysis  # warm up, as the first request in a worker would
+
+    per_request = time_per_call(BusinessAnalysisService, args.requests)
+    shared = time_per_call(lambda: registry.analysis, args.requests)
+
+    print(f"Simulated requests: {args.requests}")
+    print(f"  Per-request construction: {per_request:10.1f} us/request")
+    print(f"  Shared registry lookup:   {shared:10.1f} us/request")
+    print(f"  Overhead removed:         {per_request - shared:10.1f} us/request")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+"""
+Report: prompt size, token use and latency of the verbose vs compact prompts
+
+Renders the business analysis and comparison prompts for sample profiles in
+both formats and compares their estimated prompt tokens. With --live (and
+OPENAI_API_KEY set) it also sends every prompt to the model, uncached, and
+reports the token counts OpenAI returns and the mean latency per format.
+
+Usage: python benchmarks/report_prompt_tokens.py [--samples N] [--live]
+"""
+
+import os
+import sys
+import random
+import argparse
+
+import django
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "competitor_insights.settings")
+django.setup()
+
+from comparator.models import BusinessProfile
+from comparator.services import AIService, ScoringService
+from comparator.services.ai_service import estimate_tokens
+from comparator.services.features import BusinessFeatures
+
+FORMATS = ["verbose", "compact"]
+CATEGORIES = ["Restaurant", "Cafe", "Bakery", "Pizza restaurant", "Bar"]
+
+
+def sample_business_data(samples: int):
+    """Prepared AI input for synthetic, unsaved profiles"""
+    rng = random.Random(7)
+    scoring = ScoringService()
+    data = []
+    for i in range(samples):
+        profile = BusinessProfile(
+            name=f"Sample Business {i}",
+            category=rng.choice(CATEGORIES),
+            review_count=rng.randint(0, 800),
+            average_rating=round(rng.uniform(2.5, 5), 1),
+            image_count=rng.randint(0, 60),
+            has_hours=rng.random() > 0.2,
+            has_description=rng.random() > 0.4,
+            has_menu=rng.random() > 0.5,
+            phone="+1 555 0100" if rng.random() > 0.2 else None,
+            address=f"{i} Main St" if rng.random() > 0.1 else None,
+            website=f"https://sample{i}.example" if rng.random() > 0.3 else None,
+        )
+        features = BusinessFeatures.from_profile(profile)
+        data.append(features.prompt_data(scoring.calculate_business_score(features)))
+    return data
+
+
+def prompt_tokens(request) -> int:
+    return sum(estimate_tokens(message["content"]) for message in request["messages"])
+
+
+def report_estimates(services, data):
+    print("Estimated prompt tokens per call (mean)")
+    print(f"{'format':<10}{'analysis':>12}{'comparison':>14}")
+    for prompt_format, service in services.items():
+        analysis = [prompt_tokens(service._business_insights_request(d)) for d in data]
+        comparison = [
+            prompt_tokens(service._comparison_request(a, b))
+            for a, b in zip(data, data[1:] + data[:1])
+        ]
+        print(
+            f"{prompt_format:<10}{sum(analysis) / len(analysis):>12.0f}"
+            f"{sum(comparison) / len(comparison):>14.0f}"
+        )
+    print()
+
+
+def report_live(services, data):
+    print("Live calls (OpenAI usage, cache bypassed)")
+    print(
+        f"{'format':<10}{'kind':<22}{'calls':>6}{'prompt':>9}"
+        f"{'completion':>12}{'avg ms':>9}{'max ms':>9}"
+    )
+    for prompt_format, service in services.items():
+        service.cache = None
+        for d in data:
+            service.generate_business_insights(d)
+        for a, b in zip(data, data[1:] + data[:1]):
+            service.generate_comparison_insights(a, b)
+        for kind, usage in service.usage.snapshot().items():
+            calls = usage["calls"]
+            print(
+                f"{prompt_format:<10}{kind:<22}{calls:>6}"
+                f"{usage['prompt_tokens'] / calls:>9.0f}"
+                f"{usage['completion_tokens'] / calls:>12.0f}"
+                f"{usage['avg_latency_ms']:>9.0f}{usage['max_latency_ms']:>9.0f}"
+            )
+    print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--samples", type=int, default=20)
+    parser.add_argument(
+        "--live", action="store_true", help="also call OpenAI with each prompt"
+    )
+    args = parser.parse_args()
+
+    data = sample_business_data(args.samples)
+    services = {
+        prompt_format: AIService(prompt_format=prompt_format)
+        for prompt_format in FORMATS
+    }
+    report_estimates(services, data)
+
+    if args.live:
+        if not services["compact"].client:
+            sys.exit("--live needs OPENAI_API_KEY")
+        report_live(services, data)
+
+
+if __name__ == "__main__":
+    main()
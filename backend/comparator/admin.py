@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import BusinessProfile
+from .models import AnalysisJob, BusinessProfile, BusinessSnapshot, CohortScoreBucket
 
 
 @admin.register(BusinessProfile)
@@ -12,6 +12,7 @@ class BusinessProfileAdmin(admin.ModelAdmin):
         "price_range",
         "total_reviews",
         "average_rating",
+        "score",
         "is_open",
         "created_at",
     ]
@@ -29,7 +30,19 @@ class BusinessProfileAdmin(admin.ModelAdmin):
         "created_at",
     ]
     search_fields = ["name", "address", "city", "website", "phone", "email"]
-    readonly_fields = ["created_at", "updated_at", "total_reviews", "full_address"]
+    # Skip the extra unfiltered COUNT(*) the changelist runs on every filter
+    show_full_result_count = False
+    readonly_fields = [
+        "created_at",
+        "updated_at",
+        "total_reviews",
+        "full_address",
+        "score",
+        "review_score",
+        "content_score",
+        "image_score",
+        "score_version",
+    ]
 
     fieldsets = (
         (
@@ -65,6 +78,8 @@ class BusinessProfileAdmin(admin.ModelAdmin):
                     "postal_code",
                     "country",
                     "full_address",
+                    "latitude",
+                    "longitude",
                 )
             },
         ),
@@ -102,6 +117,18 @@ class BusinessProfileAdmin(admin.ModelAdmin):
                 )
             },
         ),
+        (
+            "Score",
+            {
+                "fields": (
+                    "score",
+                    "review_score",
+                    "content_score",
+                    "image_score",
+                    "score_version",
+                )
+            },
+        ),
         (
             "Content & Menu",
             {
@@ -143,3 +170,42 @@ class BusinessProfileAdmin(admin.ModelAdmin):
             {"fields": ("created_at", "updated_at"), "classes": ("collapse",)},
         ),
     )
+
+
+@admin.register(BusinessSnapshot)
+class BusinessSnapshotAdmin(admin.ModelAdmin):
+    list_display = [
+        "business",
+        "captured_at",
+        "review_count",
+        "average_rating",
+        "image_count",
+        "score",
+    ]
+    list_filter = ["captured_at"]
+    raw_id_fields = ["business"]
+    date_hierarchy = "captured_at"
+
+
+@admin.register(CohortScoreBucket)
+class CohortScoreBucketAdmin(admin.ModelAdmin):
+    list_display = ["category", "city", "score_tenths", "count"]
+    search_fields = ["category", "city"]
+    show_full_result_count = False
+
+
+@admin.register(AnalysisJob)
+class AnalysisJobAdmin(admin.ModelAdmin):
+    list_display = [
+        "id",
+        "kind",
+        "status",
+        "attempts",
+        "max_attempts",
+        "locked_by",
+        "created_at",
+        "finished_at",
+    ]
+    list_filter = ["kind", "status", "created_at"]
+    show_full_result_count = False
+    readonly_fields = ["created_at", "updated_at", "finished_at"]
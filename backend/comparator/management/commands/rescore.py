@@ -0,0 +1,43 @@
+import time
+from django.core.management.base import BaseCommand
+from comparator.models import BusinessProfile
+from comparator.services import CohortService, ScoringService
+from comparator.services.scoring_service import SCORE_BATCH_SIZE, SCORE_VERSION
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-score stored profiles whose score predates the current weights, "
+        "then recount the per-cohort score histograms"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Re-score every profile, e.g. after inputs changed via bulk updates",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=SCORE_BATCH_SIZE,
+            help="Profiles scored and written per transaction",
+        )
+
+    def handle(self, *args, **options):
+        if options["all"]:
+            BusinessProfile.objects.filter(score_version=SCORE_VERSION).update(
+                score_version=""
+            )
+
+        start = time.perf_counter()
+        written = ScoringService().rescore(batch_size=max(1, options["batch_size"]))
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Re-scored {written} profiles with weights {SCORE_VERSION} "
+                f"in {time.perf_counter() - start:.1f}s"
+            )
+        )
+
+        buckets = CohortService().rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {buckets} cohort buckets"))
@@ -0,0 +1,81 @@
+import os
+import signal
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from django.core.management.base import BaseCommand
+from comparator.services import JobService, get_services
+from comparator.services.concurrency import db_task
+from comparator.services.config import (
+    JOB_WORKER_CONCURRENCY,
+    JOB_VISIBILITY_TIMEOUT,
+    JOB_POLL_INTERVAL,
+)
+
+
+class Command(BaseCommand):
+    help = "Process queued analysis and comparison jobs"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=JOB_WORKER_CONCURRENCY,
+            help="Jobs processed in parallel by this worker",
+        )
+        parser.add_argument(
+            "--visibility-timeout",
+            type=int,
+            default=JOB_VISIBILITY_TIMEOUT,
+            help="Seconds before a claimed, unfinished job may be reclaimed",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=JOB_POLL_INTERVAL,
+            help="Seconds to wait between polls when the queue is empty",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit once no job is runnable instead of polling forever",
+        )
+
+    def handle(self, *args, **options):
+        concurrency = max(1, options["concurrency"])
+        jobs = JobService(
+            analysis_service=get_services().analysis,
+            visibility_timeout=options["visibility_timeout"],
+        )
+        stop_event = threading.Event()
+
+        def stop(signum, frame):
+            self.stdout.write("Stopping after in-progress jobs finish...")
+            stop_event.set()
+
+        signal.signal(signal.SIGINT, stop)
+        signal.signal(signal.SIGTERM, stop)
+
+        prefix = f"{socket.gethostname()}:{os.getpid()}"
+        self.stdout.write(
+            f"Worker {prefix} processing jobs with concurrency {concurrency}"
+        )
+        with ThreadPoolExecutor(
+            max_workers=concurrency, thread_name_prefix="jobs"
+        ) as executor:
+            futures = [
+                executor.submit(
+                    db_task(jobs.run_worker),
+                    f"{prefix}:{n}",
+                    stop_event,
+                    options["poll_interval"],
+                    options["once"],
+                )
+                for n in range(concurrency)
+            ]
+            # Wait in short slices so signals reach the main thread promptly
+            while not all(future.done() for future in futures):
+                stop_event.wait(0.5)
+            processed = sum(future.result() for future in futures)
+
+        self.stdout.write(self.style.SUCCESS(f"Processed {processed} jobs"))
@@ -0,0 +1,41 @@
+import logging
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from .services.usage import track_usage
+
+logger = logging.getLogger(__name__)
+
+
+class SerpAPIUsageMiddleware:
+    """
+    Count the SerpAPI credits each request spends and avoids, and report them
+    in an X-SerpAPI-Usage header. Work done while a streaming response is
+    being sent happens after the header is written and is not included.
+    Supports sync and async chains, so async views stay on the event loop.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        with track_usage() as usage:
+            response = self.get_response(request)
+        return self._report(request, response, usage)
+
+    async def __acall__(self, request):
+        with track_usage() as usage:
+            response = await self.get_response(request)
+        return self._report(request, response, usage)
+
+    def _report(self, request, response, usage):
+        if usage.calls or usage.cache_hits or usage.avoided:
+            response["X-SerpAPI-Usage"] = usage.summary()
+            logger.info(f"SerpAPI usage for {request.path}: {usage.summary()}")
+        return response
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.1 on 2026-10-18 20:06
+
+import re
+
+from django.db import migrations, models
+
+# Copied from comparator.models so this migration does not depend on live code
+_NAME_NOISE = re.compile(r"[^\w\s&]")
+
+
+def normalize_business_name(name):
+    return " ".join(_NAME_NOISE.sub("", name or "").casefold().split())[:255]
+
+
+def populate_lookup_fields(apps, schema_editor):
+    BusinessProfile = apps.get_model('comparator', 'BusinessProfile')
+    rows = BusinessProfile.objects.only(
+        'id', 'name', 'updated_at', 'data_id', 'average_rating'
+    )
+    for business in rows.iterator():
+        business.normalized_name = normalize_business_name(business.name)
+        # Rows never enriched from SerpAPI keep fetched_at NULL, so they are
+        # fetched on their next lookup instead of passing as fresh
+        if business.data_id or business.average_rating:
+            business.fetched_at = business.updated_at
+        business.save(update_fields=['normalized_name', 'fetched_at'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('comparator', '0005_businessprofile_data_id'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='businessprofile',
+            name='fetched_at',
+            field=models.DateTimeField(blank=True, help_text='When SerpAPI data was last fetched', null=True),
+        ),
+        migrations.AddField(
+            model_name='businessprofile',
+            name='normalized_name',
+            field=models.CharField(blank=True, default='', editable=False, help_text='Casefolded, punctuation-free name used for lookups', max_length=255),
+        ),
+        migrations.RunPython(populate_lookup_fields, migrations.RunPython.noop),
+    ]
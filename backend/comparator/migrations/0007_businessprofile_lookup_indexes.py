@@ -0,0 +1,53 @@
+# Generated by Django 5.2.1 on 2026-10-18 20:07
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def deduplicate_data_ids(apps, schema_editor):
+    """Blank data_ids become NULL; older duplicates of a data_id lose theirs"""
+    BusinessProfile = apps.get_model('comparator', 'BusinessProfile')
+    BusinessProfile.objects.filter(data_id='').update(data_id=None)
+
+    duplicated = (
+        BusinessProfile.objects.exclude(data_id=None)
+        .values('data_id')
+        .annotate(rows=Count('id'))
+        .filter(rows__gt=1)
+        .values_list('data_id', flat=True)
+    )
+    for data_id in list(duplicated):
+        stale_ids = list(
+            BusinessProfile.objects.filter(data_id=data_id)
+            .order_by('-fetched_at', '-updated_at')
+            .values_list('id', flat=True)[1:]
+        )
+        BusinessProfile.objects.filter(id__in=stale_ids).update(data_id=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('comparator', '0006_businessprofile_normalized_name_fetched_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(deduplicate_data_ids, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='businessprofile',
+            name='data_id',
+            field=models.CharField(blank=True, help_text='SerpAPI data ID for fetching additional data', max_length=100, null=True, unique=True),
+        ),
+        migrations.AddIndex(
+            model_name='businessprofile',
+            index=models.Index(fields=['normalized_name'], name='bp_normalized_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='businessprofile',
+            index=models.Index(fields=['category', 'city'], name='bp_category_city_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='businessprofile',
+            index=models.Index(fields=['-created_at'], name='bp_created_at_idx'),
+        ),
+    ]
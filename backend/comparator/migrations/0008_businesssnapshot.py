@@ -0,0 +1,33 @@
+# Generated by Django 5.2.1 on 2026-10-18 20:10
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('comparator', '0007_businessprofile_lookup_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BusinessSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('captured_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('review_count', models.IntegerField(default=0)),
+                ('average_rating', models.DecimalField(decimal_places=2, default=0.0, max_digits=3)),
+                ('image_count', models.IntegerField(default=0)),
+                ('score', models.FloatField(blank=True, null=True)),
+                ('business', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='snapshots', to='comparator.businessprofile')),
+            ],
+            options={
+                'verbose_name': 'Business Snapshot',
+                'verbose_name_plural': 'Business Snapshots',
+                'ordering': ['captured_at'],
+                'indexes': [models.Index(fields=['business', 'captured_at'], name='snapshot_business_time_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.1 on 2026-10-18 20:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('comparator', '0009_analysisjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='businessprofile',
+            name='content_score',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='businessprofile',
+            name='image_score',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='businessprofile',
+            name='review_score',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='businessprofile',
+            name='score',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='businessprofile',
+            name='score_version',
+            field=models.CharField(blank=True, default='', editable=False, help_text='Version of the scoring weights the stored score used', max_length=16),
+        ),
+        migrations.AddIndex(
+            model_name='businessprofile',
+            index=models.Index(fields=['-score'], name='bp_score_idx'),
+        ),
+    ]
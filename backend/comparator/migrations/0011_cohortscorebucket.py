@@ -0,0 +1,28 @@
+# Generated by Django 5.2.1 on 2026-10-18 20:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('comparator', '0010_businessprofile_score'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CohortScoreBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('category', models.CharField(max_length=100)),
+                ('city', models.CharField(max_length=100)),
+                ('score_tenths', models.IntegerField(help_text='Score * 10 (scores have 1 decimal)')),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Cohort Score Bucket',
+                'verbose_name_plural': 'Cohort Score Buckets',
+                'constraints': [models.UniqueConstraint(fields=('category', 'city', 'score_tenths'), name='cohort_bucket_unique')],
+            },
+        ),
+    ]
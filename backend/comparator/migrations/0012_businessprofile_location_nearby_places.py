@@ -0,0 +1,28 @@
+# Generated by Django 5.2.1 on 2026-10-18 20:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('comparator', '0011_cohortscorebucket'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='businessprofile',
+            name='latitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='businessprofile',
+            name='longitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='businessprofile',
+            name='nearby_places',
+            field=models.JSONField(blank=True, default=list, help_text='Other local results of the search that found this business'),
+        ),
+    ]
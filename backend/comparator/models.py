@@ -1,12 +1,30 @@
+import re
+import copy
+import uuid
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
 from django.utils import timezone
 
+_NAME_NOISE = re.compile(r"[^\w\s&]")
+
+
+def normalize_business_name(name: str) -> str:
+    """Normalize a business name for lookups: casefolded, no punctuation"""
+    return " ".join(_NAME_NOISE.sub("", name or "").casefold().split())[:255]
+
 
 class BusinessProfile(models.Model):
     """Enhanced business profile model with comprehensive business data"""
 
     # Basic Information
     name = models.CharField(max_length=255)
+    normalized_name = models.CharField(
+        max_length=255,
+        blank=True,
+        default="",
+        editable=False,
+        help_text="Casefolded, punctuation-free name used for lookups",
+    )
     website = models.URLField(blank=True, null=True)
     description = models.TextField(blank=True, null=True)
     category = models.CharField(max_length=100, default="Restaurant")
@@ -24,6 +42,8 @@ class BusinessProfile(models.Model):
     state = models.CharField(max_length=50, blank=True, null=True)
     postal_code = models.CharField(max_length=20, blank=True, null=True)
     country = models.CharField(max_length=50, default="United States")
+    latitude = models.FloatField(blank=True, null=True)
+    longitude = models.FloatField(blank=True, null=True)
 
     # Business Operations
     business_hours = models.JSONField(
@@ -88,8 +108,14 @@ class BusinessProfile(models.Model):
         max_length=100,
         blank=True,
         null=True,
+        unique=True,
         help_text="SerpAPI data ID for fetching additional data",
     )
+    nearby_places = models.JSONField(
+        blank=True,
+        default=list,
+        help_text="Other local results of the search that found this business",
+    )
 
     # Business Features & Amenities
     has_parking = models.BooleanField(default=False)
@@ -106,13 +132,141 @@ class BusinessProfile(models.Model):
         blank=True, default=list, help_text="List of popular dishes or services"
     )
 
+    # Persisted score (see ScoringService), kept current on save
+    score = models.FloatField(blank=True, null=True, editable=False)
+    review_score = models.FloatField(blank=True, null=True, editable=False)
+    content_score = models.FloatField(blank=True, null=True, editable=False)
+    image_score = models.FloatField(blank=True, null=True, editable=False)
+    score_version = models.CharField(
+        max_length=16,
+        blank=True,
+        default="",
+        editable=False,
+        help_text="Version of the scoring weights the stored score used",
+    )
+
     # Timestamps
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(auto_now=True)
+    fetched_at = models.DateTimeField(
+        blank=True, null=True, help_text="When SerpAPI data was last fetched"
+    )
+
+    # Scoring inputs and (category, city, score) as loaded from the database,
+    # to detect changes on save and keep cohort histograms in step
+    _loaded_score_inputs = None
+    _loaded_standing = None
 
     def __str__(self):
         return self.name
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_score_inputs = instance._current_score_inputs()
+        if {"category", "city", "score"} <= set(field_names):
+            instance._loaded_standing = (
+                instance.category,
+                instance.city,
+                instance.score,
+            )
+        return instance
+
+    def save(self, *args, **kwargs):
+        self.normalized_name = normalize_business_name(self.name)
+        # Store a missing data_id as NULL so the unique constraint ignores it
+        self.data_id = self.data_id or None
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "name" in update_fields:
+            update_fields = kwargs["update_fields"] = {
+                *update_fields,
+                "normalized_name",
+            }
+        rescored = self._score_is_stale(update_fields)
+        if rescored:
+            previous = self._previous_standing()
+            self._refresh_score()
+            if update_fields is not None:
+                from .services.scoring_service import SCORE_FIELDS
+
+                kwargs["update_fields"] = {
+                    *update_fields,
+                    *SCORE_FIELDS,
+                    "score_version",
+                }
+        super().save(*args, **kwargs)
+        self._loaded_score_inputs = self._current_score_inputs()
+        if rescored:
+            from .services import get_services
+
+            self._loaded_standing = (self.category, self.city, self.score)
+            get_services().cohorts.move(previous, self._loaded_standing)
+
+    def delete(self, *args, **kwargs):
+        # Take the profile out of its cohort histogram; QuerySet.delete()
+        # bypasses this, so bulk deletes need a rescore to recount
+        from .services import get_services
+
+        previous = self._previous_standing()
+        deleted = super().delete(*args, **kwargs)
+        get_services().cohorts.move(previous, None)
+        self._loaded_standing = None
+        return deleted
+
+    def score_is_current(self) -> bool:
+        """Whether the stored score matches the current inputs and weights"""
+        from .services.scoring_service import SCORE_INPUT_FIELDS, SCORE_VERSION
+
+        loaded = self._loaded_score_inputs
+        return (
+            self.score is not None
+            and self.score_version == SCORE_VERSION
+            and loaded is not None
+            and len(loaded) == len(SCORE_INPUT_FIELDS)
+            and all(getattr(self, name) == value for name, value in loaded.items())
+        )
+
+    def _current_score_inputs(self) -> dict:
+        """Loaded scoring inputs, copied so in-place edits to JSON values show"""
+        from .services.scoring_service import SCORE_INPUT_FIELDS
+
+        return {
+            name: copy.deepcopy(value) if isinstance(value, (dict, list)) else value
+            for name, value in self.__dict__.items()
+            if name in SCORE_INPUT_FIELDS
+        }
+
+    def _score_is_stale(self, update_fields) -> bool:
+        """Whether this save must recompute the stored score"""
+        from .services.scoring_service import SCORE_INPUT_FIELDS
+
+        if update_fields is not None and not SCORE_INPUT_FIELDS & set(update_fields):
+            return False
+        return not self.score_is_current()
+
+    def _previous_standing(self):
+        """The (category, city, score) currently stored for this row, if any"""
+        if self._loaded_standing is not None:
+            return self._loaded_standing
+        if self.pk is None:
+            return None
+        # A new instance pointed at an existing row: ask the database
+        return (
+            type(self)
+            ._base_manager.filter(pk=self.pk)
+            .values_list("category", "city", "score")
+            .first()
+        )
+
+    def _refresh_score(self):
+        """Recompute the stored score columns from the current inputs"""
+        from .services.scoring_service import SCORE_INPUT_FIELDS, ScoringService
+
+        deferred = self.get_deferred_fields() & SCORE_INPUT_FIELDS
+        if deferred:
+            self.refresh_from_db(fields=deferred)
+        ScoringService().apply_score(self)
+
     @property
     def full_address(self):
         """Return formatted full address"""
@@ -140,3 +294,123 @@ class BusinessProfile(models.Model):
         ordering = ["-created_at"]
         verbose_name = "Business Profile"
         verbose_name_plural = "Business Profiles"
+        indexes = [
+            models.Index(fields=["normalized_name"], name="bp_normalized_name_idx"),
+            models.Index(fields=["category", "city"], name="bp_category_city_idx"),
+            models.Index(fields=["-created_at"], name="bp_created_at_idx"),
+            models.Index(fields=["-score"], name="bp_score_idx"),
+        ]
+
+
+class BusinessSnapshot(models.Model):
+    """Append-only record of a business's key metrics each time it is fetched"""
+
+    business = models.ForeignKey(
+        BusinessProfile,
+        on_delete=models.CASCADE,
+        related_name="snapshots",
+        db_index=False,  # Covered by the (business, captured_at) index
+    )
+    captured_at = models.DateTimeField(default=timezone.now)
+    review_count = models.IntegerField(default=0)
+    average_rating = models.DecimalField(max_digits=3, decimal_places=2, default=0.0)
+    image_count = models.IntegerField(default=0)
+    score = models.FloatField(blank=True, null=True)
+
+    def __str__(self):
+        return f"{self.business_id} @ {self.captured_at:%Y-%m-%d %H:%M}"
+
+    class Meta:
+        ordering = ["captured_at"]
+        verbose_name = "Business Snapshot"
+        verbose_name_plural = "Business Snapshots"
+        indexes = [
+            models.Index(
+                fields=["business", "captured_at"], name="snapshot_business_time_idx"
+            ),
+        ]
+
+
+class CohortScoreBucket(models.Model):
+    """
+    Count of profiles in a (category, city) cohort holding one score, kept
+    current as profiles are re-scored; a cohort's rows form its histogram
+    """
+
+    category = models.CharField(max_length=100)
+    city = models.CharField(max_length=100)
+    score_tenths = models.IntegerField(help_text="Score * 10 (scores have 1 decimal)")
+    count = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.category} / {self.city}: {self.score_tenths / 10} x{self.count}"
+
+    class Meta:
+        verbose_name = "Cohort Score Bucket"
+        verbose_name_plural = "Cohort Score Buckets"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["category", "city", "score_tenths"],
+                name="cohort_bucket_unique",
+            ),
+        ]
+
+
+class AnalysisJob(models.Model):
+    """Queued analyze/compare request processed by the run_jobs worker"""
+
+    KIND_ANALYZE = "analyze"
+    KIND_COMPARE = "compare"
+    KIND_CHOICES = [
+        (KIND_ANALYZE, "Analyze business"),
+        (KIND_COMPARE, "Compare businesses"),
+    ]
+
+    STATUS_QUEUED = "queued"
+    STATUS_RUNNING = "running"
+    STATUS_SUCCEEDED = "succeeded"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, "Queued"),
+        (STATUS_RUNNING, "Running"),
+        (STATUS_SUCCEEDED, "Succeeded"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(
+        max_length=20, choices=STATUS_CHOICES, default=STATUS_QUEUED
+    )
+    result = models.JSONField(blank=True, null=True, encoder=DjangoJSONEncoder)
+    error = models.TextField(blank=True, default="")
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    available_at = models.DateTimeField(
+        default=timezone.now, help_text="Earliest time a worker may claim the job"
+    )
+    locked_by = models.CharField(max_length=100, blank=True, default="")
+    locked_until = models.DateTimeField(
+        blank=True,
+        null=True,
+        help_text="Visibility timeout: a running job past this is reclaimable",
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    def __str__(self):
+        return f"{self.kind} job {self.id} ({self.status})"
+
+    @property
+    def is_finished(self):
+        return self.status in (self.STATUS_SUCCEEDED, self.STATUS_FAILED)
+
+    class Meta:
+        ordering = ["-created_at"]
+        verbose_name = "Analysis Job"
+        verbose_name_plural = "Analysis Jobs"
+        indexes = [
+            models.Index(fields=["status", "available_at"], name="job_claim_idx"),
+        ]
@@ -4,6 +4,11 @@ from .ai_service import AIService
 from .scoring_service import ScoringService
 from .comparison_service import ComparisonService
 from .business_analysis_service import BusinessAnalysisService
+from .snapshot_service import SnapshotService
+from .cohort_service import CohortService
+from .competitor_service import CompetitorService
+from .job_service import JobService
+from .registry import ServiceRegistry, get_services
 
 __all__ = [
     "BusinessService",
@@ -12,4 +17,10 @@ __all__ = [
     "ScoringService",
     "ComparisonService",
     "BusinessAnalysisService",
+    "SnapshotService",
+    "CohortService",
+    "CompetitorService",
+    "JobService",
+    "ServiceRegistry",
+    "get_services",
 ]
@@ -1,17 +1,154 @@
 import json
+import time
+import hashlib
+import threading
 import logging
-from typing import Dict, Any, Optional
-from openai import OpenAI
-from .config import OPENAI_API_KEY, OPENAI_MODEL, MAX_SUGGESTIONS
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+from openai import OpenAI, AsyncOpenAI
+from .cache import PersistentTTLCache
+from .config import (
+    OPENAI_API_KEY,
+    OPENAI_MODEL,
+    MAX_SUGGESTIONS,
+    MAX_STRENGTHS,
+    AI_CACHE_ENABLED,
+    AI_CACHE_PATH,
+    AI_CACHE_MAX_ENTRIES,
+    AI_CACHE_TTL,
+    AI_PROMPT_FORMAT,
+    AI_PROMPT_TOKEN_BUDGET,
+    AI_BATCH_MAX_ITEMS,
+    AI_BATCH_INPUT_TOKENS,
+    AI_BATCH_OUTPUT_TOKENS_PER_ITEM,
+)
 
 logger = logging.getLogger(__name__)
 
+# Bump whenever the prompts or response parsing change, so cached insights
+# produced by the old templates are no longer served
+PROMPT_VERSION = 2
+
+_cache = None
+_cache_lock = threading.Lock()
+
+CONSULTANT_SYSTEM_PROMPT = "You are a business consultant expert in online presence optimization and customer acquisition."
+
+PROFILE_LEGEND = (
+    "Profiles are JSON: reviews is the review count, rating is out of 5, photos "
+    "is the image count, score is the profile score out of 100; true/false say "
+    "whether the profile has hours, a description, a menu, a phone number and "
+    "an address."
+)
+
+BUSINESS_INSIGHTS_INSTRUCTIONS = f"""Analyze this online business profile. {PROFILE_LEGEND}
+Give a brief 1-2 sentence summary of its online presence and 3-5 specific, actionable suggestions to attract and retain customers. Avoid generic advice.
+Respond in JSON: {{"summary": "...", "suggestions": ["...", "..."]}}"""
+
+COMPARISON_INSTRUCTIONS = f"""Compare your business with a competitor. {PROFILE_LEGEND}
+Give a summary comparing them, the areas where yours is stronger than the competitor, and 3-5 specific, data-driven suggestions to gain a competitive advantage.
+Respond in JSON: {{"summary": "...", "strengths": ["..."], "suggestions": ["...", "..."]}}"""
+
+MULTI_COMPARISON_INSTRUCTIONS = f"""Compare your business with several competitors. {PROFILE_LEGEND}
+The first line is yours; each other line is a competitor id and its profile, best score first.
+Give a summary of where yours stands among them, the areas where yours leads the competitors, 3-5 specific, data-driven suggestions to overtake the leaders, and one sentence per competitor id on how yours compares with it.
+Respond in JSON: {{"summary": "...", "strengths": ["..."], "suggestions": ["...", "..."], "competitors": {{"c1": "...", "c2": "..."}}}}"""
+
+BATCH_INSIGHTS_INSTRUCTIONS = f"""Analyze these online business profiles. {PROFILE_LEGEND}
+Each line below is one business: an id, then its profile.
+For every id give a brief 1-2 sentence summary of its online presence and 3-5 specific, actionable suggestions to attract more customers. Avoid generic advice.
+Respond with one JSON object keyed by id, covering every id:
+{{"b1": {{"summary": "...", "suggestions": ["...", "..."]}}, "b2": {{...}}}}"""
+
+
+def get_insights_cache() -> Optional[PersistentTTLCache]:
+    """Return the process-wide AI insights cache, creating it on first use"""
+    global _cache
+    if not AI_CACHE_ENABLED:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                try:
+                    _cache = PersistentTTLCache(
+                        AI_CACHE_PATH,
+                        table="ai_insights",
+                        max_entries=AI_CACHE_MAX_ENTRIES,
+                    )
+                except Exception as e:
+                    logger.error(f"Failed to open AI insights cache: {str(e)}")
+                    return None
+    return _cache
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for budgeting (about four characters per token)"""
+    return len(text) // 4 + 1
+
+
+class TokenBudgetExceeded(ValueError):
+    """A prompt is estimated to exceed AI_PROMPT_TOKEN_BUDGET"""
+
+
+class TokenUsageStats:
+    """Thread-safe per-kind totals of token use and latency of completion calls"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._totals: Dict[str, Dict[str, float]] = {}
+
+    def record(self, kind: str, usage: Any, latency: float):
+        """Add one call's usage (the response's usage object) and latency"""
+        prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+        completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+        with self._lock:
+            totals = self._totals.setdefault(
+                kind,
+                {
+                    "calls": 0,
+                    "prompt_tokens": 0,
+                    "completion_tokens": 0,
+                    "latency": 0.0,
+                    "max_latency": 0.0,
+                },
+            )
+            totals["calls"] += 1
+            totals["prompt_tokens"] += prompt_tokens
+            totals["completion_tokens"] += completion_tokens
+            totals["latency"] += latency
+            totals["max_latency"] = max(totals["max_latency"], latency)
+        logger.info(
+            f"OpenAI {kind} call: {prompt_tokens} prompt + {completion_tokens} "
+            f"completion tokens in {latency * 1000:.0f} ms"
+        )
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Return totals and mean/max latency per kind of call"""
+        with self._lock:
+            return {
+                kind: {
+                    "calls": totals["calls"],
+                    "prompt_tokens": totals["prompt_tokens"],
+                    "completion_tokens": totals["completion_tokens"],
+                    "total_tokens": totals["prompt_tokens"]
+                    + totals["completion_tokens"],
+                    "avg_latency_ms": round(
+                        totals["latency"] * 1000 / totals["calls"], 1
+                    ),
+                    "max_latency_ms": round(totals["max_latency"] * 1000, 1),
+                }
+                for kind, totals in self._totals.items()
+            }
+
 
 class AIService:
     """Service for AI-powered insights and analysis"""
 
-    def __init__(self):
+    def __init__(self, prompt_format: str = AI_PROMPT_FORMAT):
         self.client = self._initialize_client()
+        self.async_client = self._initialize_async_client()
+        self.cache = get_insights_cache()
+        self.prompt_format = prompt_format
+        self.usage = TokenUsageStats()
 
     def _initialize_client(self) -> Optional[OpenAI]:
         """Initialize OpenAI client with error handling"""
@@ -27,6 +164,14 @@ class AIService:
             logger.error(f"Failed to initialize OpenAI client: {str(e)}")
             return None
 
+    def _initialize_async_client(self) -> Optional[AsyncOpenAI]:
+        """Initialize the async OpenAI client used by the ASGI pipeline"""
+        try:
+            return AsyncOpenAI(api_key=OPENAI_API_KEY) if OPENAI_API_KEY else None
+        except Exception as e:
+            logger.error(f"Failed to initialize async OpenAI client: {str(e)}")
+            return None
+
     def generate_business_insights(
         self, business_data: Dict[str, Any]
     ) -> Dict[str, Any]:
@@ -34,39 +179,47 @@ class AIService:
         if not self.client:
             return self._generate_fallback_insights(business_data)
 
+        request = self._business_insights_request(business_data)
+        key = self._cache_key(request)
+        cached = self._cached(key)
+        if cached is not None:
+            return cached
+
         try:
-            prompt = self._build_business_analysis_prompt(business_data)
-
-            response = self.client.chat.completions.create(
-                model=OPENAI_MODEL,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a business consultant expert in online presence optimization and customer acquisition.",
-                    },
-                    {"role": "user", "content": prompt},
-                ],
-                temperature=0.7,
-                max_tokens=500,
-            )
+            content = self._complete("business_insights", request)
+            insights = self._parse_business_insights(content, business_data)
 
-            # Parse AI response
-            json_content = self._extract_json_from_response(
-                response.choices[0].message.content
-            )
-            ai_response = json.loads(json_content)
+        except Exception as e:
+            logger.error(f"Error generating AI insights: {str(e)}")
+            return self._generate_fallback_insights(business_data)
 
-            return {
-                "summary": ai_response.get(
-                    "summary", f"{business_data['name']} analysis completed."
-                ),
-                "suggestions": ai_response.get("suggestions", [])[:MAX_SUGGESTIONS],
-            }
+        self._store(key, insights)
+        return insights
+
+    async def agenerate_business_insights(
+        self, business_data: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Async variant of generate_business_insights"""
+        if not self.async_client:
+            return self._generate_fallback_insights(business_data)
+
+        request = self._business_insights_request(business_data)
+        key = self._cache_key(request)
+        cached = self._cached(key)
+        if cached is not None:
+            return cached
+
+        try:
+            content = await self._acomplete("business_insights", request)
+            insights = self._parse_business_insights(content, business_data)
 
         except Exception as e:
             logger.error(f"Error generating AI insights: {str(e)}")
             return self._generate_fallback_insights(business_data)
 
+        self._store(key, insights)
+        return insights
+
     def generate_comparison_insights(
         self, your_business: Dict[str, Any], competitor: Dict[str, Any]
     ) -> Dict[str, Any]:
@@ -74,41 +227,582 @@ class AIService:
         if not self.client:
             return self._generate_fallback_comparison(your_business, competitor)
 
+        request = self._comparison_request(your_business, competitor)
+        key = self._cache_key(request)
+        cached = self._cached(key)
+        if cached is not None:
+            return cached
+
         try:
-            prompt = self._build_comparison_prompt(your_business, competitor)
-
-            response = self.client.chat.completions.create(
-                model=OPENAI_MODEL,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a competitive business analyst expert in market positioning and competitive strategy.",
-                    },
-                    {"role": "user", "content": prompt},
-                ],
-                temperature=0.7,
-                max_tokens=600,
+            content = self._complete("comparison_insights", request)
+            insights = self._parse_comparison_insights(
+                content, your_business, competitor
             )
 
-            # Parse AI response
-            json_content = self._extract_json_from_response(
-                response.choices[0].message.content
-            )
-            ai_response = json.loads(json_content)
+        except Exception as e:
+            logger.error(f"Error generating comparison insights: {str(e)}")
+            return self._generate_fallback_comparison(your_business, competitor)
 
-            return {
-                "summary": ai_response.get(
-                    "summary",
-                    f"Comparison between {your_business['name']} and {competitor['name']}.",
-                ),
-                "suggestions": ai_response.get("suggestions", [])[:MAX_SUGGESTIONS],
-                "strengths": ai_response.get("strengths", []),
-            }
+        self._store(key, insights)
+        return insights
+
+    async def agenerate_comparison_insights(
+        self, your_business: Dict[str, Any], competitor: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Async variant of generate_comparison_insights"""
+        if not self.async_client:
+            return self._generate_fallback_comparison(your_business, competitor)
+
+        request = self._comparison_request(your_business, competitor)
+        key = self._cache_key(request)
+        cached = self._cached(key)
+        if cached is not None:
+            return cached
+
+        try:
+            content = await self._acomplete("comparison_insights", request)
+            insights = self._parse_comparison_insights(
+                content, your_business, competitor
+            )
 
         except Exception as e:
             logger.error(f"Error generating comparison insights: {str(e)}")
             return self._generate_fallback_comparison(your_business, competitor)
 
+        self._store(key, insights)
+        return insights
+
+    def generate_multi_comparison_insights(
+        self, your_business: Dict[str, Any], competitors: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """
+        Compare your business with several competitors in one request; the
+        answer's per-competitor notes are keyed by competitor name
+        """
+        if not self.client:
+            return self._generate_fallback_multi_comparison(your_business, competitors)
+
+        request = self._multi_comparison_request(your_business, competitors)
+        key = self._cache_key(request)
+        cached = self._cached(key)
+        if cached is not None:
+            return cached
+
+        try:
+            content = self._complete(
+                "multi_comparison_insights", request, budget=AI_BATCH_INPUT_TOKENS
+            )
+            insights = self._parse_multi_comparison_insights(
+                content, your_business, competitors
+            )
+
+        except Exception as e:
+            logger.error(f"Error generating multi-comparison insights: {str(e)}")
+            return self._generate_fallback_multi_comparison(your_business, competitors)
+
+        self._store(key, insights)
+        return insights
+
+    def generate_batch_insights(
+        self, businesses: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Generate insights for several businesses in as few requests as
+        possible. Compact records are packed into prompts up to the token
+        budget and the model answers with JSON keyed by record id; any
+        business it leaves out is requested on its own. Returns insights in
+        input order.
+        """
+        if not self.client:
+            return [self._generate_fallback_insights(b) for b in businesses]
+
+        results: List[Optional[Dict[str, Any]]] = [None] * len(businesses)
+        pending = []
+        for index, business_data in enumerate(businesses):
+            record = self._compact_record(business_data)
+            # Shares generate_business_insights' key: either answer serves both
+            key = self._cache_key(self._business_insights_request(business_data))
+            cached = self._cached(key)
+            if cached is not None:
+                results[index] = cached
+            else:
+                pending.append((index, key, record))
+
+        for chunk in self._chunk_by_budget(pending):
+            self._run_insights_batch(chunk, businesses, results)
+        return results
+
+    def _run_insights_batch(
+        self,
+        chunk: List[Tuple[int, str, str]],
+        businesses: List[Dict[str, Any]],
+        results: List[Optional[Dict[str, Any]]],
+    ):
+        """Request one chunk of batched insights and fill in results"""
+        items = {f"b{n}": item for n, item in enumerate(chunk, 1)}
+        try:
+            content = self._complete(
+                "batch_insights",
+                self._batch_insights_request(
+                    {item_id: record for item_id, (_, _, record) in items.items()}
+                ),
+                budget=AI_BATCH_INPUT_TOKENS,
+            )
+        except Exception as e:
+            logger.error(f"Error generating batched AI insights: {str(e)}")
+            for index, _, _ in chunk:
+                results[index] = self._generate_fallback_insights(businesses[index])
+            return
+
+        try:
+            answers = json.loads(self._extract_json_from_response(content))
+        except ValueError:
+            logger.warning("Batched insights were not valid JSON")
+            answers = {}
+        if not isinstance(answers, dict):
+            answers = {}
+
+        for item_id, (index, key, _) in items.items():
+            answer = answers.get(item_id)
+            if isinstance(answer, dict) and answer.get("summary"):
+                insights = {
+                    "summary": answer["summary"],
+                    "suggestions": list(answer.get("suggestions") or [])[
+                        :MAX_SUGGESTIONS
+                    ],
+                }
+                self._store(key, insights)
+                results[index] = insights
+            else:
+                logger.warning(
+                    f"Batched insights omitted {businesses[index]['name']}; "
+                    "requesting it individually"
+                )
+                results[index] = self.generate_business_insights(businesses[index])
+
+    def _chunk_by_budget(
+        self, pending: List[Tuple[int, str, str]]
+    ) -> Iterator[List[Tuple[int, str, str]]]:
+        """Split pending items so each request stays within the token budget"""
+        base = estimate_tokens(CONSULTANT_SYSTEM_PROMPT) + estimate_tokens(
+            BATCH_INSIGHTS_INSTRUCTIONS
+        )
+        chunk, used = [], base
+        for item in pending:
+            cost = estimate_tokens(item[2]) + 2  # id and line break
+            if chunk and (
+                used + cost > AI_BATCH_INPUT_TOKENS or len(chunk) >= AI_BATCH_MAX_ITEMS
+            ):
+                yield chunk
+                chunk, used = [], base
+            chunk.append(item)
+            used += cost
+        if chunk:
+            yield chunk
+
+    def _batch_insights_request(self, records: Dict[str, str]) -> Dict[str, Any]:
+        """Build the chat completion arguments for a batch of compact records"""
+        lines = "\n".join(f"{item_id} {record}" for item_id, record in records.items())
+        return {
+            "model": OPENAI_MODEL,
+            "messages": [
+                {
+                    "role": "system",
+                    "content": CONSULTANT_SYSTEM_PROMPT,
+                },
+                {
+                    "role": "user",
+                    "content": f"{BATCH_INSIGHTS_INSTRUCTIONS}\n\n{lines}",
+                },
+            ],
+            "temperature": 0.7,
+            "max_tokens": AI_BATCH_OUTPUT_TOKENS_PER_ITEM * len(records),
+            "response_format": {"type": "json_object"},
+        }
+
+    @staticmethod
+    def _compact_record(business_data: Dict[str, Any]) -> str:
+        """Serialize the prompt-relevant fields as minified JSON"""
+        return json.dumps(
+            {
+                "name": business_data["name"],
+                "category": business_data["category"],
+                "reviews": business_data["review_count"],
+                "rating": business_data["average_rating"],
+                "photos": business_data["image_count"],
+                "hours": business_data["has_hours"],
+                "description": business_data["has_description"],
+                "menu": business_data["has_menu"],
+                "phone": business_data["has_phone"],
+                "address": business_data["has_address"],
+                "website": business_data["website"],
+                "score": business_data["score"],
+            },
+            separators=(",", ":"),
+            default=str,
+        )
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Return insights cache and token usage metrics for this process"""
+        return {
+            "cache": self.cache.stats() if self.cache else None,
+            "usage": self.usage.snapshot(),
+        }
+
+    def _complete(
+        self,
+        kind: str,
+        request: Dict[str, Any],
+        budget: int = AI_PROMPT_TOKEN_BUDGET,
+    ) -> str:
+        """Make one chat completion within the token budget, recording its usage"""
+        self._check_budget(kind, request, budget)
+        start = time.perf_counter()
+        response = self.client.chat.completions.create(**request)
+        self.usage.record(
+            kind, getattr(response, "usage", None), time.perf_counter() - start
+        )
+        return response.choices[0].message.content
+
+    async def _acomplete(
+        self,
+        kind: str,
+        request: Dict[str, Any],
+        budget: int = AI_PROMPT_TOKEN_BUDGET,
+    ) -> str:
+        """Async variant of _complete"""
+        self._check_budget(kind, request, budget)
+        start = time.perf_counter()
+        response = await self.async_client.chat.completions.create(**request)
+        self.usage.record(
+            kind, getattr(response, "usage", None), time.perf_counter() - start
+        )
+        return response.choices[0].message.content
+
+    @staticmethod
+    def _check_budget(kind: str, request: Dict[str, Any], budget: int):
+        prompt_tokens = sum(
+            estimate_tokens(message["content"]) for message in request["messages"]
+        )
+        if prompt_tokens > budget:
+            raise TokenBudgetExceeded(
+                f"{kind} prompt is ~{prompt_tokens} tokens, over the "
+                f"{budget} token budget"
+            )
+
+    @staticmethod
+    def _cache_key(request: Dict[str, Any]) -> str:
+        """
+        Content address of a completion: the rendered request (model, prompts
+        and sampling settings) plus the prompt version. Profiles whose
+        prompt-relevant fields are unchanged map to the same key.
+        """
+        raw = json.dumps(
+            {"prompt_version": PROMPT_VERSION, "request": request},
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def _cached(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return cached insights younger than AI_CACHE_TTL, or None"""
+        if not self.cache:
+            return None
+        try:
+            entry = self.cache.get(key, max_age=AI_CACHE_TTL)
+        except Exception as e:
+            logger.error(f"Error reading AI insights cache: {str(e)}")
+            return None
+        if entry is None:
+            return None
+        return entry.value
+
+    def _store(self, key: str, insights: Dict[str, Any]):
+        """Cache insights parsed from a model answer (never fallback output)"""
+        if not self.cache:
+            return
+        try:
+            self.cache.set(key, insights)
+        except Exception as e:
+            logger.error(f"Error writing AI insights cache entry: {str(e)}")
+
+    def _business_insights_request(
+        self, business_data: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Build the chat completion arguments for a business analysis"""
+        return {
+            "model": OPENAI_MODEL,
+            "messages": [
+                {
+                    "role": "system",
+                    "content": CONSULTANT_SYSTEM_PROMPT,
+                },
+                {
+                    "role": "user",
+                    "content": (
+                        self._build_business_analysis_prompt(business_data)
+                        if self.prompt_format == "verbose"
+                        else self._build_compact_business_prompt(business_data)
+                    ),
+                },
+            ],
+            "temperature": 0.7,
+            "max_tokens": 500,
+        }
+
+    def _comparison_request(
+        self, your_business: Dict[str, Any], competitor: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Build the chat completion arguments for a business comparison"""
+        return {
+            "model": OPENAI_MODEL,
+            "messages": [
+                {
+                    "role": "system",
+                    "content": "You are a competitive business analyst expert in market positioning and competitive strategy.",
+                },
+                {
+                    "role": "user",
+                    "content": (
+                        self._build_comparison_prompt(your_business, competitor)
+                        if self.prompt_format == "verbose"
+                        else self._build_compact_comparison_prompt(
+                            your_business, competitor
+                        )
+                    ),
+                },
+            ],
+            "temperature": 0.7,
+            "max_tokens": 600,
+        }
+
+    def _multi_comparison_request(
+        self, your_business: Dict[str, Any], competitors: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Build the chat completion arguments for a one-vs-many comparison"""
+        lines = "\n".join(
+            [f"yours {self._compact_record(your_business)}"]
+            + [
+                f"c{n} {self._compact_record(competitor)}"
+                for n, competitor in enumerate(competitors, 1)
+            ]
+        )
+        return {
+            "model": OPENAI_MODEL,
+            "messages": [
+                {
+                    "role": "system",
+                    "content": "You are a competitive business analyst expert in market positioning and competitive strategy.",
+                },
+                {
+                    "role": "user",
+                    "content": f"{MULTI_COMPARISON_INSTRUCTIONS}\n\n{lines}",
+                },
+            ],
+            "temperature": 0.7,
+            "max_tokens": 600 + 60 * len(competitors),
+            "response_format": {"type": "json_object"},
+        }
+
+    def _parse_business_insights(
+        self, content: str, business_data: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Parse the model's JSON answer for a business analysis"""
+        ai_response = json.loads(self._extract_json_from_response(content))
+
+        return {
+            "summary": ai_response.get(
+                "summary", f"{business_data['name']} analysis completed."
+            ),
+            "suggestions": ai_response.get("suggestions", [])[:MAX_SUGGESTIONS],
+        }
+
+    def _parse_comparison_insights(
+        self, content: str, your_business: Dict[str, Any], competitor: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Parse the model's JSON answer for a business comparison"""
+        ai_response = json.loads(self._extract_json_from_response(content))
+
+        return {
+            "summary": ai_response.get(
+                "summary",
+                f"Comparison between {your_business['name']} and {competitor['name']}.",
+            ),
+            "suggestions": ai_response.get("suggestions", [])[:MAX_SUGGESTIONS],
+            "strengths": ai_response.get("strengths", []),
+        }
+
+    def _parse_multi_comparison_insights(
+        self,
+        content: str,
+        your_business: Dict[str, Any],
+        competitors: List[Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        """Parse the model's JSON answer for a one-vs-many comparison"""
+        ai_response = json.loads(self._extract_json_from_response(content))
+        notes = ai_response.get("competitors")
+        if not isinstance(notes, dict):
+            notes = {}
+
+        return {
+            "summary": ai_response.get(
+                "summary",
+                f"Comparison between {your_business['name']} and "
+                f"{len(competitors)} competitors.",
+            ),
+            "suggestions": ai_response.get("suggestions", [])[:MAX_SUGGESTIONS],
+            "strengths": ai_response.get("strengths", [])[:MAX_STRENGTHS],
+            "competitors": {
+                competitor["name"]: notes.get(f"c{n}")
+                for n, competitor in enumerate(competitors, 1)
+            },
+        }
+
+    def _generate_fallback_insights(
+        self, business_data: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Rule-based insights used when OpenAI is unavailable"""
+        suggestions = []
+        if not business_data.get("has_hours"):
+            suggestions.append(
+                "Publish your opening hours so customers know when to visit."
+            )
+        if not business_data.get("has_description"):
+            suggestions.append(
+                "Add a business description that highlights what makes you unique."
+            )
+        if business_data.get("image_count", 0) < 10:
+            suggestions.append(
+                "Upload more high-quality photos of your products and premises."
+            )
+        if business_data.get("review_count", 0) < 50:
+            suggestions.append(
+                "Ask satisfied customers to leave a review to build social proof."
+            )
+        if 0 < business_data.get("average_rating", 0) < 4.0:
+            suggestions.append(
+                "Respond to critical reviews and address recurring complaints."
+            )
+        if not business_data.get("has_menu"):
+            suggestions.append("Add a menu or list of services to your profile.")
+        if not business_data.get("website"):
+            suggestions.append(
+                "Link a website so customers can learn more and book online."
+            )
+        if not business_data.get("has_phone"):
+            suggestions.append(
+                "Add a phone number so customers can reach you directly."
+            )
+
+        return {
+            "summary": (
+                f"{business_data['name']} has a profile score of "
+                f"{business_data.get('score', 0)}/100."
+            ),
+            "suggestions": suggestions[:MAX_SUGGESTIONS],
+        }
+
+    def _generate_fallback_comparison(
+        self, your_business: Dict[str, Any], competitor: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Rule-based comparison used when OpenAI is unavailable"""
+        metrics = [
+            ("review_count", "more reviews", "Grow your review count"),
+            ("average_rating", "a higher rating", "Improve your average rating"),
+            ("image_count", "more photos", "Add more photos"),
+        ]
+        strengths = []
+        suggestions = []
+        for key, strength, suggestion in metrics:
+            yours, theirs = your_business.get(key, 0), competitor.get(key, 0)
+            if yours > theirs:
+                strengths.append(f"You have {strength} than {competitor['name']}.")
+            elif yours < theirs:
+                suggestions.append(
+                    f"{suggestion} to catch up with {competitor['name']}."
+                )
+
+        your_score = your_business.get("score", 0)
+        competitor_score = competitor.get("score", 0)
+        leader = your_business if your_score >= competitor_score else competitor
+        return {
+            "summary": (
+                f"{your_business['name']} scores {your_score}/100 and "
+                f"{competitor['name']} scores {competitor_score}/100; "
+                f"{leader['name']} currently leads."
+            ),
+            "suggestions": suggestions[:MAX_SUGGESTIONS],
+            "strengths": strengths[:MAX_STRENGTHS],
+        }
+
+    def _generate_fallback_multi_comparison(
+        self, your_business: Dict[str, Any], competitors: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Rule-based one-vs-many comparison used when OpenAI is unavailable"""
+        metrics = [
+            ("review_count", "more reviews", "Grow your review count"),
+            ("average_rating", "a higher rating", "Improve your average rating"),
+            ("image_count", "more photos", "Add more photos"),
+        ]
+        strengths = []
+        suggestions = []
+        for key, strength, suggestion in metrics:
+            leader = max(competitors, key=lambda competitor: competitor.get(key, 0))
+            if your_business.get(key, 0) > leader.get(key, 0):
+                strengths.append(f"You have {strength} than every competitor.")
+            elif your_business.get(key, 0) < leader.get(key, 0):
+                suggestions.append(f"{suggestion} to catch up with {leader['name']}.")
+
+        your_score = your_business.get("score", 0)
+        leader = max(competitors, key=lambda competitor: competitor.get("score", 0))
+        position = 1 + sum(c.get("score", 0) > your_score for c in competitors)
+        standing = (
+            "and leads the field"
+            if position == 1
+            else f"behind {leader['name']} at {leader.get('score', 0)}/100"
+        )
+        return {
+            "summary": (
+                f"{your_business['name']} ranks {position} of {len(competitors) + 1} "
+                f"with a score of {your_score}/100 {standing}."
+            ),
+            "suggestions": suggestions[:MAX_SUGGESTIONS],
+            "strengths": strengths[:MAX_STRENGTHS],
+            "competitors": {
+                competitor["name"]: (
+                    f"{competitor['name']} scores {competitor.get('score', 0)}/100, "
+                    f"{self._relative_position(competitor.get('score', 0), your_score)} "
+                    "your business."
+                )
+                for competitor in competitors
+            },
+        }
+
+    @staticmethod
+    def _relative_position(score: float, your_score: float) -> str:
+        if score > your_score:
+            return "ahead of"
+        if score < your_score:
+            return "behind"
+        return "level with"
+
+    def _build_compact_business_prompt(self, business_data: Dict[str, Any]) -> str:
+        """Build a business analysis prompt around a minified profile record"""
+        return (
+            f"{BUSINESS_INSIGHTS_INSTRUCTIONS}\n\n"
+            f"{self._compact_record(business_data)}"
+        )
+
+    def _build_compact_comparison_prompt(
+        self, your_business: Dict[str, Any], competitor: Dict[str, Any]
+    ) -> str:
+        """Build a comparison prompt around two minified profile records"""
+        return (
+            f"{COMPARISON_INSTRUCTIONS}\n\n"
+            f"yours {self._compact_record(your_business)}\n"
+            f"competitor {self._compact_record(competitor)}"
+        )
+
     def _build_business_analysis_prompt(self, business_data: Dict[str, Any]) -> str:
         """Build prompt for business analysis"""
         return f"""
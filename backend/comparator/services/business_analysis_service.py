@@ -1,10 +1,21 @@
 import logging
-from typing import Dict, Any
+from concurrent.futures import FIRST_COMPLETED, wait
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 from .business_service import BusinessService
 from .ai_service import AIService
 from .scoring_service import ScoringService
+from .features import BusinessFeatures
 from .comparison_service import ComparisonService
-
+from .cohort_service import CohortService
+from .competitor_service import CompetitorService
+from .concurrency import get_executor, get_rate_limiter, db_task
+from .config import (
+    BATCH_MAX_WORKERS,
+    BATCH_DEFAULT_CONCURRENCY,
+    BATCH_RATE_LIMIT,
+    BATCH_RATE_BURST,
+    AI_BATCH_MAX_ITEMS,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -12,11 +23,28 @@ logger = logging.getLogger(__name__)
 class BusinessAnalysisService:
     """Main orchestrator service for business analysis operations"""
 
-    def __init__(self):
-        self.business_service = BusinessService()
-        self.ai_service = AIService()
-        self.scoring_service = ScoringService()
-        self.comparison_service = ComparisonService()
+    def __init__(
+        self,
+        business_service: Optional[BusinessService] = None,
+        ai_service: Optional[AIService] = None,
+        scoring_service: Optional[ScoringService] = None,
+        comparison_service: Optional[ComparisonService] = None,
+        cohort_service: Optional[CohortService] = None,
+        competitor_service: Optional[CompetitorService] = None,
+    ):
+        self.business_service = business_service or BusinessService()
+        self.ai_service = ai_service or AIService()
+        self.scoring_service = scoring_service or ScoringService()
+        self.comparison_service = comparison_service or ComparisonService(
+            business_service=self.business_service,
+            ai_service=self.ai_service,
+            scoring_service=self.scoring_service,
+        )
+        self.cohort_service = cohort_service or CohortService()
+        self.competitor_service = competitor_service or CompetitorService(
+            business_service=self.business_service,
+            scoring_service=self.scoring_service,
+        )
 
     def analyze_business(
         self, business_name: str, website: str = None
@@ -25,22 +53,149 @@ class BusinessAnalysisService:
         Analyze a single business and provide insights
         Returns: Business profile data with AI-generated suggestions
         """
+        result = None
+        for _, result in self.iter_analysis_stages(business_name, website):
+            pass
+        return result
+
+    def iter_analysis_stages(
+        self, business_name: str, website: str = None
+    ) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Run analyze_business step by step, yielding (stage, payload) as each
+        stage finishes: business_resolved, profile_enriched, score_computed,
+        insights_ready and finally complete with the full analysis result
+        """
         # Get or create business profile with real data
-        business = self.business_service.get_or_create_business(business_name, website)
+        business = None
+        for stage, payload in self.business_service.iter_resolution_stages(
+            business_name, website
+        ):
+            if stage == "profile_enriched":
+                business = payload
+                payload = {
+                    "business": self.business_service.format_business_data(business)
+                }
+            yield stage, payload
 
         # Calculate business score
-        score = self.scoring_service.calculate_business_score(business)
+        score = self.scoring_service.get_score(business)
+        peer_ranking = self.cohort_service.get_ranking(business, score)
+        yield "score_computed", {"score": score, "peer_ranking": peer_ranking}
 
         # Prepare business data for AI analysis
-        business_data = self._prepare_business_data(business, score)
+        business_data = BusinessFeatures.from_profile(business, score).prompt_data()
 
         # Generate analysis insights
         insights = self.ai_service.generate_business_insights(business_data)
+        yield "insights_ready", {"analysis": insights}
+
+        yield "complete", {
+            "business": self.business_service.format_business_data(business),
+            "analysis": insights,
+            "score": score,
+            "peer_ranking": peer_ranking,
+        }
+
+    def analyze_many(
+        self,
+        business_names: List[str],
+        concurrency: int = BATCH_DEFAULT_CONCURRENCY,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Analyze several businesses with at most `concurrency` in flight,
+        yielding each outcome as soon as it completes (completion order).
+        Starts are throttled by the process-wide batch rate limiter.
+        Businesses resolved in the same wait pass share one batched AI
+        request (up to `concurrency` per request); none waits for later ones.
+        """
+        executor = get_executor("batch", BATCH_MAX_WORKERS)
+        limiter = get_rate_limiter("batch", BATCH_RATE_LIMIT, BATCH_RATE_BURST)
+        group_size = max(1, min(concurrency, AI_BATCH_MAX_ITEMS))
+
+        def run(index: int, business_name: str) -> Dict[str, Any]:
+            limiter.acquire()
+            try:
+                business = self.business_service.get_or_create_business(business_name)
+                score = self.scoring_service.get_score(business)
+                return {
+                    "index": index,
+                    "business_name": business_name,
+                    "profile": business,
+                    "score": score,
+                }
+            except Exception as e:
+                logger.error(f"Batch analysis failed for {business_name}: {str(e)}")
+                return {"index": index, "business_name": business_name, "error": str(e)}
+
+        pending = list(enumerate(business_names))
+        pending.reverse()
+        in_flight = set()
+        try:
+            while pending or in_flight:
+                while pending and len(in_flight) < max(1, concurrency):
+                    index, business_name = pending.pop()
+                    in_flight.add(executor.submit(db_task(run), index, business_name))
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                resolved = []
+                for future in done:
+                    outcome = future.result()
+                    if "error" in outcome:
+                        yield outcome
+                    else:
+                        resolved.append(outcome)
+                for start in range(0, len(resolved), group_size):
+                    yield from self._complete_analyses(
+                        resolved[start : start + group_size]
+                    )
+        finally:
+            # Client went away: let running analyses finish, start no more
+            for future in in_flight:
+                future.cancel()
+
+    def _complete_analyses(
+        self, resolved: List[Dict[str, Any]]
+    ) -> Iterator[Dict[str, Any]]:
+        """Generate insights for a group of scored businesses in one AI batch"""
+        insights = self.ai_service.generate_batch_insights(
+            [
+                BusinessFeatures.from_profile(
+                    outcome["profile"], outcome["score"]
+                ).prompt_data()
+                for outcome in resolved
+            ]
+        )
+        for outcome, analysis in zip(resolved, insights):
+            yield {
+                "index": outcome["index"],
+                "business_name": outcome["business_name"],
+                "business": self.business_service.format_business_data(
+                    outcome["profile"]
+                ),
+                "analysis": analysis,
+                "score": outcome["score"],
+                "peer_ranking": self.cohort_service.get_ranking(
+                    outcome["profile"], outcome["score"]
+                ),
+            }
+
+    async def aanalyze_business(
+        self, business_name: str, website: str = None
+    ) -> Dict[str, Any]:
+        """Async variant of analyze_business"""
+        business = await self.business_service.aget_or_create_business(
+            business_name, website
+        )
+        score = self.scoring_service.get_score(business)
+        peer_ranking = await self.cohort_service.aget_ranking(business, score)
+        business_data = BusinessFeatures.from_profile(business, score).prompt_data()
+        insights = await self.ai_service.agenerate_business_insights(business_data)
 
         return {
             "business": self.business_service.format_business_data(business),
             "analysis": insights,
             "score": score,
+            "peer_ranking": peer_ranking,
         }
 
     def compare_businesses(
@@ -55,84 +210,49 @@ class BusinessAnalysisService:
             your_business, your_website, competitor_business, competitor_website
         )
 
-    def find_competitors(
-        self, business_name: str, location: str = None, limit: int = 5
+    def compare_many(
+        self,
+        your_business: str,
+        your_website: Optional[str],
+        competitors: List[Tuple[str, Optional[str]]],
     ) -> Dict[str, Any]:
-        """
-        Find potential competitors for a given business
-        This is a placeholder implementation for future development
-        """
-        # TODO: Implement competitor finding using SerpAPI local search
-        # This could search for similar businesses in the same area/category
-        return {
-            "business_name": business_name,
-            "location": location,
-            "competitors": [],
-            "message": "Competitor finding functionality not yet implemented. Please specify competitors manually.",
-            "suggestions": [
-                "Use Google Maps to search for similar businesses in your area",
-                "Look for businesses with similar categories or services",
-                "Check local business directories for competitors",
-            ],
-        }
+        """Compare your business with several competitors in one ranked matrix"""
+        return self.comparison_service.compare_many(
+            your_business, your_website, competitors
+        )
 
-    def _prepare_business_data(self, business, score: float) -> Dict[str, Any]:
-        """Prepare business data for AI analysis"""
-        return {
-            # Basic Information
-            "name": business.name,
-            "category": business.category,
-            "cuisine_type": business.cuisine_type,
-            "price_range": business.price_range,
-            "established_year": business.established_year,
-            # Contact & Location
-            "has_phone": bool(business.phone),
-            "has_email": bool(business.email),
-            "has_address": bool(business.address),
-            "city": business.city,
-            "state": business.state,
-            "website": business.website,
-            # Business Operations
-            "is_open": business.is_open,
-            "temporarily_closed": business.temporarily_closed,
-            "has_hours": business.has_hours,
-            "has_business_hours": bool(business.business_hours),
-            # Service Options
-            "offers_delivery": business.offers_delivery,
-            "offers_takeout": business.offers_takeout,
-            "offers_dine_in": business.offers_dine_in,
-            "accepts_reservations": business.accepts_reservations,
-            "service_options_count": len(business.service_options_summary),
-            # Review Metrics
-            "review_count": business.review_count,
-            "google_reviews": business.google_reviews,
-            "yelp_reviews": business.yelp_reviews,
-            "total_reviews": business.total_reviews,
-            "average_rating": float(business.average_rating),
-            # Content Metrics
-            "image_count": business.image_count,
-            "has_description": business.has_description,
-            "has_menu": business.has_menu,
-            "has_menu_url": bool(business.menu_url),
-            # Features & Amenities
-            "has_parking": business.has_parking,
-            "wheelchair_accessible": business.wheelchair_accessible,
-            "has_wifi": business.has_wifi,
-            "accepts_credit_cards": business.accepts_credit_cards,
-            "outdoor_seating": business.outdoor_seating,
-            "special_features_count": len(business.special_features),
-            "popular_dishes_count": len(business.popular_dishes),
-            # Online Presence
-            "has_social_media": any(
-                [business.facebook_url, business.instagram_url, business.twitter_url]
-            ),
-            "social_media_count": sum(
-                [
-                    bool(business.facebook_url),
-                    bool(business.instagram_url),
-                    bool(business.twitter_url),
-                ]
-            ),
-            # Overall Score
-            "score": score,
-        }
+    def iter_comparison_stages(
+        self,
+        your_business: str,
+        your_website: str,
+        competitor_business: str,
+        competitor_website: str = None,
+    ) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Stage-by-stage variant of compare_businesses"""
+        return self.comparison_service.iter_comparison_stages(
+            your_business, your_website, competitor_business, competitor_website
+        )
+
+    async def acompare_businesses(
+        self,
+        your_business: str,
+        your_website: str,
+        competitor_business: str,
+        competitor_website: str = None,
+    ):
+        """Async variant of compare_businesses"""
+        return await self.comparison_service.acompare_businesses(
+            your_business, your_website, competitor_business, competitor_website
+        )
+
+    def find_competitors(
+        self,
+        business_name: str,
+        location: str = None,
+        limit: int = 5,
+        enrich: int = 0,
+    ) -> Dict[str, Any]:
+        """Find likely competitors from the places found near the business"""
+        return self.competitor_service.find_competitors(
+            business_name, location=location, limit=limit, enrich=enrich
+        )
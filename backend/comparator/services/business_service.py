@@ -1,37 +1,311 @@
+import time
+import queue
 import random
+import asyncio
 import logging
-from typing import Dict, Any, Optional, TYPE_CHECKING
-from ..models import BusinessProfile
+from datetime import timedelta
+from contextlib import nullcontext
+from concurrent.futures import wait
+from typing import (
+    Dict,
+    Any,
+    Callable,
+    Iterator,
+    Optional,
+    Tuple,
+    TYPE_CHECKING,
+)
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from ..models import BusinessProfile, normalize_business_name
 from .serpapi_service import SerpAPIService
 from .scoring_service import ScoringService
+from .snapshot_service import SnapshotService
+from .fetch_planner import FetchPlanner, FetchPlan
+from .place_normalizer import normalize_place, apply_record, payload_reviews
+from .concurrency import db_task, get_executor
+from .coalescing import Announcements, asingle_flight, single_flight
+from .config import (
+    COALESCE_TIMEOUT,
+    RESOLUTION_MAX_WORKERS,
+    ENRICHMENT_MAX_WORKERS,
+    ENRICHMENT_DEADLINE,
+    ENRICHMENT_REVIEWS,
+    BUSINESS_FRESHNESS_SECONDS,
+)
 
 if TYPE_CHECKING:
     pass
 
 logger = logging.getLogger(__name__)
 
+# Places identified by name lookups in flight in this process
+_identified = Announcements()
+
 
 class BusinessService:
     """Core service for business profile management"""
 
-    def __init__(self):
-        self.serpapi_service = SerpAPIService()
-        self.scoring_service = ScoringService()
+    def __init__(
+        self,
+        serpapi_service: Optional[SerpAPIService] = None,
+        scoring_service: Optional[ScoringService] = None,
+        snapshot_service: Optional[SnapshotService] = None,
+        fetch_planner: Optional[FetchPlanner] = None,
+    ):
+        self.serpapi_service = serpapi_service or SerpAPIService()
+        self.scoring_service = scoring_service or ScoringService()
+        self.snapshot_service = snapshot_service or SnapshotService()
+        self.fetch_planner = fetch_planner or FetchPlanner()
 
     def get_or_create_business(
         self, business_name: str, website: Optional[str] = None
     ) -> BusinessProfile:
-        """Get existing business or create with real SerpAPI data"""
-        business = BusinessProfile.objects.create(name=business_name)
+        """
+        Get existing business or create with real SerpAPI data.
+        A fresh stored profile is returned without any external call; a stale
+        one, or one matched by data_id after searching, is refreshed in place.
+        """
+        business = self._lookup_queryset(business_name).first()
+        if business is not None and self.is_fresh(business):
+            return business
+        return self._resolve_coalesced(business_name, website, business)
+
+    def iter_resolution_stages(
+        self, business_name: str, website: Optional[str] = None
+    ) -> Iterator[Tuple[str, Any]]:
+        """
+        Run get_or_create_business step by step, yielding
+        ("business_resolved", summary dict) as soon as the place is
+        identified, before enrichment, and then
+        ("profile_enriched", BusinessProfile) once it is stored
+        """
+        business = self._lookup_queryset(business_name).first()
+        if business is not None and self.is_fresh(business):
+            yield from self._stored_stages(business)
+            return
+
+        # Resolution runs on a pool thread and reports the place through a
+        # queue, so the coalescing locks are never held while this generator
+        # is suspended at a yield
+        events = queue.Queue()
+        future = get_executor("resolution", RESOLUTION_MAX_WORKERS).submit(
+            db_task(self._resolve_coalesced),
+            business_name,
+            website,
+            business,
+            lambda summary: events.put(("business_resolved", summary)),
+        )
+        future.add_done_callback(lambda _: events.put(None))
+        while True:
+            stage = events.get()
+            if stage is None:
+                break
+            yield stage
+        yield "profile_enriched", future.result()
+
+    def _resolve_coalesced(
+        self,
+        business_name: str,
+        website: Optional[str],
+        business: Optional[BusinessProfile],
+        on_resolved: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> BusinessProfile:
+        """
+        Search and store the business. on_resolved, when given, receives the
+        business_resolved summary exactly once, as soon as the place is known.
+        """
+        key = normalize_business_name(business_name)
+        deadline = time.monotonic() + COALESCE_TIMEOUT
+        started = timezone.now()
+        announced = False
+
+        def announce(summary: Dict[str, Any]):
+            nonlocal announced
+            if on_resolved is not None and not announced:
+                announced = True
+                on_resolved(summary)
+
+        # A lookup of this name already in flight here shares the place it
+        # identified, so this caller can report it before that lookup is done
+        if on_resolved is not None:
+            summary = _identified.wait(key, COALESCE_TIMEOUT)
+            if summary is not None:
+                announce(summary)
+
+        # Concurrent lookups of the same name or place share one resolution:
+        # callers that had to wait re-read the row it stored instead of
+        # searching and enriching again
+        timeout = max(0.0, deadline - time.monotonic())
+        with single_flight("name", key, timeout) as waited:
+            if waited:
+                business = self._lookup_queryset(business_name).first()
+                if business is not None and self._fetched_since(business, started):
+                    announce(self._stored_summary(business))
+                    return business
+
+            with _identified.publishing(key) as publish:
+                serpapi_data, nearby = self.serpapi_service.search_places(business_name)
+                summary = self._place_summary(business_name, serpapi_data)
+                publish(summary)
+                announce(summary)
+
+                data_id = (serpapi_data or {}).get("data_id")
+                place_flight = (
+                    single_flight("data_id", data_id) if data_id else nullcontext(False)
+                )
+                with place_flight as waited:
+                    if self._may_belong_elsewhere(business, data_id, waited):
+                        existing = self._data_id_queryset(data_id).first()
+                        if existing is not None:
+                            if self.is_fresh(existing) or self._fetched_since(
+                                existing, started
+                            ):
+                                return existing
+                            business = existing
+                    if business is None:
+                        business = BusinessProfile(name=business_name)
+                    self._update_business_data(business, website, serpapi_data, nearby)
+        return business
 
-        self._update_business_data(business, website)
+    async def aget_or_create_business(
+        self, business_name: str, website: Optional[str] = None
+    ) -> BusinessProfile:
+        """
+        Async variant of get_or_create_business, coalescing with sync and
+        async lookups of the same name or place
+        """
+        business = await self._lookup_queryset(business_name).afirst()
+        if business is not None and self.is_fresh(business):
+            return business
+
+        started = timezone.now()
+        key = normalize_business_name(business_name)
+        async with asingle_flight("name", key) as waited:
+            if waited:
+                business = await self._lookup_queryset(business_name).afirst()
+                if business is not None and self._fetched_since(business, started):
+                    return business
+
+            serpapi_data, nearby = await self.serpapi_service.asearch_places(
+                business_name
+            )
+            data_id = (serpapi_data or {}).get("data_id")
+            place_flight = (
+                asingle_flight("data_id", data_id) if data_id else nullcontext(False)
+            )
+            async with place_flight as waited:
+                if self._may_belong_elsewhere(business, data_id, waited):
+                    existing = await self._data_id_queryset(data_id).afirst()
+                    if existing is not None:
+                        if self.is_fresh(existing) or self._fetched_since(
+                            existing, started
+                        ):
+                            return existing
+                        business = existing
+                if business is None:
+                    business = BusinessProfile(name=business_name)
+                await self._aupdate_business_data(
+                    business, website, serpapi_data, nearby
+                )
+        return business
 
+    def get_or_create_from_place(self, place: Dict[str, Any]) -> BusinessProfile:
+        """
+        Store a place taken from search results, such as a competitor found
+        nearby. The result itself stands in for the search and place details
+        calls, so at most the reviews and photos enrichment calls are made.
+        """
+        data_id = place.get("data_id")
+        place_flight = (
+            single_flight("data_id", data_id) if data_id else nullcontext(False)
+        )
+        with place_flight:
+            business = self._data_id_queryset(data_id).first() if data_id else None
+            if business is not None and self.is_fresh(business):
+                return business
+            if business is None:
+                business = BusinessProfile(name=place.get("title") or "Unknown")
+            self._update_business_data(
+                business,
+                None,
+                self.serpapi_service.place_from_local_result(place),
+            )
         return business
 
+    def is_fresh(self, business: BusinessProfile) -> bool:
+        """Whether the profile's SerpAPI data is within the freshness window"""
+        if business.fetched_at is None:
+            return False
+        window = timedelta(seconds=BUSINESS_FRESHNESS_SECONDS)
+        return business.fetched_at >= timezone.now() - window
+
+    def _may_belong_elsewhere(
+        self, business: Optional[BusinessProfile], data_id: Optional[str], waited
+    ) -> bool:
+        """
+        Whether the searched place may already be stored under another row: no
+        row matched the name, the name's row has a different data_id, or
+        another lookup held the place's lock first
+        """
+        return bool(data_id) and (
+            business is None or waited or business.data_id != data_id
+        )
+
+    def _fetched_since(self, business: BusinessProfile, since) -> bool:
+        return business.fetched_at is not None and business.fetched_at >= since
+
+    def _stored_stages(self, business: BusinessProfile) -> Iterator[Tuple[str, Any]]:
+        yield "business_resolved", self._stored_summary(business)
+        yield "profile_enriched", business
+
+    def _stored_summary(self, business: BusinessProfile) -> Dict[str, Any]:
+        """Identify an already stored profile for a business_resolved event"""
+        return {
+            "name": business.name,
+            "address": business.address,
+            "category": business.category,
+            "data_id": business.data_id,
+            "rating": float(business.average_rating or 0),
+            "review_count": business.review_count,
+            "stored": True,
+            "found": True,
+        }
+
+    def _place_summary(
+        self, business_name: str, serpapi_data: Optional[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Identify a freshly searched place for a business_resolved event"""
+        serpapi_data = serpapi_data or {}
+        types = serpapi_data.get("type") or []
+        return {
+            "name": business_name,
+            "address": serpapi_data.get("address"),
+            "category": types[0] if isinstance(types, list) and types else types,
+            "data_id": serpapi_data.get("data_id"),
+            "rating": serpapi_data.get("rating"),
+            "review_count": serpapi_data.get("reviews"),
+            "stored": False,
+            "found": bool(serpapi_data),
+        }
+
+    def _lookup_queryset(self, business_name: str):
+        """Stored profiles matching the normalized name, most recent first"""
+        return BusinessProfile.objects.filter(
+            normalized_name=normalize_business_name(business_name)
+        ).order_by("-fetched_at", "-updated_at")
+
+    def _data_id_queryset(self, data_id: str):
+        """Stored profiles for a SerpAPI data_id, most recent first"""
+        return BusinessProfile.objects.filter(data_id=data_id).order_by(
+            "-fetched_at", "-updated_at"
+        )
+
     def format_business_data(self, business: BusinessProfile) -> Dict[str, Any]:
         """Format business data for API response"""
         return {
             # Basic Information
+            "id": business.pk,
             "name": business.name,
             "website": business.website,
             "description": business.description,
@@ -70,8 +344,8 @@ class BusinessService:
             "twitter_url": business.twitter_url,
             # Review Metrics
             "review_count": business.review_count,
-            "average_rating": float(business.rating) if business.rating else 0.0,
-            "rating": float(business.rating) if business.rating else 0.0,
+            "average_rating": float(business.average_rating or 0),
+            "rating": float(business.average_rating or 0),
             "google_reviews": (
                 business.google_reviews
                 if hasattr(business, "google_reviews")
@@ -109,60 +383,116 @@ class BusinessService:
         }
 
     def _update_business_data(
-        self, business: BusinessProfile, website: Optional[str] = None
+        self,
+        business: BusinessProfile,
+        website: Optional[str] = None,
+        serpapi_data: Optional[Dict[str, Any]] = None,
+        nearby: Optional[list] = None,
     ):
         """Update business with data from SerpAPI or fallback"""
-        serpapi_data = self.serpapi_service.search_business(business.name)
-
+        if nearby:
+            business.nearby_places = nearby
         if serpapi_data:
-            self._update_from_serpapi_data(business, serpapi_data)
+            reviews_data, photos_data = self._fetch_enrichment(
+                self.fetch_planner.plan(serpapi_data)
+            )
+            self._update_from_serpapi_data(
+                business, serpapi_data, reviews_data, photos_data
+            )
+            business.fetched_at = timezone.now()
+        elif business.pk:
+            # Keep serving the stale profile rather than blanking it
+            logger.warning(f"Could not refresh business {business.name}")
+            return
         # else:
         #     self._set_fallback_data(business, website)
 
-        business.save()
+        try:
+            with transaction.atomic():
+                business.save()
+        except IntegrityError:
+            # Another request stored this data_id first; update that row instead
+            if not self._adopt_existing_data_id(
+                business, self._data_id_queryset(business.data_id).first()
+            ):
+                raise
+            business.save()
         logger.info(f"Updated business {business.name}")
 
+        if serpapi_data:
+            self.snapshot_service.record(
+                business, self.scoring_service.get_score(business)
+            )
+
+    async def _aupdate_business_data(
+        self,
+        business: BusinessProfile,
+        website: Optional[str] = None,
+        serpapi_data: Optional[Dict[str, Any]] = None,
+        nearby: Optional[list] = None,
+    ):
+        """Async variant of _update_business_data"""
+        if nearby:
+            business.nearby_places = nearby
+        if serpapi_data:
+            reviews_data, photos_data = await self._afetch_enrichment(
+                self.fetch_planner.plan(serpapi_data)
+            )
+            self._update_from_serpapi_data(
+                business, serpapi_data, reviews_data, photos_data
+            )
+            business.fetched_at = timezone.now()
+        elif business.pk:
+            logger.warning(f"Could not refresh business {business.name}")
+            return
+
+        try:
+            await business.asave()
+        except IntegrityError:
+            if not self._adopt_existing_data_id(
+                business, await self._data_id_queryset(business.data_id).afirst()
+            ):
+                raise
+            await business.asave()
+        logger.info(f"Updated business {business.name}")
+
+        if serpapi_data:
+            await self.snapshot_service.arecord(
+                business, self.scoring_service.get_score(business)
+            )
+
+    def _adopt_existing_data_id(
+        self, business: BusinessProfile, existing: Optional[BusinessProfile]
+    ) -> bool:
+        """Point an unsaved profile at the stored row sharing its data_id"""
+        if business.pk or existing is None:
+            return False
+        business.pk = existing.pk
+        business.created_at = existing.created_at
+        return True
+
     def _update_from_serpapi_data(
-        self, business: BusinessProfile, serpapi_data: Dict[str, Any]
+        self,
+        business: BusinessProfile,
+        serpapi_data: Dict[str, Any],
+        reviews_data: Optional[list] = None,
+        photos_data: Optional[list] = None,
     ):
         """Update business model with SerpAPI data"""
         try:
-            # Basic location and contact info
-            business.address = serpapi_data.get("address", "")
-            business.phone = serpapi_data.get("phone", "")
-            business.website = serpapi_data.get("website", "")
-            business.description = serpapi_data.get("description", "")
-
-            # Store data_id for fetching additional data
-            business.data_id = serpapi_data.get("data_id", "")
-
-            # Ratings and reviews
-            business.rating = serpapi_data.get("rating", 0.0)
-            business.review_count = serpapi_data.get("reviews", 0)
-
-            # Images
-            images = serpapi_data.get("images", [])
-            business.image_count = len(images)
-
-            # Store actual image URLs (limit to first 10 for performance)
-            business.images = []
-            for img in images[:10]:
-                if isinstance(img, dict) and img.get("thumbnail"):
-                    business.images.append(
-                        {
-                            "url": img["thumbnail"],
-                            "title": img.get("title", ""),
-                            "source": "Google",
-                        }
-                    )
-
-            # If we have a data_id, fetch additional reviews and photos
+            record = normalize_place(serpapi_data)
+            apply_record(business, record)
+
+            # A place built from a local result has no images listed, so the
+            # photos fetched for it are counted instead
+            if serpapi_data.get("from_local_result") and not record["image_count"]:
+                business.image_count = len(photos_data or [])
+
+            # If we have a data_id, use the additional reviews and photos
             if business.data_id:
-                # Fetch reviews from SerpAPI Reviews endpoint
-                reviews_data = self.serpapi_service.get_reviews(business.data_id, 5)
                 business.reviews = []
 
-                for review in reviews_data:
+                for review in reviews_data or []:
                     if isinstance(review, dict):
                         business.reviews.append(
                             {
@@ -178,8 +508,6 @@ class BusinessService:
                             }
                         )
 
-                # Fetch photos from SerpAPI Photos endpoint
-                photos_data = self.serpapi_service.get_photos(business.data_id)
                 if (
                     photos_data and not business.images
                 ):  # Only if we don't already have images
@@ -194,142 +522,12 @@ class BusinessService:
                                 }
                             )
 
-            # Extract reviews from user_reviews section if available
+            # Fall back to the reviews embedded in the place payload
             if not business.reviews:
-                user_reviews = serpapi_data.get("user_reviews", {})
-                most_relevant = user_reviews.get("most_relevant", [])
-                business.reviews = []
-
-                for review in most_relevant[:5]:  # Limit to first 5 reviews
-                    if isinstance(review, dict):
-                        business.reviews.append(
-                            {
-                                "rating": review.get("rating", 0),
-                                "text": review.get("description", ""),
-                                "author": review.get("username", "Anonymous"),
-                                "date": review.get("date", ""),
-                                "source": "Google",
-                            }
-                        )
-
-            # Business hours
-            hours = serpapi_data.get("hours", [])
-            business.has_hours = len(hours) > 0
-            if business.has_hours:
-                business.business_hours = hours
-
-            # Category/type
-            types = serpapi_data.get("type", [])
-            if types:
-                business.category = types[0] if isinstance(types, list) else str(types)
-            else:
-                business.category = "Business"
-
-            # Description
-            business.description = self._extract_description(serpapi_data)
-            business.has_description = bool(business.description)
-
-            # Check for menu
-            business.has_menu = self._has_menu_info(serpapi_data)
-            if business.has_menu:
-                # Look for menu URL in order_online_link or website
-                business.menu_url = serpapi_data.get(
-                    "order_online_link", business.website
-                )
-
-            # Extract service options from extensions
-            service_options = serpapi_data.get("service_options", {})
-            business.offers_delivery = service_options.get("delivery", False)
-            business.offers_takeout = service_options.get("takeout", False)
-            business.offers_dine_in = service_options.get("dine_in", False)
-
-            # Extract additional business characteristics from extensions
-            extensions = serpapi_data.get("extensions", [])
-            business.accepts_reservations = False
-            business.has_parking = False
-            business.wheelchair_accessible = False
-            business.has_wifi = False
-            business.outdoor_seating = False
-            business.accepts_credit_cards = False
-            business.special_features = []
-            business.popular_dishes = []
-
-            for ext in extensions:
-                if isinstance(ext, dict):
-                    # Service options
-                    if "service_options" in ext:
-                        service_opts = ext["service_options"]
-                        if "Takeout" in service_opts:
-                            business.offers_takeout = True
-                        if "Dine-in" in service_opts:
-                            business.offers_dine_in = True
-                        if "Delivery" in service_opts:
-                            business.offers_delivery = True
-
-                    # Accessibility
-                    if "accessibility" in ext:
-                        accessibility = ext["accessibility"]
-                        if any("wheelchair" in item.lower() for item in accessibility):
-                            business.wheelchair_accessible = True
-
-                    # Amenities
-                    if "amenities" in ext:
-                        amenities = ext["amenities"]
-                        if any("wi-fi" in item.lower() for item in amenities):
-                            business.has_wifi = True
-                        if any("parking" in item.lower() for item in amenities):
-                            business.has_parking = True
-
-                    # Payments
-                    if "payments" in ext:
-                        payments = ext["payments"]
-                        if any("credit" in item.lower() for item in payments):
-                            business.accepts_credit_cards = True
-
-                    # Highlights as special features
-                    if "highlights" in ext:
-                        business.special_features = ext["highlights"]
-
-                    # Offerings as popular dishes/items
-                    if "offerings" in ext:
-                        business.popular_dishes = ext["offerings"]
-
-            # Price range
-            price = serpapi_data.get("price", "")
-            business.price_range = price if price else "$$"
+                business.reviews = payload_reviews(serpapi_data)
 
             # Set default values for missing fields
             business.established_year = random.randint(2010, 2022)
-            business.cuisine_type = ""
-
-            # Determine cuisine type from category and offerings
-            if business.category and "cafe" in business.category.lower():
-                business.cuisine_type = "Coffee & Cafe"
-            elif any(
-                "restaurant" in cat.lower() for cat in types if isinstance(cat, str)
-            ):
-                business.cuisine_type = "Restaurant"
-
-            # Set operational status
-            open_state = serpapi_data.get("open_state", "")
-            business.is_open = "open" in open_state.lower() if open_state else True
-            business.temporarily_closed = (
-                "closed" in open_state.lower() if open_state else False
-            )
-
-            # GPS coordinates for full address
-            gps = serpapi_data.get("gps_coordinates", {})
-            if gps:
-                # Extract city, state, country from address
-                address_parts = business.address.split(", ") if business.address else []
-                if len(address_parts) >= 3:
-                    business.city = address_parts[-2].split()[0]  # City
-                    business.country = address_parts[-1]  # Country
-                    business.postal_code = (
-                        address_parts[-2].split()[-1]
-                        if len(address_parts[-2].split()) > 1
-                        else ""
-                    )
 
         except Exception as e:
             logger.error(f"Error updating business from SerpAPI data: {str(e)}")
@@ -338,76 +536,81 @@ class BusinessService:
                 f"SerpAPI data keys: {list(serpapi_data.keys()) if isinstance(serpapi_data, dict) else 'Not a dict'}"
             )
 
-    def _extract_description(self, serpapi_data: Dict[str, Any]) -> str:
-        """Extract or generate description from SerpAPI data"""
-        # First check if there's a direct description
-        if serpapi_data.get("description"):
-            return serpapi_data["description"]
-
-        # Try to get description from popular highlights and offerings
-        extensions = serpapi_data.get("extensions", [])
-        highlights = []
-        offerings = []
-        popular_for = []
-
-        for ext in extensions:
-            if isinstance(ext, dict):
-                if "highlights" in ext:
-                    highlights.extend(ext["highlights"])
-                if "offerings" in ext:
-                    offerings.extend(ext["offerings"])
-                if "popular_for" in ext:
-                    popular_for.extend(ext["popular_for"])
-
-        # Build description from available data
-        description_parts = []
-
-        if highlights:
-            description_parts.append(f"Known for: {', '.join(highlights[:3])}")
-
-        if popular_for:
-            description_parts.append(f"Popular for: {', '.join(popular_for[:3])}")
-
-        if offerings:
-            description_parts.append(f"Offers: {', '.join(offerings[:3])}")
-
-        if description_parts:
-            return ". ".join(description_parts) + "."
-        else:
-            # Fallback description
-            category = (
-                serpapi_data.get("type", ["business"])[0]
-                if serpapi_data.get("type")
-                else "business"
+    def _fetch_enrichment(self, plan: FetchPlan) -> Tuple[list, list]:
+        """
+        Make the plan's reviews and photos calls concurrently within
+        ENRICHMENT_DEADLINE. A call that is skipped, fails or misses the
+        deadline contributes an empty list.
+        """
+        data_id = plan.data_id
+        self._record_skipped(plan)
+        if not plan.calls:
+            return [], []
+
+        executor = get_executor("enrichment", ENRICHMENT_MAX_WORKERS)
+        futures = {}
+        if "reviews" in plan:
+            future = executor.submit(
+                self.serpapi_service.get_reviews, data_id, ENRICHMENT_REVIEWS
+            )
+            futures[future] = "reviews"
+        if "photos" in plan:
+            future = executor.submit(self.serpapi_service.get_photos, data_id)
+            futures[future] = "photos"
+        done, not_done = wait(futures, timeout=ENRICHMENT_DEADLINE)
+
+        results = {"reviews": [], "photos": []}
+        for future in done:
+            try:
+                results[futures[future]] = future.result() or []
+            except Exception as e:
+                logger.error(
+                    f"Error fetching {futures[future]} for {data_id}: {str(e)}"
+                )
+        for future in not_done:
+            future.cancel()
+            logger.warning(
+                f"Fetching {futures[future]} for {data_id} exceeded "
+                f"{ENRICHMENT_DEADLINE}s; continuing with partial data"
+            )
+
+        return results["reviews"], results["photos"]
+
+    async def _afetch_enrichment(self, plan: FetchPlan) -> Tuple[list, list]:
+        """Async variant of _fetch_enrichment"""
+        data_id = plan.data_id
+        self._record_skipped(plan)
+        if not plan.calls:
+            return [], []
+
+        tasks = {}
+        if "reviews" in plan:
+            task = asyncio.ensure_future(
+                self.serpapi_service.aget_reviews(data_id, ENRICHMENT_REVIEWS)
+            )
+            tasks[task] = "reviews"
+        if "photos" in plan:
+            task = asyncio.ensure_future(self.serpapi_service.aget_photos(data_id))
+            tasks[task] = "photos"
+        done, pending = await asyncio.wait(tasks, timeout=ENRICHMENT_DEADLINE)
+
+        results = {"reviews": [], "photos": []}
+        for task in done:
+            try:
+                results[tasks[task]] = task.result() or []
+            except Exception as e:
+                logger.error(f"Error fetching {tasks[task]} for {data_id}: {str(e)}")
+        for task in pending:
+            task.cancel()
+            logger.warning(
+                f"Fetching {tasks[task]} for {data_id} exceeded "
+                f"{ENRICHMENT_DEADLINE}s; continuing with partial data"
+            )
+
+        return results["reviews"], results["photos"]
+
+    def _record_skipped(self, plan: FetchPlan):
+        for call in plan.skipped:
+            self.serpapi_service.record_skipped_enrichment(
+                call, plan.data_id, ENRICHMENT_REVIEWS
             )
-            return f"A {category.lower()} serving customers in the local area."
-
-    def _has_menu_info(self, serpapi_data: Dict[str, Any]) -> bool:
-        """Check if business has menu information"""
-        images = serpapi_data.get("images", [])
-
-        # Check if any image is labeled as menu
-        for image in images:
-            if image.get("title", "").lower() in ["menu", "food & drink"]:
-                return True
-
-        # Check extensions for menu-related info
-        extensions = serpapi_data.get("extensions", [])
-        for ext in extensions:
-            if "offerings" in ext:
-                offerings = ext["offerings"]
-                menu_keywords = [
-                    "menu",
-                    "food",
-                    "drinks",
-                    "coffee",
-                    "breakfast",
-                    "lunch",
-                    "dinner",
-                ]
-                if any(
-                    keyword in " ".join(offerings).lower() for keyword in menu_keywords
-                ):
-                    return True
-
-        return False
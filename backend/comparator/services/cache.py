@@ -0,0 +1,121 @@
+import json
+import sqlite3
+import threading
+import time
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CacheEntry:
+    """A cached value together with the time it was stored"""
+
+    value: Any
+    stored_at: float
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.stored_at
+
+
+class PersistentTTLCache:
+    """SQLite-backed key/value cache with LRU eviction that survives restarts"""
+
+    def __init__(
+        self, path: str, table: str = "cache_entries", max_entries: int = 1000
+    ):
+        self.path = str(path)
+        self.table = table
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            self.path, check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {self.table} ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+            "stored_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            f"CREATE INDEX IF NOT EXISTS {self.table}_accessed_at "
+            f"ON {self.table} (accessed_at)"
+        )
+
+    def get(self, key: str, max_age: Optional[float] = None) -> Optional[CacheEntry]:
+        """
+        Return the entry for key and mark it recently used. An entry older
+        than max_age (when given) is not returned and counts as a miss.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT value, stored_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or (max_age is not None and time.time() - row[1] >= max_age):
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._conn.execute(
+                f"UPDATE {self.table} SET accessed_at = ? WHERE key = ?",
+                (time.time(), key),
+            )
+        return CacheEntry(value=json.loads(row[0]), stored_at=row[1])
+
+    def stored_at(self, key: str) -> Optional[float]:
+        """When key was stored, without counting a lookup or marking it used"""
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT stored_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, value: Any):
+        """Store value under key, evicting least recently used entries if full"""
+        now = time.time()
+        payload = json.dumps(value)
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, stored_at, accessed_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, payload, now, now),
+            )
+            self._evict()
+
+    def delete(self, key: str):
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Return entry count and hit/miss counters for this process"""
+        with self._lock:
+            (count,) = self._conn.execute(
+                f"SELECT COUNT(*) FROM {self.table}"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "entries": count,
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+    def _evict(self):
+        """Drop the least recently used entries beyond max_entries"""
+        (count,) = self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()
+        overflow = count - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                f"DELETE FROM {self.table} WHERE key IN ("
+                f"SELECT key FROM {self.table} ORDER BY accessed_at ASC LIMIT ?)",
+                (overflow,),
+            )
@@ -0,0 +1,170 @@
+import os
+import time
+import hashlib
+import threading
+import logging
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional
+from asgiref.sync import sync_to_async
+from .config import COALESCE_LOCK_DIR, COALESCE_LOCK_STRIPES, COALESCE_TIMEOUT
+
+try:
+    import fcntl
+except ImportError:  # Windows: coalesce within the process only
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+_stripes: Dict[str, List[threading.Lock]] = {}
+_stripes_lock = threading.Lock()
+
+# Poll interval while waiting on another process's file lock
+_FILE_LOCK_POLL = 0.05
+
+
+@contextmanager
+def single_flight(
+    namespace: str, key: str, timeout: float = COALESCE_TIMEOUT
+) -> Iterator[bool]:
+    """
+    Hold the lock for key across threads and, where fcntl is available,
+    across worker processes. Yields True when another caller held it first,
+    meaning the work has probably just been done and its result should be
+    re-read rather than recomputed.
+
+    Keys hash onto a fixed set of lock stripes per namespace, so memory and
+    lock files stay bounded; a collision only serializes unrelated work.
+    Callers must take namespaces in a fixed order to avoid deadlock. After
+    timeout the caller proceeds unlocked, since duplicate work beats failure;
+    the thread and file lock waits share that one timeout.
+    """
+    deadline = time.monotonic() + timeout
+    stripe = int(hashlib.sha1(key.encode()).hexdigest(), 16) % COALESCE_LOCK_STRIPES
+    lock = _thread_lock(namespace, stripe)
+
+    waited = not lock.acquire(blocking=False)
+    acquired = not waited or lock.acquire(timeout=timeout)
+    if not acquired:
+        logger.warning(f"Timed out waiting for in-flight {namespace} {key!r}")
+    try:
+        with _file_lock(namespace, stripe, deadline) as file_waited:
+            yield waited or file_waited
+    finally:
+        if acquired:
+            lock.release()
+
+
+@asynccontextmanager
+async def asingle_flight(
+    namespace: str, key: str, timeout: float = COALESCE_TIMEOUT
+) -> AsyncIterator[bool]:
+    """
+    Async variant of single_flight, sharing its locks with sync callers. The
+    wait happens on a worker thread so the event loop keeps running; the
+    locks are plain Lock and flock, so releasing them from the loop is safe.
+    """
+    flight = single_flight(namespace, key, timeout)
+    waited = await sync_to_async(flight.__enter__, thread_sensitive=False)()
+    try:
+        yield waited
+    finally:
+        flight.__exit__(None, None, None)
+
+
+def _thread_lock(namespace: str, stripe: int) -> threading.Lock:
+    locks = _stripes.get(namespace)
+    if locks is None:
+        with _stripes_lock:
+            locks = _stripes.get(namespace)
+            if locks is None:
+                locks = [threading.Lock() for _ in range(COALESCE_LOCK_STRIPES)]
+                _stripes[namespace] = locks
+    return locks[stripe]
+
+
+@contextmanager
+def _file_lock(namespace: str, stripe: int, deadline: float) -> Iterator[bool]:
+    """
+    flock a per-stripe file, waiting until the time.monotonic() deadline;
+    yields whether another process held it
+    """
+    if fcntl is None:
+        yield False
+        return
+
+    try:
+        os.makedirs(COALESCE_LOCK_DIR, exist_ok=True)
+        handle = open(
+            os.path.join(COALESCE_LOCK_DIR, f"{namespace}-{stripe}.lock"), "a"
+        )
+    except OSError as e:
+        logger.warning(f"Cross-process coalescing unavailable: {str(e)}")
+        yield False
+        return
+
+    waited = False
+    locked = False
+    try:
+        while True:
+            try:
+                fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                locked = True
+                break
+            except BlockingIOError:
+                waited = True
+                if time.monotonic() >= deadline:
+                    logger.warning(f"Timed out waiting for {namespace} lock {stripe}")
+                    break
+                time.sleep(_FILE_LOCK_POLL)
+        yield waited
+    finally:
+        if locked:
+            fcntl.flock(handle, fcntl.LOCK_UN)
+        handle.close()
+
+
+class Announcements:
+    """
+    Values the holder of a single_flight key publishes before its work is
+    done, such as the place a lookup identified, so callers waiting on the
+    same key in this process can report them early
+    """
+
+    def __init__(self):
+        self._pending: Dict[str, "_Announcement"] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def publishing(self, key: str) -> Iterator[Callable[[Any], None]]:
+        """Register as the publisher for key; yields the publish function"""
+        announcement = _Announcement()
+        with self._lock:
+            self._pending[key] = announcement
+        try:
+            yield announcement.publish
+        finally:
+            with self._lock:
+                if self._pending.get(key) is announcement:
+                    del self._pending[key]
+            # Release waiters even if nothing was published
+            announcement.publish(None)
+
+    def wait(self, key: str, timeout: float) -> Optional[Any]:
+        """The value published for key, or None if nobody is publishing one"""
+        with self._lock:
+            announcement = self._pending.get(key)
+        if announcement is None:
+            return None
+        announcement.ready.wait(timeout)
+        return announcement.value
+
+
+class _Announcement:
+    def __init__(self):
+        self.value = None
+        self.ready = threading.Event()
+
+    def publish(self, value: Any):
+        if not self.ready.is_set():
+            self.value = value
+            self.ready.set()
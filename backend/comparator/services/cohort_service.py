@@ -0,0 +1,161 @@
+import logging
+from collections import Counter
+from typing import Dict, Any, List, Optional, Tuple
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+from ..models import BusinessProfile, CohortScoreBucket
+
+logger = logging.getLogger(__name__)
+
+# (category, city, score) as stored on a profile
+Standing = Tuple[Optional[str], Optional[str], Optional[float]]
+
+
+def cohort_key(category: Optional[str], city: Optional[str]) -> Tuple[str, str]:
+    """Cohort a profile belongs to: its category and city, casefolded"""
+    return (
+        " ".join((category or "").casefold().split())[:100],
+        " ".join((city or "").casefold().split())[:100],
+    )
+
+
+class CohortService:
+    """Service for per (category, city) score histograms and peer rankings"""
+
+    def move(self, previous: Optional[Standing], current: Optional[Standing]):
+        """Move a re-scored profile from its previous bucket to its current one"""
+        previous, current = self._bucket(previous), self._bucket(current)
+        if previous == current:
+            return
+        try:
+            with transaction.atomic():
+                if previous:
+                    self._adjust(previous, -1)
+                if current:
+                    self._adjust(current, 1)
+        except Exception as e:
+            logger.error(f"Error updating cohort histogram: {str(e)}")
+
+    def get_ranking(
+        self, business: BusinessProfile, score: float
+    ) -> Optional[Dict[str, Any]]:
+        """
+        The score's percentile within the business's cohort and the cohort
+        median, from the cohort's histogram (at most 1001 rows, whatever the
+        number of profiles). None when the category or city is unknown.
+        """
+        cohort = self._cohort_buckets(business)
+        if cohort is None:
+            return None
+        return self._ranking(business, score, list(cohort))
+
+    async def aget_ranking(
+        self, business: BusinessProfile, score: float
+    ) -> Optional[Dict[str, Any]]:
+        """Async variant of get_ranking"""
+        cohort = self._cohort_buckets(business)
+        if cohort is None:
+            return None
+        return self._ranking(business, score, [bucket async for bucket in cohort])
+
+    def _cohort_buckets(self, business: BusinessProfile):
+        """(score_tenths, count) rows of the business's cohort, in score order"""
+        category, city = cohort_key(business.category, business.city)
+        if not category or not city:
+            return None
+        return (
+            CohortScoreBucket.objects.filter(category=category, city=city, count__gt=0)
+            .order_by("score_tenths")
+            .values_list("score_tenths", "count")
+        )
+
+    def _ranking(
+        self, business: BusinessProfile, score: float, buckets: List[Tuple[int, int]]
+    ) -> Optional[Dict[str, Any]]:
+        cohort_size = sum(count for _, count in buckets)
+        if not cohort_size:
+            return None
+
+        tenths = round(score * 10)
+        below = sum(count for value, count in buckets if value < tenths)
+        equal = sum(count for value, count in buckets if value == tenths)
+        return {
+            "category": business.category,
+            "city": business.city,
+            "cohort_size": cohort_size,
+            # Mid-rank percentile: ties count half above and half below
+            "percentile": round(100 * (below + equal / 2) / cohort_size, 1),
+            "median_score": self._median(buckets, cohort_size),
+        }
+
+    def rebuild(self) -> int:
+        """
+        Recount every histogram from the stored scores, e.g. after a bulk
+        rescore or bulk deletes bypassed save(); returns the number of buckets
+        """
+        counts = Counter()
+        rows = (
+            BusinessProfile.objects.filter(score__isnull=False)
+            .values_list("category", "city", "score")
+            .annotate(profiles=Count("pk"))
+            .order_by()
+        )
+        for category, city, score, profiles in rows:
+            bucket = self._bucket((category, city, score))
+            if bucket:
+                counts[bucket] += profiles
+
+        with transaction.atomic():
+            CohortScoreBucket.objects.all().delete()
+            CohortScoreBucket.objects.bulk_create(
+                [
+                    CohortScoreBucket(
+                        category=category,
+                        city=city,
+                        score_tenths=tenths,
+                        count=count,
+                    )
+                    for (category, city, tenths), count in counts.items()
+                ],
+                batch_size=1000,
+            )
+        return len(counts)
+
+    def _bucket(self, standing: Optional[Standing]) -> Optional[Tuple[str, str, int]]:
+        """(category, city, score_tenths) for a standing, or None if unranked"""
+        if standing is None or standing[2] is None:
+            return None
+        category, city = cohort_key(standing[0], standing[1])
+        if not category or not city:
+            return None
+        return category, city, round(standing[2] * 10)
+
+    def _adjust(self, bucket: Tuple[str, str, int], delta: int):
+        category, city, tenths = bucket
+        buckets = CohortScoreBucket.objects.filter(
+            category=category, city=city, score_tenths=tenths
+        )
+        if buckets.update(count=F("count") + delta) or delta < 0:
+            return
+        try:
+            with transaction.atomic():
+                CohortScoreBucket.objects.create(
+                    category=category, city=city, score_tenths=tenths, count=delta
+                )
+        except IntegrityError:
+            # Another writer created the bucket first
+            buckets.update(count=F("count") + delta)
+
+    def _median(self, buckets: List[Tuple[int, int]], cohort_size: int) -> float:
+        """Median score from (score_tenths, count) pairs in score order"""
+        lower_rank, upper_rank = (cohort_size - 1) // 2, cohort_size // 2
+        lower = upper = None
+        seen = 0
+        for tenths, count in buckets:
+            seen += count
+            if lower is None and seen > lower_rank:
+                lower = tenths
+            if seen > upper_rank:
+                upper = tenths
+                break
+        return round((lower + upper) / 20, 2)
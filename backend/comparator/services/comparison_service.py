@@ -1,19 +1,41 @@
+import queue
+import asyncio
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+from ..models import BusinessProfile, normalize_business_name
 from .business_service import BusinessService
 from .ai_service import AIService
 from .scoring_service import ScoringService
+from .features import BusinessFeatures
+from .concurrency import get_executor, db_task
+from .config import PROFILE_MAX_WORKERS
 
 logger = logging.getLogger(__name__)
 
+# Columns of the one-vs-many comparison matrix, each ranked highest first
+MATRIX_METRICS = [
+    "score",
+    "review_score",
+    "content_score",
+    "image_score",
+    "total_reviews",
+    "average_rating",
+    "image_count",
+]
+
 
 class ComparisonService:
     """Service for comparing businesses and generating insights"""
 
-    def __init__(self):
-        self.business_service = BusinessService()
-        self.ai_service = AIService()
-        self.scoring_service = ScoringService()
+    def __init__(
+        self,
+        business_service: Optional[BusinessService] = None,
+        ai_service: Optional[AIService] = None,
+        scoring_service: Optional[ScoringService] = None,
+    ):
+        self.business_service = business_service or BusinessService()
+        self.ai_service = ai_service or AIService()
+        self.scoring_service = scoring_service or ScoringService()
 
     def compare_businesses(
         self,
@@ -23,31 +45,197 @@ class ComparisonService:
         competitor_website: str = None,
     ) -> Dict[str, Any]:
         """Compare two businesses and provide detailed analysis"""
-        # Get both business profiles
-        your_profile = self.business_service.get_or_create_business(
-            your_business, your_website
-        )
-        competitor_profile = self.business_service.get_or_create_business(
-            competitor_business, competitor_website
-        )
+        result = None
+        for _, result in self.iter_comparison_stages(
+            your_business, your_website, competitor_business, competitor_website
+        ):
+            pass
+        return result
 
-        # Calculate scores
-        your_score = self.scoring_service.calculate_business_score(your_profile)
-        competitor_score = self.scoring_service.calculate_business_score(
-            competitor_profile
+    def iter_comparison_stages(
+        self,
+        your_business: str,
+        your_website: str,
+        competitor_business: str,
+        competitor_website: str = None,
+    ) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Run compare_businesses step by step. Both sides resolve in parallel and
+        their business_resolved, profile_enriched and score_computed stages are
+        yielded as they happen, tagged with "side"; then insights_ready and
+        complete follow. complete carries the same payload compare_businesses
+        returns, including the partial result when a side failed.
+        """
+        # Resolve and score both business profiles in parallel
+        resolved = {}
+        errors = {}
+        yield from self._iter_resolution(
+            {
+                "your_business": (your_business, your_website),
+                "competitor": (competitor_business, competitor_website),
+            },
+            resolved,
+            errors,
         )
 
+        if errors:
+            yield "complete", self._partial_comparison(resolved, errors)
+            return
+
+        your_profile, your_score = resolved["your_business"]
+        competitor_profile, competitor_score = resolved["competitor"]
+
         # Prepare data for AI analysis
-        your_data = self._prepare_business_data(your_profile, your_score)
-        competitor_data = self._prepare_business_data(
+        your_data = BusinessFeatures.from_profile(
+            your_profile, your_score
+        ).prompt_data()
+        competitor_data = BusinessFeatures.from_profile(
             competitor_profile, competitor_score
-        )
+        ).prompt_data()
 
         # Generate comparison insights
         comparison_insights = self.ai_service.generate_comparison_insights(
             your_data, competitor_data
         )
+        yield "insights_ready", {"comparison": comparison_insights}
+
+        yield "complete", self._comparison_result(
+            your_profile,
+            your_score,
+            competitor_profile,
+            competitor_score,
+            comparison_insights,
+        )
 
+    def compare_many(
+        self,
+        your_business: str,
+        your_website: Optional[str],
+        competitors: List[Tuple[str, Optional[str]]],
+    ) -> Dict[str, Any]:
+        """
+        Benchmark your business against several (name, website) competitors.
+        Every profile resolves concurrently and your business only once; the
+        stored scores feed one ranked matrix, and a single AI call compares
+        your business with the whole field. Competitors that fail to resolve
+        are reported under errors and left out.
+        """
+        sides = {"your_business": (your_business, your_website)}
+        seen = {normalize_business_name(your_business)}
+        for business_name, website in competitors:
+            if normalize_business_name(business_name) not in seen:
+                seen.add(normalize_business_name(business_name))
+                sides[f"competitor_{len(sides)}"] = (business_name, website)
+
+        resolved = {}
+        errors = {}
+        for _ in self._iter_resolution(sides, resolved, errors):
+            pass
+        errors = {sides[side][0]: error for side, error in errors.items()}
+
+        # Names that resolve to the same stored place are one business
+        profiles, pks = [], set()
+        for side in sides:
+            profile = resolved.get(side, (None, None))[0]
+            if profile is not None and (profile.pk is None or profile.pk not in pks):
+                profiles.append(profile)
+                pks.add(profile.pk)
+        matrix = self._comparison_matrix(profiles, resolved.get("your_business"))
+        your_profile = resolved.get("your_business", (None, None))[0]
+        competitor_profiles = [
+            profile for profile in profiles if profile is not your_profile
+        ]
+
+        comparison = None
+        if your_profile is not None and competitor_profiles:
+            data = [
+                (
+                    row["is_yours"],
+                    BusinessFeatures.from_profile(
+                        row["profile"], row["score"]
+                    ).prompt_data(),
+                )
+                for row in matrix
+            ]
+            comparison = self.ai_service.generate_multi_comparison_insights(
+                next(business for is_yours, business in data if is_yours),
+                [business for is_yours, business in data if not is_yours],
+            )
+
+        result = {
+            "your_business": (
+                self.business_service.format_business_data(your_profile)
+                if your_profile is not None
+                else None
+            ),
+            "competitors": [
+                self.business_service.format_business_data(profile)
+                for profile in competitor_profiles
+            ],
+            "matrix": [
+                {key: value for key, value in row.items() if key != "profile"}
+                for row in matrix
+            ],
+            "your_rank": self._your_ranks(matrix),
+            "comparison": comparison,
+        }
+        if errors:
+            result["errors"] = errors
+        return result
+
+    async def acompare_businesses(
+        self,
+        your_business: str,
+        your_website: str,
+        competitor_business: str,
+        competitor_website: str = None,
+    ) -> Dict[str, Any]:
+        """Async variant of compare_businesses"""
+        outcomes = await asyncio.gather(
+            self._aresolve_and_score(your_business, your_website),
+            self._aresolve_and_score(competitor_business, competitor_website),
+            return_exceptions=True,
+        )
+
+        resolved = {}
+        errors = {}
+        for side, outcome in zip(("your_business", "competitor"), outcomes):
+            if isinstance(outcome, Exception):
+                logger.error(f"Error resolving {side} for comparison: {str(outcome)}")
+                errors[side] = str(outcome)
+            else:
+                resolved[side] = outcome
+
+        if errors:
+            return self._partial_comparison(resolved, errors)
+
+        your_profile, your_score = resolved["your_business"]
+        competitor_profile, competitor_score = resolved["competitor"]
+
+        comparison_insights = await self.ai_service.agenerate_comparison_insights(
+            BusinessFeatures.from_profile(your_profile, your_score).prompt_data(),
+            BusinessFeatures.from_profile(
+                competitor_profile, competitor_score
+            ).prompt_data(),
+        )
+
+        return self._comparison_result(
+            your_profile,
+            your_score,
+            competitor_profile,
+            competitor_score,
+            comparison_insights,
+        )
+
+    def _comparison_result(
+        self,
+        your_profile: BusinessProfile,
+        your_score: float,
+        competitor_profile: BusinessProfile,
+        competitor_score: float,
+        comparison_insights: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        """Assemble the API payload for a completed comparison"""
         return {
             "your_business": self.business_service.format_business_data(your_profile),
             "competitor": self.business_service.format_business_data(
@@ -58,63 +246,129 @@ class ComparisonService:
             "competitor_score": competitor_score,
         }
 
-    def _prepare_business_data(self, business, score: float) -> Dict[str, Any]:
-        """Prepare business data for AI analysis"""
+    def _resolve_side(
+        self,
+        side: str,
+        business_name: str,
+        website: Optional[str],
+        events: queue.Queue,
+    ):
+        """
+        Resolve and score one side of a comparison, reporting each stage as a
+        (side, stage, payload) event and always finishing with a done event
+        """
+        try:
+            profile = None
+            for stage, payload in self.business_service.iter_resolution_stages(
+                business_name, website
+            ):
+                if stage == "profile_enriched":
+                    profile = payload
+                    payload = {
+                        "business": self.business_service.format_business_data(profile)
+                    }
+                events.put((side, stage, payload))
+
+            score = self.scoring_service.get_score(profile)
+            events.put((side, "score_computed", {"score": score}))
+            events.put((side, "resolved", (profile, score)))
+        except Exception as e:
+            logger.error(f"Error resolving {side} for comparison: {str(e)}")
+            events.put((side, "error", str(e)))
+        finally:
+            events.put((side, "done", None))
+
+    def _iter_resolution(
+        self,
+        sides: Dict[str, Tuple[str, Optional[str]]],
+        resolved: Dict[str, Tuple[BusinessProfile, float]],
+        errors: Dict[str, str],
+    ) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Resolve and score every side concurrently, yielding their stages
+        tagged with "side" and filling in resolved and errors as they finish
+        """
+        executor = get_executor("profiles", PROFILE_MAX_WORKERS)
+        events = queue.Queue()
+        for side, (business_name, website) in sides.items():
+            executor.submit(
+                db_task(self._resolve_side), side, business_name, website, events
+            )
+
+        remaining = len(sides)
+        while remaining:
+            side, stage, payload = events.get()
+            if stage == "done":
+                remaining -= 1
+            elif stage == "error":
+                errors[side] = payload
+            elif stage == "resolved":
+                resolved[side] = payload
+            else:
+                yield stage, {"side": side, **payload}
+
+    def _comparison_matrix(
+        self,
+        profiles: List[BusinessProfile],
+        yours: Optional[Tuple[BusinessProfile, float]],
+    ) -> List[Dict[str, Any]]:
+        """One row of metrics per profile, ranked by score (ties share a rank)"""
+        your_profile = yours[0] if yours else None
+        rows = []
+        for profile in profiles:
+            components = self.scoring_service.get_components(profile)
+            rows.append(
+                {
+                    "profile": profile,
+                    "name": profile.name,
+                    "is_yours": profile is your_profile,
+                    "score": components["score"],
+                    "review_score": round(components["review_score"], 1),
+                    "content_score": round(components["content_score"], 1),
+                    "image_score": round(components["image_score"], 1),
+                    "total_reviews": profile.total_reviews,
+                    "average_rating": float(profile.average_rating),
+                    "image_count": profile.image_count,
+                }
+            )
+        rows.sort(key=lambda row: row["score"], reverse=True)
+        for row in rows:
+            row["rank"] = 1 + sum(other["score"] > row["score"] for other in rows)
+        return rows
+
+    def _your_ranks(self, matrix: List[Dict[str, Any]]) -> Optional[Dict[str, int]]:
+        """Your position (1 = best) in each matrix column"""
+        yours = next((row for row in matrix if row["is_yours"]), None)
+        if yours is None:
+            return None
         return {
-            # Basic Information
-            "name": business.name,
-            "category": business.category,
-            "cuisine_type": business.cuisine_type,
-            "price_range": business.price_range,
-            "established_year": business.established_year,
-            # Contact & Location
-            "has_phone": bool(business.phone),
-            "has_email": bool(business.email),
-            "has_address": bool(business.address),
-            "city": business.city,
-            "state": business.state,
-            "website": business.website,
-            # Business Operations
-            "is_open": business.is_open,
-            "temporarily_closed": business.temporarily_closed,
-            "has_hours": business.has_hours,
-            "has_business_hours": bool(business.business_hours),
-            # Service Options
-            "offers_delivery": business.offers_delivery,
-            "offers_takeout": business.offers_takeout,
-            "offers_dine_in": business.offers_dine_in,
-            "accepts_reservations": business.accepts_reservations,
-            "service_options_count": len(business.service_options_summary),
-            # Review Metrics
-            "review_count": business.review_count,
-            "google_reviews": business.google_reviews,
-            "yelp_reviews": business.yelp_reviews,
-            "total_reviews": business.total_reviews,
-            "average_rating": float(business.average_rating),
-            # Content Metrics
-            "image_count": business.image_count,
-            "has_description": business.has_description,
-            "has_menu": business.has_menu,
-            "has_menu_url": bool(business.menu_url),
-            # Features & Amenities
-            "has_parking": business.has_parking,
-            "wheelchair_accessible": business.wheelchair_accessible,
-            "has_wifi": business.has_wifi,
-            "accepts_credit_cards": business.accepts_credit_cards,
-            "outdoor_seating": business.outdoor_seating,
-            "special_features_count": len(business.special_features),
-            "popular_dishes_count": len(business.popular_dishes),
-            # Online Presence
-            "has_social_media": any(
-                [business.facebook_url, business.instagram_url, business.twitter_url]
-            ),
-            "social_media_count": sum(
-                [
-                    bool(business.facebook_url),
-                    bool(business.instagram_url),
-                    bool(business.twitter_url),
-                ]
-            ),
-            # Overall Score
-            "score": score,
+            metric: 1 + sum(row[metric] > yours[metric] for row in matrix)
+            for metric in MATRIX_METRICS
         }
+
+    async def _aresolve_and_score(
+        self, business_name: str, website: Optional[str]
+    ) -> Tuple[BusinessProfile, float]:
+        """Resolve one side of a comparison and compute its score"""
+        profile = await self.business_service.aget_or_create_business(
+            business_name, website
+        )
+        return profile, self.scoring_service.get_score(profile)
+
+    def _partial_comparison(
+        self, resolved: Dict[str, Tuple[BusinessProfile, float]], errors: Dict[str, str]
+    ) -> Dict[str, Any]:
+        """Build a comparison result that keeps whichever side resolved"""
+        result = {"comparison": None, "errors": errors}
+        for side, score_key in (
+            ("your_business", "your_score"),
+            ("competitor", "competitor_score"),
+        ):
+            profile, score = resolved.get(side, (None, None))
+            result[side] = (
+                self.business_service.format_business_data(profile)
+                if profile is not None
+                else None
+            )
+            result[score_key] = score
+        return result
@@ -0,0 +1,206 @@
+import math
+import logging
+from typing import Dict, Any, List, Optional
+from ..models import BusinessProfile, normalize_business_name
+from .business_service import BusinessService
+from .scoring_service import ScoringService
+from .concurrency import get_executor, db_task
+from .config import PROFILE_MAX_WORKERS
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_KM = 6371.0
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance between two coordinates in kilometres"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = (
+        math.sin(d_phi / 2) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+class CompetitorService:
+    """Service for discovering and ranking a business's nearby competitors"""
+
+    def __init__(
+        self,
+        business_service: Optional[BusinessService] = None,
+        scoring_service: Optional[ScoringService] = None,
+    ):
+        self.business_service = business_service or BusinessService()
+        self.scoring_service = scoring_service or ScoringService()
+
+    def find_competitors(
+        self,
+        business_name: str,
+        location: Optional[str] = None,
+        limit: int = 5,
+        enrich: int = 0,
+    ) -> Dict[str, Any]:
+        """
+        Rank the places found alongside the business by category similarity,
+        then distance, and return the top limit. Candidates come from the
+        search that resolved the business, so discovery makes no extra SerpAPI
+        call unless that search matched a single place; then one nearby search
+        for its category runs and is stored for next time. The top enrich
+        candidates are stored and scored as full profiles.
+        """
+        business = self.business_service.get_or_create_business(business_name)
+
+        searched_nearby = False
+        candidates = business.nearby_places
+        if not candidates:
+            candidates = self._search_nearby(business, location)
+            searched_nearby = True
+
+        ranked = self._rank(business, candidates)[:limit]
+        competitors = [self._format_candidate(candidate) for candidate in ranked]
+        for competitor, profile in zip(
+            competitors, self._enrich([c["place"] for c in ranked[:enrich]])
+        ):
+            competitor["profile"] = (
+                self.business_service.format_business_data(profile)
+                if profile is not None
+                else None
+            )
+            competitor["score"] = (
+                self.scoring_service.get_score(profile) if profile is not None else None
+            )
+
+        return {
+            "business_name": business.name,
+            "category": business.category,
+            "location": location or business.city,
+            "competitors": competitors,
+            "searched_nearby": searched_nearby,
+        }
+
+    def _search_nearby(
+        self, business: BusinessProfile, location: Optional[str]
+    ) -> List[Dict[str, Any]]:
+        """Search the business's category around it and remember the results"""
+        area = location or business.city or business.full_address
+        query = f"{business.category} in {area}" if area else business.category
+        candidates = self.business_service.serpapi_service.search_nearby(
+            query, business.latitude, business.longitude
+        )
+        if candidates and business.pk:
+            business.nearby_places = candidates
+            business.save(update_fields=["nearby_places"])
+        return candidates
+
+    def _rank(
+        self, business: BusinessProfile, candidates: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """Candidates other than the business, best category match and closest first"""
+        ranked = []
+        seen = {business.data_id, business.normalized_name} - {None, ""}
+        for place in candidates:
+            if not isinstance(place, dict) or not place.get("title"):
+                continue
+            name = normalize_business_name(place["title"])
+            if place.get("data_id") in seen or name in seen:
+                continue
+            seen.update(key for key in (place.get("data_id"), name) if key)
+
+            gps = place.get("gps_coordinates") or {}
+            coordinates = (
+                business.latitude,
+                business.longitude,
+                gps.get("latitude"),
+                gps.get("longitude"),
+            )
+            # Places missing either coordinate are ranked without a distance
+            distance = None
+            if None not in coordinates:
+                distance = haversine_km(*coordinates)
+            ranked.append(
+                {
+                    "place": place,
+                    "category_match": self._category_similarity(
+                        business.category, self._place_types(place)
+                    ),
+                    "distance_km": distance,
+                }
+            )
+
+        ranked.sort(
+            key=lambda candidate: (
+                -candidate["category_match"],
+                (
+                    candidate["distance_km"]
+                    if candidate["distance_km"] is not None
+                    else math.inf
+                ),
+                -(candidate["place"].get("reviews") or 0),
+            )
+        )
+        return ranked
+
+    def _enrich(self, places: List[Dict[str, Any]]) -> List[Optional[BusinessProfile]]:
+        """Store the given places as full profiles, concurrently"""
+        if not places:
+            return []
+        executor = get_executor("profiles", PROFILE_MAX_WORKERS)
+        futures = [
+            executor.submit(db_task(self.business_service.get_or_create_from_place), p)
+            for p in places
+        ]
+        profiles = []
+        for place, future in zip(places, futures):
+            try:
+                profiles.append(future.result())
+            except Exception as e:
+                logger.error(f"Error enriching competitor {place['title']}: {str(e)}")
+                profiles.append(None)
+        return profiles
+
+    def _format_candidate(self, candidate: Dict[str, Any]) -> Dict[str, Any]:
+        place = candidate["place"]
+        types = self._place_types(place)
+        return {
+            "name": place["title"],
+            "address": place.get("address"),
+            "category": types[0] if types else None,
+            "rating": place.get("rating"),
+            "reviews": place.get("reviews"),
+            "distance_km": (
+                round(candidate["distance_km"], 2)
+                if candidate["distance_km"] is not None
+                else None
+            ),
+            "category_match": round(candidate["category_match"], 2),
+            "data_id": place.get("data_id"),
+            "place_id": place.get("place_id"),
+            "profile": None,
+            "score": None,
+        }
+
+    @staticmethod
+    def _place_types(place: Dict[str, Any]) -> List[str]:
+        """A local result's categories: "type" may be a string or a list"""
+        types = place.get("types") or place.get("type") or []
+        if isinstance(types, str):
+            types = [types]
+        return [t for t in types if isinstance(t, str)]
+
+    @staticmethod
+    def _category_similarity(category: Optional[str], types: List[str]) -> float:
+        """1 for an exact category match, else the best word overlap (Jaccard)"""
+        category = (category or "").casefold()
+        if not category or not types:
+            return 0.0
+        words = set(category.split())
+        best = 0.0
+        for place_type in types:
+            place_type = place_type.casefold()
+            if place_type == category:
+                return 1.0
+            type_words = set(place_type.split())
+            best = max(best, len(words & type_words) / len(words | type_words))
+        return best
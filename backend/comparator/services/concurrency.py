@@ -0,0 +1,92 @@
+import time
+import functools
+import contextvars
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+_executors: Dict[str, ThreadPoolExecutor] = {}
+_executors_lock = threading.Lock()
+_rate_limiters: Dict[str, "RateLimiter"] = {}
+
+
+class ContextThreadPoolExecutor(ThreadPoolExecutor):
+    """Thread pool that runs each task in a copy of the submitter's context"""
+
+    def submit(self, fn, /, *args, **kwargs):
+        return super().submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+
+def get_executor(name: str, max_workers: int) -> ThreadPoolExecutor:
+    """
+    Return a bounded, process-wide thread pool for one kind of work.
+    Separate pools per kind keep nested fan-outs from starving each other.
+    Tasks see the submitting request's context variables, e.g. its usage tracker.
+    """
+    executor = _executors.get(name)
+    if executor is None:
+        with _executors_lock:
+            executor = _executors.get(name)
+            if executor is None:
+                executor = ContextThreadPoolExecutor(
+                    max_workers=max_workers, thread_name_prefix=name
+                )
+                _executors[name] = executor
+    return executor
+
+
+def db_task(func: Callable) -> Callable:
+    """Wrap work submitted to a pool so the worker's DB connections are released"""
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        finally:
+            connections.close_all()
+
+    return wrapper
+
+
+class RateLimiter:
+    """Thread-safe token bucket: at most `rate` acquisitions per second on average"""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available, then take it"""
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait_for = (1 - self._tokens) / self.rate
+            time.sleep(wait_for)
+
+
+def get_rate_limiter(name: str, rate: float, burst: int = 1) -> RateLimiter:
+    """Return the process-wide rate limiter registered under name"""
+    limiter = _rate_limiters.get(name)
+    if limiter is None:
+        with _executors_lock:
+            limiter = _rate_limiters.get(name)
+            if limiter is None:
+                limiter = RateLimiter(rate, burst)
+                _rate_limiters[name] = limiter
+    return limiter
@@ -1,3 +1,4 @@
+import os
 import logging
 from django.conf import settings
 
@@ -16,12 +17,150 @@ SERPAPI_API_KEY = getattr(
 )
 SERPAPI_BASE_URL = "https://serpapi.com/search"
 
+# Shared HTTP transport
+HTTP_POOL_CONNECTIONS = getattr(settings, "HTTP_POOL_CONNECTIONS", 4)
+HTTP_POOL_MAXSIZE = getattr(settings, "HTTP_POOL_MAXSIZE", 20)
+HTTP_MAX_RETRIES = getattr(settings, "HTTP_MAX_RETRIES", 3)
+HTTP_BACKOFF_FACTOR = getattr(settings, "HTTP_BACKOFF_FACTOR", 0.5)
+HTTP_BACKOFF_JITTER = getattr(settings, "HTTP_BACKOFF_JITTER", 0.5)
+HTTP_RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# (connect, read) timeouts in seconds, per SerpAPI engine
+SERPAPI_TIMEOUTS = getattr(
+    settings,
+    "SERPAPI_TIMEOUTS",
+    {
+        "google_maps": (3.05, 10),
+        "google_maps_reviews": (3.05, 15),
+        "google_maps_photos": (3.05, 15),
+    },
+)
+
+# SerpAPI response cache (persistent, stale-while-revalidate)
+SERPAPI_CACHE_ENABLED = getattr(settings, "SERPAPI_CACHE_ENABLED", True)
+SERPAPI_CACHE_PATH = getattr(
+    settings,
+    "SERPAPI_CACHE_PATH",
+    os.path.join(getattr(settings, "BASE_DIR", "."), "serpapi_cache.sqlite3"),
+)
+SERPAPI_CACHE_MAX_ENTRIES = getattr(settings, "SERPAPI_CACHE_MAX_ENTRIES", 5000)
+# Seconds a response is considered fresh, per SerpAPI engine
+SERPAPI_CACHE_TTLS = getattr(
+    settings,
+    "SERPAPI_CACHE_TTLS",
+    {
+        "google_maps": 24 * 3600,
+        "google_maps_reviews": 6 * 3600,
+        "google_maps_photos": 7 * 24 * 3600,
+    },
+)
+SERPAPI_CACHE_DEFAULT_TTL = 3600
+# Seconds past the TTL during which a stale response is served while refreshing
+SERPAPI_CACHE_STALE_TTL = getattr(settings, "SERPAPI_CACHE_STALE_TTL", 7 * 24 * 3600)
+
+# How a search answered with local_results is resolved: "lazy" builds the
+# profile from the first local result and fetches place details only when
+# it lacks one of SERPAPI_LOCAL_REQUIRED_FIELDS; "details" always fetches them
+SERPAPI_LOCAL_RESOLUTION = getattr(settings, "SERPAPI_LOCAL_RESOLUTION", "lazy")
+# Local result fields the scorer reads ("hours" may come as "operating_hours");
+# photos are fetched by data_id either way, so "images" is not needed
+SERPAPI_LOCAL_REQUIRED_FIELDS = getattr(
+    settings,
+    "SERPAPI_LOCAL_REQUIRED_FIELDS",
+    (
+        "data_id",
+        "rating",
+        "reviews",
+        "type",
+        "address",
+        "phone",
+        "website",
+        "hours",
+        "extensions",
+    ),
+)
+
+# AI insights cache, keyed by a hash of the rendered request and prompt version
+AI_CACHE_ENABLED = getattr(settings, "AI_CACHE_ENABLED", True)
+AI_CACHE_PATH = getattr(
+    settings,
+    "AI_CACHE_PATH",
+    os.path.join(getattr(settings, "BASE_DIR", "."), "ai_insights_cache.sqlite3"),
+)
+AI_CACHE_MAX_ENTRIES = getattr(settings, "AI_CACHE_MAX_ENTRIES", 2000)
+AI_CACHE_TTL = getattr(settings, "AI_CACHE_TTL", 7 * 24 * 3600)  # seconds
+
+# Prompt serialization ("compact" minified JSON records or the legacy
+# "verbose" templates) and the most estimated prompt tokens one call may send
+AI_PROMPT_FORMAT = getattr(settings, "AI_PROMPT_FORMAT", "compact")
+AI_PROMPT_TOKEN_BUDGET = getattr(settings, "AI_PROMPT_TOKEN_BUDGET", 1500)
+
+# Batched insights: most businesses per request, estimated prompt tokens per
+# request, and completion tokens reserved for each business's answer
+AI_BATCH_MAX_ITEMS = getattr(settings, "AI_BATCH_MAX_ITEMS", 10)
+AI_BATCH_INPUT_TOKENS = getattr(settings, "AI_BATCH_INPUT_TOKENS", 3000)
+AI_BATCH_OUTPUT_TOKENS_PER_ITEM = getattr(
+    settings, "AI_BATCH_OUTPUT_TOKENS_PER_ITEM", 200
+)
+
 # Business Analysis Configuration
 DEFAULT_COMPETITOR_COUNT = 3
-REQUEST_TIMEOUT = 10
+REQUEST_TIMEOUT = 10  # Fallback for engines missing from SERPAPI_TIMEOUTS
 MAX_SUGGESTIONS = 5
 MAX_STRENGTHS = 5
 
+# Stored profiles younger than this are returned without calling SerpAPI
+BUSINESS_FRESHNESS_SECONDS = getattr(settings, "BUSINESS_FRESHNESS_SECONDS", 24 * 3600)
+
+# Concurrent enrichment (reviews + photos) once a place's data_id is known
+ENRICHMENT_MAX_WORKERS = getattr(settings, "ENRICHMENT_MAX_WORKERS", 8)
+ENRICHMENT_DEADLINE = getattr(settings, "ENRICHMENT_DEADLINE", 12)  # seconds
+# Reviews fetched per place by the reviews call (the engine caps it at 5)
+ENRICHMENT_REVIEWS = 5
+# Enrichment calls made per place: "standard" skips those whose data the
+# place payload already holds, "basic" makes none and "full" always makes both
+SERPAPI_ENRICHMENT_DETAIL = getattr(settings, "SERPAPI_ENRICHMENT_DETAIL", "standard")
+
+# Coalescing of concurrent lookups for the same business: lock files shared by
+# worker processes on this host, stripes per key namespace, and seconds to wait
+# for an in-flight lookup before doing the work anyway
+COALESCE_LOCK_DIR = getattr(
+    settings,
+    "COALESCE_LOCK_DIR",
+    os.path.join(getattr(settings, "BASE_DIR", "."), ".locks"),
+)
+COALESCE_LOCK_STRIPES = getattr(settings, "COALESCE_LOCK_STRIPES", 256)
+COALESCE_TIMEOUT = getattr(settings, "COALESCE_TIMEOUT", 30)
+
+# Lookups streaming their stages run on their own pool, one thread each
+RESOLUTION_MAX_WORKERS = getattr(settings, "RESOLUTION_MAX_WORKERS", 16)
+# Concurrent resolution of the businesses taking part in a comparison
+PROFILE_MAX_WORKERS = getattr(settings, "PROFILE_MAX_WORKERS", 8)
+# Most competitors one one-vs-many comparison may include
+COMPARE_MAX_COMPETITORS = getattr(settings, "COMPARE_MAX_COMPETITORS", 10)
+
+# Competitor discovery: most candidates returned, and most of them enriched
+# into full profiles (each costs the reviews and photos calls)
+COMPETITOR_MAX_LIMIT = getattr(settings, "COMPETITOR_MAX_LIMIT", 20)
+COMPETITOR_MAX_ENRICH = getattr(settings, "COMPETITOR_MAX_ENRICH", 5)
+
+# Batch analysis: process-wide worker cap, per-request default and max items,
+# and a global rate limit on analyses started per second (0 disables it)
+BATCH_MAX_WORKERS = getattr(settings, "BATCH_MAX_WORKERS", 16)
+BATCH_DEFAULT_CONCURRENCY = getattr(settings, "BATCH_DEFAULT_CONCURRENCY", 4)
+BATCH_MAX_ITEMS = getattr(settings, "BATCH_MAX_ITEMS", 500)
+BATCH_RATE_LIMIT = getattr(settings, "BATCH_RATE_LIMIT", 5.0)
+BATCH_RATE_BURST = getattr(settings, "BATCH_RATE_BURST", 5)
+
+# Background jobs (manage.py run_jobs): worker threads per process, attempts
+# before a job is marked failed, seconds a claimed job stays invisible to other
+# workers, base retry delay (doubled per attempt) and idle poll interval
+JOB_WORKER_CONCURRENCY = getattr(settings, "JOB_WORKER_CONCURRENCY", 4)
+JOB_MAX_ATTEMPTS = getattr(settings, "JOB_MAX_ATTEMPTS", 3)
+JOB_VISIBILITY_TIMEOUT = getattr(settings, "JOB_VISIBILITY_TIMEOUT", 300)
+JOB_RETRY_DELAY = getattr(settings, "JOB_RETRY_DELAY", 10)
+JOB_POLL_INTERVAL = getattr(settings, "JOB_POLL_INTERVAL", 1.0)
+
 # Scoring weights
 SCORE_WEIGHTS = {
     "reviews": 0.4,  # 40% of score
@@ -0,0 +1,169 @@
+from typing import Dict, Any, NamedTuple, Optional
+
+
+class BusinessFeatures(NamedTuple):
+    """
+    The profile values scoring and AI prompts read, without the images,
+    reviews and business_hours blobs. A NamedTuple, so records are immutable
+    and slotted (no per-instance __dict__). The JSON fields are reduced to a
+    flag or a count.
+    """
+
+    pk: Optional[int]
+    name: str
+    category: Optional[str]
+    cuisine_type: Optional[str]
+    price_range: Optional[str]
+    established_year: Optional[int]
+    city: Optional[str]
+    state: Optional[str]
+    website: Optional[str]
+    has_phone: bool
+    has_email: bool
+    has_address: bool
+    has_description_text: bool
+    is_open: bool
+    temporarily_closed: bool
+    has_hours: bool
+    has_business_hours: bool
+    offers_delivery: bool
+    offers_takeout: bool
+    offers_dine_in: bool
+    accepts_reservations: bool
+    review_count: int
+    google_reviews: int
+    yelp_reviews: int
+    average_rating: float
+    image_count: int
+    has_description: bool
+    has_menu: bool
+    has_menu_url: bool
+    has_parking: bool
+    wheelchair_accessible: bool
+    has_wifi: bool
+    accepts_credit_cards: bool
+    outdoor_seating: bool
+    special_features_count: int
+    popular_dishes_count: int
+    has_facebook: bool
+    has_instagram: bool
+    has_twitter: bool
+    # The profile's score when known, as given to from_profile
+    score: Optional[float]
+
+    @classmethod
+    def from_profile(
+        cls, business, score: Optional[float] = None
+    ) -> "BusinessFeatures":
+        """The features of an in-memory BusinessProfile"""
+        return cls(
+            business.pk,
+            business.name,
+            business.category,
+            business.cuisine_type,
+            business.price_range,
+            business.established_year,
+            business.city,
+            business.state,
+            business.website,
+            bool(business.phone),
+            bool(business.email),
+            bool(business.address),
+            bool(business.description),
+            business.is_open,
+            business.temporarily_closed,
+            business.has_hours,
+            bool(business.business_hours),
+            business.offers_delivery,
+            business.offers_takeout,
+            business.offers_dine_in,
+            business.accepts_reservations,
+            business.review_count,
+            business.google_reviews,
+            business.yelp_reviews,
+            float(business.average_rating),
+            business.image_count,
+            business.has_description,
+            business.has_menu,
+            bool(business.menu_url),
+            business.has_parking,
+            business.wheelchair_accessible,
+            business.has_wifi,
+            business.accepts_credit_cards,
+            business.outdoor_seating,
+            len(business.special_features),
+            len(business.popular_dishes),
+            bool(business.facebook_url),
+            bool(business.instagram_url),
+            bool(business.twitter_url),
+            score,
+        )
+
+    @property
+    def total_reviews(self) -> int:
+        return self.google_reviews + self.yelp_reviews + self.review_count
+
+    @property
+    def service_options_count(self) -> int:
+        return (
+            bool(self.offers_dine_in)
+            + bool(self.offers_takeout)
+            + bool(self.offers_delivery)
+        )
+
+    @property
+    def social_media_count(self) -> int:
+        return self.has_facebook + self.has_instagram + self.has_twitter
+
+    def prompt_data(self, score: Optional[float] = None) -> Dict[str, Any]:
+        """Business data for AI analysis; score defaults to the record's"""
+        return {
+            # Basic Information
+            "name": self.name,
+            "category": self.category,
+            "cuisine_type": self.cuisine_type,
+            "price_range": self.price_range,
+            "established_year": self.established_year,
+            # Contact & Location
+            "has_phone": self.has_phone,
+            "has_email": self.has_email,
+            "has_address": self.has_address,
+            "city": self.city,
+            "state": self.state,
+            "website": self.website,
+            # Business Operations
+            "is_open": self.is_open,
+            "temporarily_closed": self.temporarily_closed,
+            "has_hours": self.has_hours,
+            "has_business_hours": self.has_business_hours,
+            # Service Options
+            "offers_delivery": self.offers_delivery,
+            "offers_takeout": self.offers_takeout,
+            "offers_dine_in": self.offers_dine_in,
+            "accepts_reservations": self.accepts_reservations,
+            "service_options_count": self.service_options_count,
+            # Review Metrics
+            "review_count": self.review_count,
+            "google_reviews": self.google_reviews,
+            "yelp_reviews": self.yelp_reviews,
+            "total_reviews": self.total_reviews,
+            "average_rating": self.average_rating,
+            # Content Metrics
+            "image_count": self.image_count,
+            "has_description": self.has_description,
+            "has_menu": self.has_menu,
+            "has_menu_url": self.has_menu_url,
+            # Features & Amenities
+            "has_parking": self.has_parking,
+            "wheelchair_accessible": self.wheelchair_accessible,
+            "has_wifi": self.has_wifi,
+            "accepts_credit_cards": self.accepts_credit_cards,
+            "outdoor_seating": self.outdoor_seating,
+            "special_features_count": self.special_features_count,
+            "popular_dishes_count": self.popular_dishes_count,
+            # Online Presence
+            "has_social_media": self.social_media_count > 0,
+            "social_media_count": self.social_media_count,
+            # Overall Score
+            "score": self.score if score is None else score,
+        }
@@ -0,0 +1,75 @@
+import logging
+from dataclasses import dataclass
+from typing import Dict, Any, Optional, Tuple
+from .config import SERPAPI_ENRICHMENT_DETAIL, ENRICHMENT_REVIEWS
+
+logger = logging.getLogger(__name__)
+
+# "basic": the place payload only; "standard": fetch only what the payload
+# lacks; "full": always fetch reviews and photos
+DETAIL_LEVELS = ("basic", "standard", "full")
+ENRICHMENT_CALLS = ("reviews", "photos")
+
+
+@dataclass(frozen=True)
+class FetchPlan:
+    """The enrichment calls to make for a place, and those not needed"""
+
+    data_id: Optional[str]
+    calls: Tuple[str, ...]
+
+    @property
+    def skipped(self) -> Tuple[str, ...]:
+        if not self.data_id:
+            return ()
+        return tuple(call for call in ENRICHMENT_CALLS if call not in self.calls)
+
+    def __contains__(self, call: str) -> bool:
+        return call in self.calls
+
+
+class FetchPlanner:
+    """Decides which SerpAPI enrichment calls a place payload still needs"""
+
+    def __init__(self, detail: str = SERPAPI_ENRICHMENT_DETAIL):
+        if detail not in DETAIL_LEVELS:
+            logger.warning(f"Unknown enrichment detail {detail!r}; using standard")
+            detail = "standard"
+        self.detail = detail
+
+    def plan(self, place: Dict[str, Any], detail: Optional[str] = None) -> FetchPlan:
+        """The minimum calls that give place the requested level of detail"""
+        detail = detail or self.detail
+        data_id = place.get("data_id")
+        if not data_id or detail == "basic":
+            return FetchPlan(data_id, ())
+        if detail == "full":
+            return FetchPlan(data_id, ENRICHMENT_CALLS)
+
+        calls = []
+        if not self._has_reviews(place):
+            calls.append("reviews")
+        if not self._has_images(place):
+            calls.append("photos")
+        return FetchPlan(data_id, tuple(calls))
+
+    @staticmethod
+    def _has_reviews(place: Dict[str, Any]) -> bool:
+        """Whether the payload holds as many reviews as the reviews call returns"""
+        user_reviews = place.get("user_reviews") or {}
+        most_relevant = (
+            user_reviews.get("most_relevant") if isinstance(user_reviews, dict) else []
+        )
+        held = sum(1 for review in most_relevant or [] if isinstance(review, dict))
+        total = place.get("reviews")
+        if isinstance(total, int) and total >= 0:
+            return held >= min(ENRICHMENT_REVIEWS, total)
+        return held >= ENRICHMENT_REVIEWS
+
+    @staticmethod
+    def _has_images(place: Dict[str, Any]) -> bool:
+        """Whether the payload's images fill business.images, making photos unused"""
+        return any(
+            isinstance(image, dict) and image.get("thumbnail")
+            for image in (place.get("images") or [])[:10]
+        )
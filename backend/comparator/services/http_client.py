@@ -0,0 +1,134 @@
+import random
+import asyncio
+import threading
+import weakref
+import logging
+from typing import Dict, Any
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from .config import (
+    HTTP_POOL_CONNECTIONS,
+    HTTP_POOL_MAXSIZE,
+    HTTP_MAX_RETRIES,
+    HTTP_BACKOFF_FACTOR,
+    HTTP_BACKOFF_JITTER,
+    HTTP_RETRY_STATUSES,
+)
+
+logger = logging.getLogger(__name__)
+
+_session = None
+_adapter = None
+_session_lock = threading.Lock()
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def get_http_session() -> requests.Session:
+    """Return the process-wide pooled, keep-alive session used for outbound calls"""
+    global _session, _adapter
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                retry = Retry(
+                    total=HTTP_MAX_RETRIES,
+                    backoff_factor=HTTP_BACKOFF_FACTOR,
+                    backoff_jitter=HTTP_BACKOFF_JITTER,
+                    status_forcelist=HTTP_RETRY_STATUSES,
+                    allowed_methods=frozenset(["GET"]),
+                    respect_retry_after_header=True,
+                    raise_on_status=False,
+                )
+                adapter = HTTPAdapter(
+                    pool_connections=HTTP_POOL_CONNECTIONS,
+                    pool_maxsize=HTTP_POOL_MAXSIZE,
+                    max_retries=retry,
+                )
+                session = requests.Session()
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _adapter = adapter
+                _session = session
+    return _session
+
+
+def transport_stats() -> Dict[str, Any]:
+    """Return connection pool counters; requests minus connections are reuses"""
+    if _adapter is None:
+        return {
+            "pools": 0,
+            "connections_opened": 0,
+            "requests": 0,
+            "reused": 0,
+            "reuse_ratio": 0.0,
+        }
+
+    pools = _adapter.poolmanager.pools
+    connections = 0
+    total_requests = 0
+    for key in list(pools.keys()):
+        pool = pools.get(key)
+        if pool is None:
+            continue
+        connections += pool.num_connections
+        total_requests += pool.num_requests
+
+    return {
+        "pools": len(pools),
+        "connections_opened": connections,
+        "requests": total_requests,
+        "reused": max(0, total_requests - connections),
+        "reuse_ratio": (
+            round(1 - connections / total_requests, 4) if total_requests else 0.0
+        ),
+    }
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """
+    Return the pooled, keep-alive async client for the running event loop.
+    httpx clients are bound to the loop they were first used on.
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=HTTP_POOL_MAXSIZE,
+                max_keepalive_connections=HTTP_POOL_MAXSIZE,
+            ),
+        )
+        _async_clients[loop] = client
+    return client
+
+
+async def async_get_with_retries(
+    url: str, params: Dict[str, Any], timeout
+) -> httpx.Response:
+    """GET with the same jittered exponential backoff on 429/5xx as the sync session"""
+    client = get_async_http_client()
+    if isinstance(timeout, tuple):
+        timeout = httpx.Timeout(timeout[1], connect=timeout[0])
+
+    for attempt in range(HTTP_MAX_RETRIES + 1):
+        delay = _backoff_delay(attempt)
+        try:
+            response = await client.get(url, params=params, timeout=timeout)
+        except httpx.TransportError:
+            if attempt == HTTP_MAX_RETRIES:
+                raise
+        else:
+            if (
+                response.status_code not in HTTP_RETRY_STATUSES
+                or attempt == HTTP_MAX_RETRIES
+            ):
+                return response
+            retry_after = response.headers.get("Retry-After", "")
+            if retry_after.isdigit():
+                delay = float(retry_after)
+        await asyncio.sleep(delay)
+
+
+def _backoff_delay(attempt: int) -> float:
+    return HTTP_BACKOFF_FACTOR * (2**attempt) + random.uniform(0, HTTP_BACKOFF_JITTER)
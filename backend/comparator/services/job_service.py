@@ -0,0 +1,273 @@
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import timedelta
+from typing import Dict, Any, Optional, TYPE_CHECKING
+from django.db.models import F, Q
+from django.utils import timezone
+from ..models import AnalysisJob
+from .usage import track_usage
+from .concurrency import db_task
+from .config import (
+    JOB_MAX_ATTEMPTS,
+    JOB_VISIBILITY_TIMEOUT,
+    JOB_RETRY_DELAY,
+    JOB_POLL_INTERVAL,
+)
+
+if TYPE_CHECKING:
+    from .business_analysis_service import BusinessAnalysisService
+
+logger = logging.getLogger(__name__)
+
+# Candidates fetched per claim attempt; losing a race moves on to the next one
+CLAIM_BATCH_SIZE = 10
+# Heartbeats per visibility timeout while a job runs, so a slow analysis keeps
+# its claim even if one heartbeat is delayed
+HEARTBEATS_PER_TIMEOUT = 3
+
+
+class JobService:
+    """Service for queueing analyses in the database and working them off"""
+
+    def __init__(
+        self,
+        analysis_service: Optional["BusinessAnalysisService"] = None,
+        visibility_timeout: int = JOB_VISIBILITY_TIMEOUT,
+    ):
+        if analysis_service is None:
+            from .business_analysis_service import BusinessAnalysisService
+
+            analysis_service = BusinessAnalysisService()
+        self.analysis_service = analysis_service
+        self.visibility_timeout = visibility_timeout
+
+    def enqueue_analysis(
+        self, business_name: str, website: Optional[str] = None
+    ) -> AnalysisJob:
+        """Queue analyze_business for a worker"""
+        return AnalysisJob.objects.create(
+            kind=AnalysisJob.KIND_ANALYZE,
+            payload={"business_name": business_name, "website": website},
+            max_attempts=JOB_MAX_ATTEMPTS,
+        )
+
+    def enqueue_comparison(
+        self,
+        your_business: str,
+        your_website: Optional[str],
+        competitor_business: str,
+        competitor_website: Optional[str] = None,
+    ) -> AnalysisJob:
+        """Queue compare_businesses for a worker"""
+        return AnalysisJob.objects.create(
+            kind=AnalysisJob.KIND_COMPARE,
+            payload={
+                "your_business": your_business,
+                "your_website": your_website,
+                "competitor_business": competitor_business,
+                "competitor_website": competitor_website,
+            },
+            max_attempts=JOB_MAX_ATTEMPTS,
+        )
+
+    def get_job(self, job_id) -> Optional[AnalysisJob]:
+        return AnalysisJob.objects.filter(pk=job_id).first()
+
+    def format_job(self, job: AnalysisJob) -> Dict[str, Any]:
+        """Format a job for API response; result is only present once succeeded"""
+        return {
+            "id": str(job.id),
+            "kind": job.kind,
+            "status": job.status,
+            "attempts": job.attempts,
+            "max_attempts": job.max_attempts,
+            "result": job.result,
+            "error": job.error or None,
+            "created_at": job.created_at,
+            "finished_at": job.finished_at,
+        }
+
+    def claim(self, worker_id: str) -> Optional[AnalysisJob]:
+        """
+        Claim the next runnable job: a queued job that is due, or a running one
+        whose visibility timeout lapsed (its worker died). The claim is an
+        optimistic UPDATE guarded by the attempts counter, so of two workers
+        racing for the same row exactly one wins, without row locks.
+        """
+        now = timezone.now()
+        candidates = (
+            AnalysisJob.objects.filter(
+                Q(status=AnalysisJob.STATUS_QUEUED, available_at__lte=now)
+                | Q(status=AnalysisJob.STATUS_RUNNING, locked_until__lt=now)
+            )
+            .order_by("available_at")
+            .values_list("id", "status", "attempts", "max_attempts")[:CLAIM_BATCH_SIZE]
+        )
+
+        for job_id, job_status, attempts, max_attempts in candidates:
+            guard = AnalysisJob.objects.filter(
+                pk=job_id, status=job_status, attempts=attempts
+            )
+            if job_status == AnalysisJob.STATUS_RUNNING and attempts >= max_attempts:
+                guard.update(
+                    status=AnalysisJob.STATUS_FAILED,
+                    error="Worker did not finish within the visibility timeout",
+                    locked_by="",
+                    locked_until=None,
+                    finished_at=now,
+                    updated_at=now,
+                )
+                continue
+
+            claimed = guard.update(
+                status=AnalysisJob.STATUS_RUNNING,
+                attempts=F("attempts") + 1,
+                locked_by=worker_id,
+                locked_until=now + timedelta(seconds=self.visibility_timeout),
+                updated_at=now,
+            )
+            if claimed:
+                return AnalysisJob.objects.get(pk=job_id)
+        return None
+
+    def process(self, job: AnalysisJob) -> bool:
+        """Run a claimed job and record the outcome; returns True on success"""
+        with track_usage() as usage, self._keep_claimed(job):
+            try:
+                result = self._execute(job)
+            except Exception as e:
+                logger.error(f"Job {job.id} attempt {job.attempts} failed: {str(e)}")
+                self._fail(job, str(e))
+                return False
+            finally:
+                logger.info(f"SerpAPI usage for job {job.id}: {usage.summary()}")
+
+        self._finish(
+            job,
+            status=AnalysisJob.STATUS_SUCCEEDED,
+            result=result,
+            error="",
+            finished_at=timezone.now(),
+        )
+        return True
+
+    def run_worker(
+        self,
+        worker_id: str,
+        stop_event: threading.Event,
+        poll_interval: float = JOB_POLL_INTERVAL,
+        once: bool = False,
+    ) -> int:
+        """
+        Claim and process jobs until stop_event is set (or, with once, until
+        no job is runnable). Returns the number of jobs processed.
+        """
+        processed = 0
+        while not stop_event.is_set():
+            job = self.claim(worker_id)
+            if job is None:
+                if once:
+                    break
+                stop_event.wait(poll_interval)
+                continue
+            try:
+                self.process(job)
+            except Exception as e:
+                # Recording the outcome failed (e.g. the database went away);
+                # the claim lapses and the job is retried once it times out
+                logger.error(f"Could not record the outcome of job {job.id}: {str(e)}")
+            processed += 1
+        return processed
+
+    def heartbeat(self, job: AnalysisJob) -> bool:
+        """
+        Push a running job's visibility timeout out again; returns False once
+        this worker no longer holds the claim
+        """
+        now = timezone.now()
+        return bool(
+            self._held(job).update(
+                locked_until=now + timedelta(seconds=self.visibility_timeout),
+                updated_at=now,
+            )
+        )
+
+    @contextmanager
+    def _keep_claimed(self, job: AnalysisJob):
+        """Heartbeat the job from a helper thread while the block runs"""
+        done = threading.Event()
+        interval = self.visibility_timeout / HEARTBEATS_PER_TIMEOUT
+
+        def beat():
+            while not done.wait(interval):
+                try:
+                    if not self.heartbeat(job):
+                        return
+                except Exception as e:
+                    logger.error(f"Heartbeat failed for job {job.id}: {str(e)}")
+
+        thread = threading.Thread(
+            target=db_task(beat), name=f"heartbeat-{job.id}", daemon=True
+        )
+        thread.start()
+        try:
+            yield
+        finally:
+            done.set()
+            thread.join()
+
+    def _held(self, job: AnalysisJob):
+        """The job's row, provided this worker still holds its claim"""
+        return AnalysisJob.objects.filter(
+            pk=job.pk,
+            status=AnalysisJob.STATUS_RUNNING,
+            locked_by=job.locked_by,
+            attempts=job.attempts,
+        )
+
+    def _execute(self, job: AnalysisJob) -> Dict[str, Any]:
+        payload = job.payload
+        if job.kind == AnalysisJob.KIND_ANALYZE:
+            return self.analysis_service.analyze_business(
+                payload["business_name"], payload.get("website")
+            )
+        if job.kind == AnalysisJob.KIND_COMPARE:
+            comparison = self.analysis_service.compare_businesses(
+                payload["your_business"],
+                payload.get("your_website"),
+                payload["competitor_business"],
+                payload.get("competitor_website"),
+            )
+            if comparison.get("errors"):
+                failed = ", ".join(comparison["errors"])
+                raise RuntimeError(f"Comparison incomplete: could not resolve {failed}")
+            return comparison
+        raise ValueError(f"Unknown job kind: {job.kind}")
+
+    def _fail(self, job: AnalysisJob, error: str):
+        """Requeue with exponential backoff, or fail for good when out of attempts"""
+        now = timezone.now()
+        if job.attempts < job.max_attempts:
+            delay = JOB_RETRY_DELAY * (2 ** (job.attempts - 1))
+            self._finish(
+                job,
+                status=AnalysisJob.STATUS_QUEUED,
+                error=error,
+                available_at=now + timedelta(seconds=delay),
+            )
+        else:
+            self._finish(
+                job, status=AnalysisJob.STATUS_FAILED, error=error, finished_at=now
+            )
+
+    def _finish(self, job: AnalysisJob, **fields):
+        """Release the job, provided this worker still holds its claim"""
+        updated = self._held(job).update(
+            locked_by="", locked_until=None, updated_at=timezone.now(), **fields
+        )
+        if not updated:
+            logger.warning(
+                f"Job {job.id} was reclaimed after its visibility timeout; "
+                "discarding this attempt's outcome"
+            )
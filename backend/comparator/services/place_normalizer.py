@@ -0,0 +1,239 @@
+from typing import Dict, Any, List, TypedDict
+
+# Image titles that show a menu
+MENU_IMAGE_TITLES = frozenset(["menu", "food & drink"])
+# Offerings that suggest a menu
+MENU_KEYWORDS = ("menu", "food", "drinks", "coffee", "breakfast", "lunch", "dinner")
+
+# Extension sections whose lowercased items set a flag when they contain a
+# keyword: section -> ((flag, keyword), ...)
+KEYWORD_SECTIONS = {
+    "accessibility": (("wheelchair_accessible", "wheelchair"),),
+    "amenities": (("has_wifi", "wi-fi"), ("has_parking", "parking")),
+    "payments": (("accepts_credit_cards", "credit"),),
+}
+# Options listed under an extensions service_options section, and their flags
+SERVICE_OPTIONS = (
+    ("offers_takeout", "Takeout"),
+    ("offers_dine_in", "Dine-in"),
+    ("offers_delivery", "Delivery"),
+)
+
+
+class PlaceRecord(TypedDict, total=False):
+    """
+    Profile fields derived from one SerpAPI place payload, keyed by
+    BusinessProfile attribute. business_hours, menu_url and the address
+    parts (city, country, postal_code) are only present when the payload
+    provides them; every other key always is.
+    """
+
+    address: str
+    phone: str
+    website: str
+    data_id: str
+    latitude: Any
+    longitude: Any
+    average_rating: float
+    review_count: int
+    image_count: int
+    images: List[Dict[str, Any]]
+    has_hours: bool
+    business_hours: Any
+    category: str
+    description: str
+    has_description: bool
+    has_menu: bool
+    menu_url: str
+    offers_delivery: bool
+    offers_takeout: bool
+    offers_dine_in: bool
+    accepts_reservations: bool
+    has_parking: bool
+    wheelchair_accessible: bool
+    has_wifi: bool
+    outdoor_seating: bool
+    accepts_credit_cards: bool
+    special_features: List[str]
+    popular_dishes: List[str]
+    price_range: str
+    cuisine_type: str
+    is_open: bool
+    temporarily_closed: bool
+    city: str
+    country: str
+    postal_code: str
+
+
+def normalize_place(place: Dict[str, Any]) -> PlaceRecord:
+    """Build a PlaceRecord from a place payload, walking its extensions once"""
+    address = place.get("address", "")
+    website = place.get("website", "")
+    gps = place.get("gps_coordinates") or {}
+
+    images = place.get("images", [])
+    has_menu = False
+    for image in images:
+        if image.get("title", "").lower() in MENU_IMAGE_TITLES:
+            has_menu = True
+            break
+
+    types = place.get("type", [])
+    if types:
+        category = types[0] if isinstance(types, list) else str(types)
+    else:
+        category = "Business"
+
+    service_options = place.get("service_options", {})
+    price = place.get("price", "")
+    open_state = place.get("open_state", "")
+
+    record: PlaceRecord = {
+        "address": address,
+        "phone": place.get("phone", ""),
+        "website": website,
+        "data_id": place.get("data_id", ""),
+        "latitude": gps.get("latitude"),
+        "longitude": gps.get("longitude"),
+        "average_rating": place.get("rating") or 0.0,
+        "review_count": place.get("reviews", 0),
+        "image_count": len(images),
+        "images": [
+            {
+                "url": image["thumbnail"],
+                "title": image.get("title", ""),
+                "source": "Google",
+            }
+            for image in images[:10]
+            if isinstance(image, dict) and image.get("thumbnail")
+        ],
+        "category": category,
+        "offers_delivery": service_options.get("delivery", False),
+        "offers_takeout": service_options.get("takeout", False),
+        "offers_dine_in": service_options.get("dine_in", False),
+        "accepts_reservations": False,
+        "has_parking": False,
+        "wheelchair_accessible": False,
+        "has_wifi": False,
+        "outdoor_seating": False,
+        "accepts_credit_cards": False,
+        "price_range": price if price else "$$",
+        "is_open": "open" in open_state.lower() if open_state else True,
+        "temporarily_closed": "closed" in open_state.lower() if open_state else False,
+    }
+
+    hours = place.get("hours", [])
+    record["has_hours"] = has_hours = len(hours) > 0
+    if has_hours:
+        record["business_hours"] = hours
+
+    # The single walk over extensions. Each section's items are joined and
+    # lowercased once, then tested for every keyword of that section.
+    highlights, offerings, popular_for = [], [], []
+    special_features, popular_dishes = [], []
+    for ext in place.get("extensions", []):
+        if not isinstance(ext, dict):
+            continue
+        for section, items in ext.items():
+            keywords = KEYWORD_SECTIONS.get(section)
+            if keywords is not None:
+                text = "\n".join(items).lower()
+                for flag, keyword in keywords:
+                    if keyword in text:
+                        record[flag] = True
+            elif section == "service_options":
+                for flag, option in SERVICE_OPTIONS:
+                    if option in items:
+                        record[flag] = True
+            elif section == "highlights":
+                special_features = items
+                highlights.extend(items)
+            elif section == "offerings":
+                popular_dishes = items
+                offerings.extend(items)
+                if not has_menu:
+                    text = " ".join(items).lower()
+                    for keyword in MENU_KEYWORDS:
+                        if keyword in text:
+                            has_menu = True
+                            break
+            elif section == "popular_for":
+                popular_for.extend(items)
+    record["special_features"] = special_features
+    record["popular_dishes"] = popular_dishes
+
+    description = place.get("description") or _describe(
+        place, highlights, popular_for, offerings
+    )
+    record["description"] = description
+    record["has_description"] = bool(description)
+
+    record["has_menu"] = has_menu
+    if has_menu:
+        record["menu_url"] = place.get("order_online_link", website)
+
+    if category and "cafe" in category.lower():
+        record["cuisine_type"] = "Coffee & Cafe"
+    else:
+        record["cuisine_type"] = ""
+        for cat in types:
+            if isinstance(cat, str) and "restaurant" in cat.lower():
+                record["cuisine_type"] = "Restaurant"
+                break
+
+    if gps:
+        address_parts = address.split(", ") if address else []
+        locality = address_parts[-2].split() if len(address_parts) >= 3 else []
+        # An empty locality part leaves the address fields unset
+        if locality:
+            record["city"] = locality[0]
+            record["country"] = address_parts[-1]
+            record["postal_code"] = locality[-1] if len(locality) > 1 else ""
+
+    return record
+
+
+def apply_record(business, record: PlaceRecord):
+    """Write a PlaceRecord onto a BusinessProfile"""
+    for name, value in record.items():
+        setattr(business, name, value)
+
+
+def payload_reviews(place: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """The reviews embedded in a place payload, in the profile's format"""
+    user_reviews = place.get("user_reviews", {})
+    most_relevant = (
+        user_reviews.get("most_relevant", []) if isinstance(user_reviews, dict) else []
+    )
+    return [
+        {
+            "rating": review.get("rating", 0),
+            "text": review.get("description", ""),
+            "author": review.get("username", "Anonymous"),
+            "date": review.get("date", ""),
+            "source": "Google",
+        }
+        for review in most_relevant[:5]
+        if isinstance(review, dict)
+    ]
+
+
+def _describe(
+    place: Dict[str, Any],
+    highlights: List[str],
+    popular_for: List[str],
+    offerings: List[str],
+) -> str:
+    """A description built from the extensions, or a generic one"""
+    parts = []
+    if highlights:
+        parts.append(f"Known for: {', '.join(highlights[:3])}")
+    if popular_for:
+        parts.append(f"Popular for: {', '.join(popular_for[:3])}")
+    if offerings:
+        parts.append(f"Offers: {', '.join(offerings[:3])}")
+    if parts:
+        return ". ".join(parts) + "."
+
+    category = place["type"][0] if place.get("type") else "business"
+    return f"A {category.lower()} serving customers in the local area."
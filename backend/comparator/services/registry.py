@@ -0,0 +1,126 @@
+import threading
+import logging
+from typing import Callable, Dict, Any
+
+logger = logging.getLogger(__name__)
+
+
+class ServiceRegistry:
+    """Lazily initialised, thread-safe container of shared service instances"""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._instances: Dict[str, Any] = {}
+
+    def _get(self, name: str, factory: Callable[[], Any]) -> Any:
+        instance = self._instances.get(name)
+        if instance is None:
+            with self._lock:
+                instance = self._instances.get(name)
+                if instance is None:
+                    instance = factory()
+                    self._instances[name] = instance
+                    logger.debug(f"Initialised shared {name} service")
+        return instance
+
+    @property
+    def serpapi(self):
+        from .serpapi_service import SerpAPIService
+
+        return self._get("serpapi", SerpAPIService)
+
+    @property
+    def scoring(self):
+        from .scoring_service import ScoringService
+
+        return self._get("scoring", ScoringService)
+
+    @property
+    def ai(self):
+        from .ai_service import AIService
+
+        return self._get("ai", AIService)
+
+    @property
+    def snapshots(self):
+        from .snapshot_service import SnapshotService
+
+        return self._get("snapshots", SnapshotService)
+
+    @property
+    def cohorts(self):
+        from .cohort_service import CohortService
+
+        return self._get("cohorts", CohortService)
+
+    @property
+    def business(self):
+        from .business_service import BusinessService
+
+        return self._get(
+            "business",
+            lambda: BusinessService(
+                serpapi_service=self.serpapi,
+                scoring_service=self.scoring,
+                snapshot_service=self.snapshots,
+            ),
+        )
+
+    @property
+    def comparison(self):
+        from .comparison_service import ComparisonService
+
+        return self._get(
+            "comparison",
+            lambda: ComparisonService(
+                business_service=self.business,
+                ai_service=self.ai,
+                scoring_service=self.scoring,
+            ),
+        )
+
+    @property
+    def competitors(self):
+        from .competitor_service import CompetitorService
+
+        return self._get(
+            "competitors",
+            lambda: CompetitorService(
+                business_service=self.business, scoring_service=self.scoring
+            ),
+        )
+
+    @property
+    def analysis(self):
+        from .business_analysis_service import BusinessAnalysisService
+
+        return self._get(
+            "analysis",
+            lambda: BusinessAnalysisService(
+                business_service=self.business,
+                ai_service=self.ai,
+                scoring_service=self.scoring,
+                comparison_service=self.comparison,
+                cohort_service=self.cohorts,
+                competitor_service=self.competitors,
+            ),
+        )
+
+    @property
+    def jobs(self):
+        from .job_service import JobService
+
+        return self._get("jobs", lambda: JobService(analysis_service=self.analysis))
+
+    def reset(self):
+        """Drop all instances so the next access rebuilds them"""
+        with self._lock:
+            self._instances.clear()
+
+
+_registry = ServiceRegistry()
+
+
+def get_services() -> ServiceRegistry:
+    """Return the registry shared by every request in this worker process"""
+    return _registry
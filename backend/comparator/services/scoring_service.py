@@ -1,33 +1,436 @@
-from typing import TYPE_CHECKING
+import json
+import hashlib
+from functools import reduce
+from operator import add
+from typing import (
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+    TYPE_CHECKING,
+)
+import numpy as np
+from django.db import connections, transaction
+from django.db.models import (
+    Case,
+    F,
+    IntegerField,
+    Q,
+    QuerySet,
+    TextField,
+    Value,
+    When,
+)
+from django.db.models.functions import Cast, Round
 from .config import SCORE_WEIGHTS
+from .features import BusinessFeatures
 
 if TYPE_CHECKING:
     from ..models import BusinessProfile
 
+# Rows scored per block by score_many
+SCORE_BATCH_SIZE = 50_000
+
+# How an empty JSON value ({} / [] / ...) is stored; bool() of these is False
+EMPTY_JSON_TEXT = ["{}", "[]", '""', "null", "0", "false"]
+JSON_FIELDS = ["business_hours", "special_features", "popular_dishes"]
+
+
+def is_set(name: str) -> Q:
+    """SQL equivalent of bool() for a nullable text column"""
+    return Q(**{f"{name}__isnull": False}) & ~Q(**{name: ""})
+
+
+def is_set_json(name: str) -> Q:
+    """SQL equivalent of bool() for a JSON column, via its stored text"""
+    return ~Q(**{f"{name}_text__in": EMPTY_JSON_TEXT})
+
+
+def _count_true(*conditions: Q):
+    """Number of conditions that hold, computed in SQL as an integer"""
+    return reduce(
+        add,
+        (
+            Case(When(condition, then=Value(1)), default=Value(0))
+            for condition in conditions
+        ),
+    )
+
+
+class CompletenessItem(NamedTuple):
+    """One content completeness check, as SQL for score_many and as Python"""
+
+    condition: Q
+    holds: Callable[[BusinessFeatures], bool]
+
+
+# The content score's groups, in the order their scores are summed:
+# (items, group weight). The scalar and vectorized scorers both read this.
+COMPLETENESS_GROUPS: Dict[str, Tuple[List[CompletenessItem], float]] = {
+    "basic_info": (
+        [
+            CompletenessItem(is_set("phone"), lambda f: f.has_phone),
+            CompletenessItem(is_set("email"), lambda f: f.has_email),
+            CompletenessItem(is_set("address"), lambda f: f.has_address),
+            CompletenessItem(is_set("city"), lambda f: bool(f.city)),
+            CompletenessItem(is_set("state"), lambda f: bool(f.state)),
+            CompletenessItem(is_set("website"), lambda f: bool(f.website)),
+            CompletenessItem(is_set("description"), lambda f: f.has_description_text),
+            CompletenessItem(is_set("category"), lambda f: bool(f.category)),
+        ],
+        0.4,
+    ),
+    "operations": (
+        [
+            CompletenessItem(Q(has_hours=True), lambda f: f.has_hours),
+            CompletenessItem(Q(is_open=True), lambda f: f.is_open),
+            CompletenessItem(
+                is_set_json("business_hours"), lambda f: f.has_business_hours
+            ),
+            CompletenessItem(
+                Q(established_year__isnull=False) & ~Q(established_year=0),
+                lambda f: bool(f.established_year),
+            ),
+        ],
+        0.3,
+    ),
+    "content": (
+        [
+            CompletenessItem(Q(has_description=True), lambda f: f.has_description),
+            CompletenessItem(Q(has_menu=True), lambda f: f.has_menu),
+            CompletenessItem(Q(image_count__gt=10), lambda f: f.image_count > 10),
+            # Bonus for a menu URL when there is a menu
+            CompletenessItem(
+                Q(has_menu=False) | is_set("menu_url"),
+                lambda f: f.has_menu_url if f.has_menu else True,
+            ),
+        ],
+        0.2,
+    ),
+    "service": (
+        [
+            CompletenessItem(
+                Q(offers_dine_in=True)
+                | Q(offers_takeout=True)
+                | Q(offers_delivery=True),
+                lambda f: f.offers_dine_in or f.offers_takeout or f.offers_delivery,
+            ),
+            CompletenessItem(is_set("price_range"), lambda f: bool(f.price_range)),
+            CompletenessItem(is_set("cuisine_type"), lambda f: bool(f.cuisine_type)),
+        ],
+        0.1,
+    ),
+    # Features, amenities and online presence are bonus points (up to 10%)
+    "features": (
+        [
+            CompletenessItem(Q(has_parking=True), lambda f: f.has_parking),
+            CompletenessItem(
+                Q(wheelchair_accessible=True), lambda f: f.wheelchair_accessible
+            ),
+            CompletenessItem(Q(has_wifi=True), lambda f: f.has_wifi),
+            CompletenessItem(
+                Q(accepts_credit_cards=True), lambda f: f.accepts_credit_cards
+            ),
+            CompletenessItem(
+                is_set_json("special_features"),
+                lambda f: f.special_features_count > 0,
+            ),
+            CompletenessItem(
+                is_set_json("popular_dishes"),
+                lambda f: f.popular_dishes_count > 0,
+            ),
+        ],
+        0.05,
+    ),
+    "online_presence": (
+        [
+            CompletenessItem(is_set("facebook_url"), lambda f: f.has_facebook),
+            CompletenessItem(is_set("instagram_url"), lambda f: f.has_instagram),
+            CompletenessItem(is_set("twitter_url"), lambda f: f.has_twitter),
+        ],
+        0.05,
+    ),
+}
+
+# Version tag stored with each persisted score; changing any weight or
+# completeness condition changes it, which marks every stored score stale
+# until manage.py rescore runs
+SCORE_VERSION = hashlib.sha1(
+    json.dumps(
+        {
+            "weights": SCORE_WEIGHTS,
+            "groups": {
+                group: [weight, [str(item.condition) for item in items]]
+                for group, (items, weight) in COMPLETENESS_GROUPS.items()
+            },
+        },
+        sort_keys=True,
+    ).encode()
+).hexdigest()[:12]
+
+# Profile fields calculate_business_score reads; the stored score is only
+# recomputed on save when one of these changed
+SCORE_INPUT_FIELDS = frozenset(
+    [
+        "review_count",
+        "google_reviews",
+        "yelp_reviews",
+        "average_rating",
+        "image_count",
+        "phone",
+        "email",
+        "address",
+        "city",
+        "state",
+        "website",
+        "description",
+        "category",
+        "has_hours",
+        "is_open",
+        "business_hours",
+        "established_year",
+        "has_description",
+        "has_menu",
+        "menu_url",
+        "offers_dine_in",
+        "offers_takeout",
+        "offers_delivery",
+        "price_range",
+        "cuisine_type",
+        "has_parking",
+        "wheelchair_accessible",
+        "has_wifi",
+        "accepts_credit_cards",
+        "special_features",
+        "popular_dishes",
+        "facebook_url",
+        "instagram_url",
+        "twitter_url",
+    ]
+)
+
+# Persisted score columns, as written by apply_score and rescore
+SCORE_FIELDS = ["score", "review_score", "content_score", "image_score"]
+
 
 class ScoringService:
     """Service for calculating business scores and metrics"""
 
-    def calculate_business_score(self, business: "BusinessProfile") -> float:
+    def calculate_business_score(
+        self, business: Union["BusinessProfile", BusinessFeatures]
+    ) -> float:
         """Calculate a 0-100 score for the business based on completeness and performance"""
-        score = 0.0
+        return self.score_components(business)["score"]
+
+    def score_components(
+        self, business: Union["BusinessProfile", BusinessFeatures]
+    ) -> Dict[str, float]:
+        """The score and its review (40%), content (40%) and image (20%) parts"""
+        features = (
+            business
+            if isinstance(business, BusinessFeatures)
+            else BusinessFeatures.from_profile(business)
+        )
+        review_score = self._calculate_review_score(features)
+        content_score = self._calculate_content_score(features)
+        image_score = self._calculate_image_score(features)
+
+        score = 0.0 + review_score + content_score + image_score
+        return {
+            "score": round(min(100, max(0, score)), 1),
+            "review_score": review_score,
+            "content_score": content_score,
+            "image_score": image_score,
+        }
+
+    def get_score(self, business: Union["BusinessProfile", BusinessFeatures]) -> float:
+        """The stored score when it is current, otherwise a freshly computed one"""
+        if isinstance(business, BusinessFeatures):
+            if business.score is not None:
+                return business.score
+        elif business.score_is_current():
+            return business.score
+        return self.calculate_business_score(business)
+
+    def get_components(self, business: "BusinessProfile") -> Dict[str, float]:
+        """Like get_score, for the score and its review, content and image parts"""
+        if business.score_is_current():
+            return {field: getattr(business, field) for field in SCORE_FIELDS}
+        return self.score_components(business)
+
+    def apply_score(self, business: "BusinessProfile"):
+        """Set the persisted score columns from the profile's current inputs"""
+        for field, value in self.score_components(business).items():
+            setattr(business, field, value)
+        business.score_version = SCORE_VERSION
 
-        # Review metrics (40% of score)
-        score += self._calculate_review_score(business)
+    def score_many(
+        self,
+        queryset: Optional[QuerySet] = None,
+        batch_size: int = SCORE_BATCH_SIZE,
+    ) -> Dict[int, float]:
+        """
+        Score many stored profiles at once, returning {pk: score}.
+        The database returns only the score inputs, with each completeness
+        group already counted in SQL. The values_list query runs on a raw
+        cursor so no per-value converters run, and each block of rows is
+        scored with NumPy array operations that mirror calculate_business_score
+        step by step, so the results are identical to scoring one by one.
+        """
+        if queryset is None:
+            from ..models import BusinessProfile
 
-        # Content completeness (40% of score)
-        score += self._calculate_content_score(business)
+            queryset = BusinessProfile.objects.all()
 
-        # Image count (20% of score)
-        score += self._calculate_image_score(business)
+        scores = {}
+        for pks, components in self._iter_component_blocks(
+            queryset.order_by(), batch_size
+        ):
+            scores.update(zip(pks, components["score"]))
+        return scores
 
-        return round(min(100, max(0, score)), 1)
+    def rescore(
+        self,
+        queryset: Optional[QuerySet] = None,
+        batch_size: int = SCORE_BATCH_SIZE,
+    ) -> int:
+        """
+        Persist fresh scores for the profiles in queryset (by default, those
+        scored under other weights or never scored), a block of primary keys
+        at a time with the vectorized scorer. A row re-scored by a concurrent
+        save in the meantime is left alone. Returns the number of rows written.
+        """
+        from ..models import BusinessProfile
 
-    def _calculate_review_score(self, business: "BusinessProfile") -> float:
+        if queryset is None:
+            queryset = BusinessProfile.objects.all()
+        queryset = queryset.exclude(score_version=SCORE_VERSION)
+
+        connection = connections[queryset.db]
+        quote = connection.ops.quote_name
+        assignments = ", ".join(
+            f"{quote(field)} = %s" for field in [*SCORE_FIELDS, "score_version"]
+        )
+        sql = (
+            f"UPDATE {quote(BusinessProfile._meta.db_table)} SET {assignments} "
+            f"WHERE {quote(BusinessProfile._meta.pk.column)} = %s "
+            f"AND {quote('score_version')} <> %s"
+        )
+
+        written = 0
+        last_pk = None
+        while True:
+            page = queryset.order_by("pk")
+            if last_pk is not None:
+                page = page.filter(pk__gt=last_pk)
+            blocks = list(self._iter_component_blocks(page[:batch_size], batch_size))
+            if not blocks:
+                return written
+
+            pks, components = blocks[0]
+            rows = [
+                [*values, SCORE_VERSION, pk, SCORE_VERSION]
+                for pk, values in zip(
+                    pks, zip(*(components[field] for field in SCORE_FIELDS))
+                )
+            ]
+            with transaction.atomic(using=queryset.db), connection.cursor() as cursor:
+                cursor.executemany(sql, rows)
+            written += len(rows)
+            last_pk = pks[-1]
+
+    def _iter_component_blocks(
+        self, queryset: QuerySet, batch_size: int
+    ) -> Iterator[Tuple[List[int], Dict[str, list]]]:
+        """Yield (pks, score components) for each block of up to batch_size rows"""
+        columns = ["pk", "total", "rating_hundredths", "image_count"]
+        columns += list(COMPLETENESS_GROUPS)
+        sql, params = (
+            self._annotate_features(queryset)
+            .values_list(*columns)
+            .query.sql_with_params()
+        )
+
+        with connections[queryset.db].cursor() as cursor:
+            cursor.execute(sql, params)
+            while True:
+                block = cursor.fetchmany(batch_size)
+                if not block:
+                    break
+                features = dict(zip(columns, zip(*block)))
+                pks = list(features.pop("pk"))
+                yield pks, self._score_arrays(features)
+
+    def _annotate_features(self, queryset: QuerySet) -> QuerySet:
+        """Annotate total reviews, the rating and the completeness counts as integers"""
+        return queryset.alias(
+            **{
+                f"{name}_text": Cast(name, output_field=TextField())
+                for name in JSON_FIELDS
+            }
+        ).annotate(
+            total=F("google_reviews") + F("yelp_reviews") + F("review_count"),
+            # average_rating has two decimal places, so hundredths / 100 is the
+            # same float as float(Decimal), without a per-row Decimal
+            rating_hundredths=Cast(
+                Round(F("average_rating") * 100), output_field=IntegerField()
+            ),
+            **{
+                group: _count_true(*(item.condition for item in items))
+                for group, (items, _) in COMPLETENESS_GROUPS.items()
+            },
+        )
+
+    def _score_arrays(self, features: Dict[str, tuple]) -> Dict[str, list]:
+        """Vectorized score_components over columns of feature values"""
+        # Review metrics
+        max_review_score = SCORE_WEIGHTS["reviews"] * 100
+        total_reviews = np.array(features["total"], dtype=np.int64)
+        rating = np.array(features["rating_hundredths"], dtype=np.int64) / 100
+        review_count_score = np.minimum(
+            max_review_score / 2, (total_reviews / 100) * (max_review_score / 2)
+        )
+        rating_score = (rating / 5.0) * (max_review_score / 2)
+        review_score = np.where(
+            total_reviews > 0, review_count_score + rating_score, 0.0
+        )
+
+        # Content completeness, summed in the scalar path's order
+        max_content_score = SCORE_WEIGHTS["content"] * 100
+        total_completeness = None
+        for group, (items, weight) in COMPLETENESS_GROUPS.items():
+            counts = np.array(features[group], dtype=np.int64)
+            group_score = (counts / len(items)) * weight
+            total_completeness = (
+                group_score
+                if total_completeness is None
+                else total_completeness + group_score
+            )
+        content_score = np.minimum(total_completeness, 1.0) * max_content_score
+
+        # Image count
+        max_image_score = SCORE_WEIGHTS["images"] * 100
+        image_count = np.array(features["image_count"], dtype=np.int64)
+        image_score = np.minimum(max_image_score, (image_count / 30) * max_image_score)
+
+        scores = np.clip(review_score + content_score + image_score, 0, 100)
+        return {
+            # Python's round, as the scalar path uses, not np.round's scaled rounding
+            "score": [round(score, 1) for score in scores.tolist()],
+            "review_score": review_score.tolist(),
+            "content_score": content_score.tolist(),
+            "image_score": image_score.tolist(),
+        }
+
+    def _calculate_review_score(self, features: BusinessFeatures) -> float:
         """Calculate score based on reviews and ratings"""
         max_review_score = SCORE_WEIGHTS["reviews"] * 100
 
-        total_reviews = business.total_reviews
+        total_reviews = features.total_reviews
         if total_reviews <= 0:
             return 0.0
 
@@ -37,92 +440,23 @@ class ScoringService:
         )
 
         # Rating component (half of review score)
-        rating_score = (float(business.average_rating) / 5.0) * (max_review_score / 2)
+        rating_score = (features.average_rating / 5.0) * (max_review_score / 2)
 
         return review_count_score + rating_score
 
-    def _calculate_content_score(self, business: "BusinessProfile") -> float:
+    def _calculate_content_score(self, features: BusinessFeatures) -> float:
         """Calculate score based on content completeness"""
         max_content_score = SCORE_WEIGHTS["content"] * 100
 
-        # Basic information completeness
-        basic_info_items = [
-            bool(business.phone),
-            bool(business.email),
-            bool(business.address),
-            bool(business.city),
-            bool(business.state),
-            bool(business.website),
-            bool(business.description),
-            bool(business.category),
-        ]
-
-        # Business operations completeness
-        operations_items = [
-            business.has_hours,
-            business.is_open,
-            bool(business.business_hours),
-            bool(business.established_year),
-        ]
-
-        # Content and menu completeness
-        content_items = [
-            business.has_description,
-            business.has_menu,
-            business.image_count > 10,
-            (
-                bool(business.menu_url) if business.has_menu else True
-            ),  # Bonus for menu URL
-        ]
-
-        # Service options completeness
-        service_items = [
-            business.offers_dine_in
-            or business.offers_takeout
-            or business.offers_delivery,
-            bool(business.price_range),
-            bool(business.cuisine_type),
-        ]
-
-        # Features and amenities (bonus points)
-        feature_items = [
-            business.has_parking,
-            business.wheelchair_accessible,
-            business.has_wifi,
-            business.accepts_credit_cards,
-            len(business.special_features) > 0,
-            len(business.popular_dishes) > 0,
-        ]
-
-        # Online presence (bonus points)
-        online_presence_items = [
-            bool(business.facebook_url),
-            bool(business.instagram_url),
-            bool(business.twitter_url),
-        ]
-
-        # Calculate weighted completeness
-        basic_score = (sum(basic_info_items) / len(basic_info_items)) * 0.4
-        operations_score = (sum(operations_items) / len(operations_items)) * 0.3
-        content_score = (sum(content_items) / len(content_items)) * 0.2
-        service_score = (sum(service_items) / len(service_items)) * 0.1
-
-        # Bonus points for features and online presence (up to 10% extra)
-        feature_bonus = (sum(feature_items) / len(feature_items)) * 0.05
-        online_bonus = (sum(online_presence_items) / len(online_presence_items)) * 0.05
-
-        total_completeness = (
-            basic_score
-            + operations_score
-            + content_score
-            + service_score
-            + feature_bonus
-            + online_bonus
-        )
+        # Weighted completeness of each group, summed in order
+        total_completeness = 0.0
+        for items, weight in COMPLETENESS_GROUPS.values():
+            held = sum(1 for item in items if item.holds(features))
+            total_completeness += (held / len(items)) * weight
 
         return min(total_completeness, 1.0) * max_content_score
 
-    def _calculate_image_score(self, business: "BusinessProfile") -> float:
+    def _calculate_image_score(self, features: BusinessFeatures) -> float:
         """Calculate score based on image count"""
         max_image_score = SCORE_WEIGHTS["images"] * 100
-        return min(max_image_score, (business.image_count / 30) * max_image_score)
+        return min(max_image_score, (features.image_count / 30) * max_image_score)
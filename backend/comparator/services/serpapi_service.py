@@ -1,10 +1,55 @@
-import requests
+import json
+import time
+import hashlib
+import threading
 import logging
-from typing import Optional, Dict, Any, List
-from .config import SERPAPI_API_KEY, SERPAPI_BASE_URL, REQUEST_TIMEOUT
+from typing import Optional, Dict, Any, List, Tuple
+from asgiref.sync import sync_to_async
+from .cache import PersistentTTLCache
+from .http_client import get_http_session, transport_stats, async_get_with_retries
+from .usage import record_call, record_avoided, usage_totals
+from .config import (
+    SERPAPI_API_KEY,
+    SERPAPI_BASE_URL,
+    REQUEST_TIMEOUT,
+    SERPAPI_TIMEOUTS,
+    SERPAPI_CACHE_ENABLED,
+    SERPAPI_CACHE_PATH,
+    SERPAPI_CACHE_MAX_ENTRIES,
+    SERPAPI_CACHE_TTLS,
+    SERPAPI_CACHE_DEFAULT_TTL,
+    SERPAPI_CACHE_STALE_TTL,
+    SERPAPI_LOCAL_RESOLUTION,
+    SERPAPI_LOCAL_REQUIRED_FIELDS,
+)
 
 logger = logging.getLogger(__name__)
 
+_cache = None
+_cache_lock = threading.Lock()
+_refreshing = set()
+_refreshing_lock = threading.Lock()
+
+
+def get_response_cache() -> Optional[PersistentTTLCache]:
+    """Return the process-wide SerpAPI response cache, creating it on first use"""
+    global _cache
+    if not SERPAPI_CACHE_ENABLED:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                try:
+                    _cache = PersistentTTLCache(
+                        SERPAPI_CACHE_PATH,
+                        table="serpapi_responses",
+                        max_entries=SERPAPI_CACHE_MAX_ENTRIES,
+                    )
+                except Exception as e:
+                    logger.error(f"Failed to open SerpAPI cache: {str(e)}")
+                    return None
+    return _cache
+
 
 class SerpAPIService:
     """Service for handling SerpAPI interactions"""
@@ -12,38 +57,47 @@ class SerpAPIService:
     def __init__(self):
         self.api_key = SERPAPI_API_KEY
         self.base_url = SERPAPI_BASE_URL
+        self.cache = get_response_cache()
+        self.session = get_http_session()
 
     def search_business(self, business_name: str) -> Optional[Dict[str, Any]]:
         """Search for a business using Google Maps"""
-        try:
-            params = {
-                "engine": "google_maps",
-                "q": business_name,
-                "api_key": self.api_key,
-                "type": "search",
-            }
-
-            response = requests.get(
-                self.base_url, params=params, timeout=REQUEST_TIMEOUT
-            )
-            response.raise_for_status()
-
-            data = response.json()
+        return self.search_places(business_name)[0]
 
-            # Get the first place result if available
+    def search_places(
+        self, business_name: str
+    ) -> Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Search for a business using Google Maps, returning the matched place
+        and the search's other local results (candidate competitors)
+        """
+        try:
+            data = self._get_json(self._search_params(business_name))
+            place, place_id = self._parse_search_results(data)
+            if place is None:
+                place = self.get_place_details(place_id)
+            elif place_id:
+                self._record_skipped(self._place_details_params(place_id))
+            return place, self._other_local_results(data)
 
-            if "place_results" in data:
-                return data["place_results"]
-            elif "local_results" in data:
-                # If no place_results, try the first local result
-                first_place = data["local_results"][0]
-                return self.get_place_details(first_place.get("place_id"))
+        except Exception as e:
+            logger.error(f"Error searching business {business_name}: {str(e)}")
+            return None, []
 
-            return None
+    def search_nearby(
+        self,
+        query: str,
+        latitude: Optional[float] = None,
+        longitude: Optional[float] = None,
+    ) -> List[Dict[str, Any]]:
+        """Local results for a query, e.g. a category in a city"""
+        try:
+            data = self._get_json(self._nearby_params(query, latitude, longitude))
+            return data.get("local_results", [])
 
         except Exception as e:
-            logger.error(f"Error searching business {business_name}: {str(e)}")
-            return None
+            logger.error(f"Error searching nearby places for {query}: {str(e)}")
+            return []
 
     def get_place_details(self, place_id: str) -> Optional[Dict[str, Any]]:
         """Get detailed place information using place_id"""
@@ -51,18 +105,7 @@ class SerpAPIService:
             return None
 
         try:
-            params = {
-                "engine": "google_maps",
-                "place_id": place_id,
-                "api_key": self.api_key,
-            }
-
-            response = requests.get(
-                self.base_url, params=params, timeout=REQUEST_TIMEOUT
-            )
-            response.raise_for_status()
-
-            data = response.json()
+            data = self._get_json(self._place_details_params(place_id))
             return data.get("place_results")
 
         except Exception as e:
@@ -75,19 +118,7 @@ class SerpAPIService:
             return []
 
         try:
-            params = {
-                "engine": "google_maps_reviews",
-                "data_id": data_id,
-                "api_key": self.api_key,
-                "num": min(num_reviews, 5),  # Limit to 5 reviews max
-            }
-
-            response = requests.get(
-                self.base_url, params=params, timeout=REQUEST_TIMEOUT
-            )
-            response.raise_for_status()
-
-            data = response.json()
+            data = self._get_json(self._reviews_params(data_id, num_reviews))
             return data.get("reviews", [])
 
         except Exception as e:
@@ -100,20 +131,304 @@ class SerpAPIService:
             return []
 
         try:
-            params = {
-                "engine": "google_maps_photos",
-                "data_id": data_id,
-                "api_key": self.api_key,
-            }
-
-            response = requests.get(
-                self.base_url, params=params, timeout=REQUEST_TIMEOUT
-            )
-            response.raise_for_status()
-
-            data = response.json()
+            data = self._get_json(self._photos_params(data_id))
             return data.get("photos", [])
 
         except Exception as e:
             logger.error(f"Error fetching photos for data_id {data_id}: {str(e)}")
             return []
+
+    async def asearch_business(self, business_name: str) -> Optional[Dict[str, Any]]:
+        """Async variant of search_business"""
+        return (await self.asearch_places(business_name))[0]
+
+    async def asearch_places(
+        self, business_name: str
+    ) -> Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Async variant of search_places"""
+        try:
+            data = await self._aget_json(self._search_params(business_name))
+            place, place_id = self._parse_search_results(data)
+            if place is None:
+                place = await self.aget_place_details(place_id)
+            elif place_id:
+                self._record_skipped(self._place_details_params(place_id))
+            return place, self._other_local_results(data)
+
+        except Exception as e:
+            logger.error(f"Error searching business {business_name}: {str(e)}")
+            return None, []
+
+    async def aget_place_details(self, place_id: str) -> Optional[Dict[str, Any]]:
+        """Async variant of get_place_details"""
+        if not place_id:
+            return None
+
+        try:
+            data = await self._aget_json(self._place_details_params(place_id))
+            return data.get("place_results")
+
+        except Exception as e:
+            logger.error(f"Error fetching place details for {place_id}: {str(e)}")
+            return None
+
+    async def aget_reviews(self, data_id: str, num_reviews: int = 5) -> list:
+        """Async variant of get_reviews"""
+        if not data_id:
+            return []
+
+        try:
+            data = await self._aget_json(self._reviews_params(data_id, num_reviews))
+            return data.get("reviews", [])
+
+        except Exception as e:
+            logger.error(f"Error fetching reviews for data_id {data_id}: {str(e)}")
+            return []
+
+    async def aget_photos(self, data_id: str) -> list:
+        """Async variant of get_photos"""
+        if not data_id:
+            return []
+
+        try:
+            data = await self._aget_json(self._photos_params(data_id))
+            return data.get("photos", [])
+
+        except Exception as e:
+            logger.error(f"Error fetching photos for data_id {data_id}: {str(e)}")
+            return []
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Return cache and connection pool metrics for this process"""
+        return {
+            "cache": self.cache.stats() if self.cache else None,
+            "transport": transport_stats(),
+            "usage": usage_totals(),
+        }
+
+    @staticmethod
+    def _search_params(business_name: str) -> Dict[str, Any]:
+        return {"engine": "google_maps", "q": business_name, "type": "search"}
+
+    @staticmethod
+    def _nearby_params(
+        query: str, latitude: Optional[float], longitude: Optional[float]
+    ) -> Dict[str, Any]:
+        params = {"engine": "google_maps", "q": query, "type": "search"}
+        if latitude is not None and longitude is not None:
+            params["ll"] = f"@{latitude},{longitude},14z"
+        return params
+
+    @staticmethod
+    def _place_details_params(place_id: str) -> Dict[str, Any]:
+        return {"engine": "google_maps", "place_id": place_id}
+
+    @staticmethod
+    def _reviews_params(data_id: str, num_reviews: int) -> Dict[str, Any]:
+        return {
+            "engine": "google_maps_reviews",
+            "data_id": data_id,
+            "num": min(num_reviews, 5),  # Limit to 5 reviews max
+        }
+
+    @staticmethod
+    def _photos_params(data_id: str) -> Dict[str, Any]:
+        return {"engine": "google_maps_photos", "data_id": data_id}
+
+    @classmethod
+    def _parse_search_results(
+        cls,
+        data: Dict[str, Any],
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """
+        Return (place, None) when the search matched a place directly. For
+        local results, return (place, place_id) when the first one can stand
+        in for its place details, or (None, place_id) when they are needed.
+        """
+        # Get the first place result if available
+        if "place_results" in data:
+            return data["place_results"], None
+        elif "local_results" in data:
+            # If no place_results, try the first local result
+            first_place = data["local_results"][0]
+            return cls.local_place(first_place), first_place.get("place_id")
+
+        return None, None
+
+    @classmethod
+    def local_place(cls, result: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        The local result as a place, or None when lazy resolution is off or
+        the result lacks a field the scorer reads (so details are needed)
+        """
+        if SERPAPI_LOCAL_RESOLUTION != "lazy":
+            return None
+        place = cls.place_from_local_result(result)
+        if any(
+            place.get(field) in (None, "") for field in SERPAPI_LOCAL_REQUIRED_FIELDS
+        ):
+            return None
+        return place
+
+    @staticmethod
+    def place_from_local_result(result: Dict[str, Any]) -> Dict[str, Any]:
+        """A local result in the shape of place details"""
+        place = dict(result)
+        # Local results give opening times as {day: hours} under
+        # operating_hours, and "hours" as a summary like "Open ⋅ Closes 9 PM"
+        operating_hours = place.get("operating_hours")
+        if isinstance(operating_hours, dict) and not isinstance(
+            place.get("hours"), list
+        ):
+            place["hours"] = [{day: hours} for day, hours in operating_hours.items()]
+        if not isinstance(place.get("hours"), list):
+            place.pop("hours", None)
+        # Local results carry no "images"; the photos call counts them instead
+        place["from_local_result"] = True
+        return place
+
+    @staticmethod
+    def _other_local_results(data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Local results besides the one taken as the match"""
+        if "place_results" in data:
+            return data.get("local_results") or []
+        return (data.get("local_results") or [])[1:]
+
+    def _get_json(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Return the SerpAPI response for params, served from the cache when possible.
+        Stale entries are returned immediately while a background refresh runs.
+        """
+        started = time.monotonic()
+        if not self.cache:
+            data = self._fetch(params)
+            record_call(self._call_kind(params), time.monotonic() - started, False)
+            return data
+
+        key = self._cache_key(params)
+        cached = self._lookup(key, params)
+        if cached is not None:
+            record_call(self._call_kind(params), time.monotonic() - started, True)
+            return cached
+
+        data = self._fetch(params)
+        record_call(self._call_kind(params), time.monotonic() - started, False)
+        self._store(key, data)
+        return data
+
+    async def _aget_json(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Async variant of _get_json sharing the same cache"""
+        started = time.monotonic()
+        if not self.cache:
+            data = await self._afetch(params)
+            record_call(self._call_kind(params), time.monotonic() - started, False)
+            return data
+
+        # The cache is SQLite: read and write it off the event loop
+        key = self._cache_key(params)
+        cached = await sync_to_async(self._lookup, thread_sensitive=False)(key, params)
+        if cached is not None:
+            record_call(self._call_kind(params), time.monotonic() - started, True)
+            return cached
+
+        data = await self._afetch(params)
+        record_call(self._call_kind(params), time.monotonic() - started, False)
+        await sync_to_async(self._store, thread_sensitive=False)(key, data)
+        return data
+
+    def record_skipped_enrichment(self, call: str, data_id: str, num_reviews: int = 5):
+        """Record a reviews or photos call that the place's data made unnecessary"""
+        if call == "reviews":
+            self._record_skipped(self._reviews_params(data_id, num_reviews))
+        else:
+            self._record_skipped(self._photos_params(data_id))
+
+    def _record_skipped(self, params: Dict[str, Any]):
+        """Record a call that was not needed; it saves a credit unless cached"""
+        stored_at = (
+            self.cache.stored_at(self._cache_key(params)) if self.cache else None
+        )
+        servable = stored_at is not None and time.time() - stored_at < (
+            SERPAPI_CACHE_TTLS.get(params["engine"], SERPAPI_CACHE_DEFAULT_TTL)
+            + SERPAPI_CACHE_STALE_TTL
+        )
+        record_avoided(self._call_kind(params), credits=0 if servable else 1)
+
+    @staticmethod
+    def _call_kind(params: Dict[str, Any]) -> str:
+        """Label for usage counters: place details share the search engine"""
+        if params["engine"] == "google_maps":
+            return "place_details" if "place_id" in params else "search"
+        return params["engine"].replace("google_maps_", "")
+
+    def _lookup(self, key: str, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Return a fresh or stale-but-servable cached response, or None"""
+        ttl = SERPAPI_CACHE_TTLS.get(params["engine"], SERPAPI_CACHE_DEFAULT_TTL)
+        entry = self.cache.get(key, max_age=ttl + SERPAPI_CACHE_STALE_TTL)
+        if entry is None:
+            return None
+        if entry.age >= ttl:
+            self._refresh_in_background(key, params)
+        return entry.value
+
+    def _fetch(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Perform the actual SerpAPI request"""
+        response = self.session.get(
+            self.base_url,
+            params={**params, "api_key": self.api_key},
+            timeout=SERPAPI_TIMEOUTS.get(params["engine"], REQUEST_TIMEOUT),
+        )
+        response.raise_for_status()
+        return response.json()
+
+    async def _afetch(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Perform the actual SerpAPI request without blocking the event loop"""
+        response = await async_get_with_retries(
+            self.base_url,
+            params={**params, "api_key": self.api_key},
+            timeout=SERPAPI_TIMEOUTS.get(params["engine"], REQUEST_TIMEOUT),
+        )
+        response.raise_for_status()
+        return response.json()
+
+    def _store(self, key: str, data: Dict[str, Any]):
+        """Cache a response unless SerpAPI reported an error in the payload"""
+        if not isinstance(data, dict) or data.get("error"):
+            return
+        try:
+            self.cache.set(key, data)
+        except Exception as e:
+            logger.error(f"Error writing SerpAPI cache entry: {str(e)}")
+
+    def _refresh_in_background(self, key: str, params: Dict[str, Any]):
+        """Re-fetch a stale entry on a daemon thread, at most once per key"""
+        with _refreshing_lock:
+            if key in _refreshing:
+                return
+            _refreshing.add(key)
+
+        def refresh():
+            try:
+                self._store(key, self._fetch(params))
+            except Exception as e:
+                logger.warning(f"Background refresh failed for {params}: {str(e)}")
+            finally:
+                with _refreshing_lock:
+                    _refreshing.discard(key)
+
+        threading.Thread(target=refresh, daemon=True).start()
+
+    @staticmethod
+    def _cache_key(params: Dict[str, Any]) -> str:
+        """Build a cache key from the engine plus normalized request params"""
+        normalized = {}
+        for name, value in params.items():
+            if name == "api_key" or value is None:
+                continue
+            if isinstance(value, str):
+                value = " ".join(value.split())
+                if name == "q":
+                    value = value.lower()
+            normalized[name] = value
+        raw = json.dumps(normalized, sort_keys=True, default=str)
+        return f"{params['engine']}:{hashlib.sha256(raw.encode()).hexdigest()}"
@@ -0,0 +1,102 @@
+import logging
+from datetime import datetime
+from typing import Dict, Any, Iterable, List, Optional
+from django.db.models import Avg, Max
+from django.db.models.functions import TruncHour, TruncDay, TruncWeek, TruncMonth
+from ..models import BusinessProfile, BusinessSnapshot
+
+logger = logging.getLogger(__name__)
+
+TREND_BUCKETS = {
+    "hour": TruncHour,
+    "day": TruncDay,
+    "week": TruncWeek,
+    "month": TruncMonth,
+}
+
+
+class SnapshotService:
+    """Service for recording metric snapshots and reading trend series"""
+
+    def record(self, business: BusinessProfile, score: Optional[float]):
+        """Append a snapshot of the business's current metrics"""
+        try:
+            BusinessSnapshot.objects.create(**self._snapshot_fields(business, score))
+        except Exception as e:
+            logger.error(f"Error recording snapshot for {business.name}: {str(e)}")
+
+    async def arecord(self, business: BusinessProfile, score: Optional[float]):
+        """Async variant of record"""
+        try:
+            await BusinessSnapshot.objects.acreate(
+                **self._snapshot_fields(business, score)
+            )
+        except Exception as e:
+            logger.error(f"Error recording snapshot for {business.name}: {str(e)}")
+
+    def trend_series(
+        self,
+        business_ids: Iterable[int],
+        bucket: str = "day",
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ) -> Dict[int, List[Dict[str, Any]]]:
+        """
+        Return each business's metrics downsampled to one point per bucket
+        (hour, day, week or month), oldest first. Counts take the bucket's
+        maximum, which is not its latest value if a count dropped within the
+        bucket; rating and score are averaged.
+        """
+        if bucket not in TREND_BUCKETS:
+            raise ValueError(
+                f"bucket must be one of: {', '.join(TREND_BUCKETS)}; got {bucket!r}"
+            )
+
+        business_ids = list(business_ids)
+        snapshots = BusinessSnapshot.objects.filter(business_id__in=business_ids)
+        if since:
+            snapshots = snapshots.filter(captured_at__gte=since)
+        if until:
+            snapshots = snapshots.filter(captured_at__lt=until)
+
+        rows = (
+            snapshots.annotate(period=TREND_BUCKETS[bucket]("captured_at"))
+            .values("business_id", "period")
+            .annotate(
+                review_count=Max("review_count"),
+                average_rating=Avg("average_rating"),
+                image_count=Max("image_count"),
+                score=Avg("score"),
+            )
+            .order_by("business_id", "period")
+        )
+
+        series = {business_id: [] for business_id in business_ids}
+        for row in rows:
+            series[row["business_id"]].append(
+                {
+                    "period": row["period"].isoformat(),
+                    "review_count": row["review_count"],
+                    "average_rating": (
+                        round(float(row["average_rating"]), 2)
+                        if row["average_rating"] is not None
+                        else None
+                    ),
+                    "image_count": row["image_count"],
+                    "score": (
+                        round(row["score"], 1) if row["score"] is not None else None
+                    ),
+                }
+            )
+        return series
+
+    def _snapshot_fields(
+        self, business: BusinessProfile, score: Optional[float]
+    ) -> Dict[str, Any]:
+        return {
+            "business": business,
+            "review_count": business.review_count or 0,
+            "average_rating": business.average_rating or 0,
+            "image_count": business.image_count or 0,
+            "score": score,
+        }
@@ -0,0 +1,115 @@
+import threading
+import contextvars
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator, Optional
+
+# Weight of the newest sample in each kind's moving average latency
+LATENCY_SMOOTHING = 0.2
+
+
+class SerpAPIUsage:
+    """SerpAPI calls made, served from cache and avoided, with their latency"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = Counter()
+        self.cache_hits = Counter()
+        self.avoided = Counter()
+        self.credits_avoided = 0
+        self.latency = 0.0
+        self.latency_saved = 0.0
+
+    def record_call(self, kind: str, seconds: float, cached: bool):
+        with self._lock:
+            (self.cache_hits if cached else self.calls)[kind] += 1
+            self.latency += seconds
+
+    def record_avoided(self, kind: str, credits: int, seconds: float):
+        with self._lock:
+            self.avoided[kind] += 1
+            self.credits_avoided += credits
+            self.latency_saved += seconds
+
+    def as_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "credits_spent": sum(self.calls.values()),
+                "credits_avoided": self.credits_avoided,
+                "calls": dict(self.calls),
+                "cache_hits": dict(self.cache_hits),
+                "avoided": dict(self.avoided),
+                "latency_ms": round(self.latency * 1000),
+                "latency_saved_ms": round(self.latency_saved * 1000),
+            }
+
+    def summary(self) -> str:
+        """Compact form for a response header or log line"""
+        usage = self.as_dict()
+        return (
+            f"credits={usage['credits_spent']}; "
+            f"avoided={usage['credits_avoided']}; "
+            f"saved_ms={usage['latency_saved_ms']}"
+        )
+
+
+# Usage of the request (or job) being served; executor tasks inherit it
+# because get_executor's pools run work in a copy of the submitter's context
+_current: contextvars.ContextVar[Optional[SerpAPIUsage]] = contextvars.ContextVar(
+    "serpapi_usage", default=None
+)
+_totals = SerpAPIUsage()
+_latency: Dict[str, float] = {}
+_latency_lock = threading.Lock()
+
+
+@contextmanager
+def track_usage() -> Iterator[SerpAPIUsage]:
+    """Count the SerpAPI usage of the enclosed work separately"""
+    usage = SerpAPIUsage()
+    token = _current.set(usage)
+    try:
+        yield usage
+    finally:
+        _current.reset(token)
+
+
+def current_usage() -> Optional[SerpAPIUsage]:
+    return _current.get()
+
+
+def usage_totals() -> Dict[str, Any]:
+    """Usage across every request served by this process"""
+    return _totals.as_dict()
+
+
+def record_call(kind: str, seconds: float, cached: bool):
+    """Record a SerpAPI call; live calls also update the kind's latency average"""
+    if not cached:
+        with _latency_lock:
+            previous = _latency.get(kind)
+            _latency[kind] = (
+                seconds
+                if previous is None
+                else previous + LATENCY_SMOOTHING * (seconds - previous)
+            )
+    for usage in (_current.get(), _totals):
+        if usage is not None:
+            usage.record_call(kind, seconds, cached)
+
+
+def record_avoided(kind: str, credits: int = 1):
+    """
+    Record a call that was skipped. The latency saved is estimated from the
+    kind's recent live calls, or from other kinds' until one has been made.
+    """
+    seconds = 0.0
+    if credits:
+        with _latency_lock:
+            seconds = _latency.get(kind)
+            if seconds is None and _latency:
+                seconds = sum(_latency.values()) / len(_latency)
+        seconds = seconds or 0.0
+    for usage in (_current.get(), _totals):
+        if usage is not None:
+            usage.record_avoided(kind, credits, seconds)
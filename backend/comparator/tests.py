@@ -0,0 +1,650 @@
+import asyncio
+import threading
+from datetime import timedelta
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+
+from .models import AnalysisJob, BusinessProfile, CohortScoreBucket
+from .services.ai_service import AIService
+from .services.business_service import BusinessService
+from .services.cache import PersistentTTLCache
+from .services.coalescing import single_flight
+from .services.cohort_service import CohortService
+from .services.competitor_service import CompetitorService
+from .services.features import BusinessFeatures
+from .services.fetch_planner import FetchPlanner
+from .services.job_service import JobService
+from .services.place_normalizer import apply_record, normalize_place
+from .services.scoring_service import (
+    COMPLETENESS_GROUPS,
+    SCORE_VERSION,
+    ScoringService,
+)
+from .services.serpapi_service import SerpAPIService
+from .services.usage import track_usage
+
+PLACE = {
+    "title": "Luigi's",
+    "data_id": "0x1:0x2",
+    "address": "1 Main St, Springfield IL 62701, United States",
+    "rating": 4.5,
+    "reviews": 120,
+    "type": ["Pizza restaurant"],
+    "gps_coordinates": {"latitude": 1.0, "longitude": 2.0},
+}
+
+
+def stub_business_service(place=PLACE) -> BusinessService:
+    """A BusinessService whose SerpAPI search returns place without any call"""
+    serpapi = mock.Mock()
+    serpapi.search_places.return_value = (dict(place), [])
+    return BusinessService(serpapi_service=serpapi)
+
+
+def store(business, website=None, serpapi_data=None, nearby=None):
+    """Stand-in for _update_business_data: store the place without enriching"""
+    business.data_id = (serpapi_data or {}).get("data_id")
+    business.fetched_at = timezone.now()
+    business.save()
+
+
+class PersistentTTLCacheTests(TestCase):
+    def test_expired_entries_are_misses(self):
+        cache = PersistentTTLCache(":memory:")
+        cache.set("key", {"value": 1})
+        self.assertEqual(cache.get("key", max_age=60).value, {"value": 1})
+        self.assertIsNone(cache.get("key", max_age=0))
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_least_recently_used_entries_are_evicted(self):
+        cache = PersistentTTLCache(":memory:", max_entries=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a").value, 1)
+        self.assertEqual(cache.stats()["entries"], 2)
+
+
+class SingleFlightTests(TestCase):
+    def wait_in_thread(self, timeout=5.0):
+        """Start a thread taking the "Luigi" flight; returns it and its outcome"""
+        outcome = []
+
+        def wait():
+            with single_flight("test", "Luigi", timeout) as waited:
+                outcome.append(waited)
+
+        thread = threading.Thread(target=wait)
+        thread.start()
+        return thread, outcome
+
+    def test_waiter_learns_the_work_was_done(self):
+        with single_flight("test", "Luigi") as waited:
+            self.assertFalse(waited)
+            thread, outcome = self.wait_in_thread()
+            thread.join(0.2)
+            # The second caller blocks until the holder is done
+            self.assertEqual(outcome, [])
+        thread.join(5)
+        self.assertEqual(outcome, [True])
+
+    def test_waiter_proceeds_after_the_timeout(self):
+        with single_flight("test", "Luigi"):
+            thread, outcome = self.wait_in_thread(timeout=0.1)
+            thread.join(5)
+            self.assertEqual(outcome, [True])
+
+
+class ResolutionStagesTests(TransactionTestCase):
+    def test_business_resolved_is_yielded_before_enrichment(self):
+        service = stub_business_service()
+        consumer_saw_place = threading.Event()
+
+        def enrich(*args):
+            # Blocks enrichment until the consumer has the first stage; if the
+            # stages were buffered until the end this would time out
+            self.assertTrue(consumer_saw_place.wait(5))
+            store(*args)
+
+        with mock.patch.object(service, "_update_business_data", enrich):
+            stages = service.iter_resolution_stages("Luigi")
+            stage, summary = next(stages)
+            self.assertEqual(stage, "business_resolved")
+            self.assertEqual(summary["data_id"], PLACE["data_id"])
+            consumer_saw_place.set()
+            stage, business = next(stages)
+
+        self.assertEqual(stage, "profile_enriched")
+        self.assertIsNotNone(business.pk)
+        self.assertEqual(list(stages), [])
+
+    def test_suspended_stream_does_not_block_other_lookups(self):
+        service = stub_business_service()
+        stored = threading.Event()
+
+        def enrich(*args):
+            store(*args)
+            stored.set()
+
+        with mock.patch.object(service, "_update_business_data", enrich):
+            stages = service.iter_resolution_stages("Luigi")
+            next(stages)
+            # The in-memory test database reports concurrent writes as locked
+            # tables instead of waiting, so let the leader's write land first
+            self.assertTrue(stored.wait(5))
+            finished = []
+            thread = threading.Thread(
+                target=lambda: finished.append(service.get_or_create_business("Luigi"))
+            )
+            thread.start()
+            thread.join(5)
+            self.assertEqual(len(finished), 1)
+            self.assertEqual(next(stages)[1].pk, finished[0].pk)
+
+    def test_waiting_stream_reports_the_leaders_place_early(self):
+        service = stub_business_service()
+        release_leader = threading.Event()
+        waiter_stages = []
+
+        def slow_enrich(*args):
+            # Only released once the waiter has the leader's place
+            self.assertTrue(release_leader.wait(5))
+            store(*args)
+
+        def waiter():
+            for stage, payload in service.iter_resolution_stages("Luigi"):
+                waiter_stages.append(stage)
+                if stage == "business_resolved":
+                    release_leader.set()
+
+        with mock.patch.object(service, "_update_business_data", slow_enrich):
+            leader = service.iter_resolution_stages("Luigi")
+            next(leader)
+            thread = threading.Thread(target=waiter)
+            thread.start()
+            list(leader)
+            thread.join(5)
+
+        self.assertEqual(waiter_stages, ["business_resolved", "profile_enriched"])
+        # The waiter re-read the leader's row instead of searching again
+        self.assertEqual(service.serpapi_service.search_places.call_count, 1)
+
+
+class DataIdOwnerTests(TransactionTestCase):
+    def setUp(self):
+        stale = timezone.now() - timedelta(days=30)
+        self.by_name = BusinessProfile.objects.create(name="Luigi", fetched_at=stale)
+        self.owner = BusinessProfile.objects.create(
+            name="Luigi Kitchen", data_id=PLACE["data_id"], fetched_at=stale
+        )
+
+    def test_stale_row_found_by_name_switches_to_the_data_id_owner(self):
+        service = stub_business_service()
+        with mock.patch.object(service, "_update_business_data", store):
+            business = service.get_or_create_business("Luigi")
+        self.assertEqual(business.pk, self.owner.pk)
+        self.assertEqual(
+            BusinessProfile.objects.filter(data_id=PLACE["data_id"]).count(), 1
+        )
+
+    def test_async_lookup_switches_to_the_data_id_owner(self):
+        service = stub_business_service()
+        service.serpapi_service.asearch_places = mock.AsyncMock(
+            return_value=(dict(PLACE), [])
+        )
+
+        async def astore(business, website=None, serpapi_data=None, nearby=None):
+            business.data_id = serpapi_data["data_id"]
+            business.fetched_at = timezone.now()
+            await business.asave()
+
+        with mock.patch.object(service, "_aupdate_business_data", astore):
+            business = async_to_sync(service.aget_or_create_business)("Luigi")
+        self.assertEqual(business.pk, self.owner.pk)
+
+
+class AsyncResolutionTests(TransactionTestCase):
+    def test_concurrent_async_lookups_share_one_search(self):
+        service = stub_business_service()
+
+        async def search(business_name):
+            await asyncio.sleep(0.2)
+            return dict(PLACE), []
+
+        async def astore(business, website=None, serpapi_data=None, nearby=None):
+            business.data_id = serpapi_data["data_id"]
+            business.fetched_at = timezone.now()
+            await business.asave()
+
+        service.serpapi_service.asearch_places = mock.AsyncMock(side_effect=search)
+
+        async def lookups():
+            return await asyncio.gather(
+                *(service.aget_or_create_business("Same") for _ in range(3))
+            )
+
+        with mock.patch.object(service, "_aupdate_business_data", astore):
+            profiles = async_to_sync(lookups)()
+
+        self.assertEqual(service.serpapi_service.asearch_places.await_count, 1)
+        self.assertEqual(len({business.pk for business in profiles}), 1)
+
+    def test_async_fetch_reads_the_cache_off_the_event_loop(self):
+        serpapi = SerpAPIService()
+        serpapi.cache = mock.Mock()
+        threads = []
+
+        def lookup(key, params):
+            threads.append(threading.current_thread())
+            return {"cached": True}
+
+        async def fetch():
+            loop_thread = threading.current_thread()
+            with mock.patch.object(serpapi, "_lookup", lookup):
+                data = await serpapi._aget_json({"engine": "google_maps", "q": "x"})
+            return loop_thread, data
+
+        loop_thread, data = async_to_sync(fetch)()
+        self.assertEqual(data, {"cached": True})
+        self.assertNotEqual(threads, [loop_thread])
+
+
+def edge_case_profiles():
+    """Profiles covering the truthiness edge cases of every score input"""
+    return [
+        BusinessProfile.objects.create(name="Empty", category="", phone=None),
+        BusinessProfile.objects.create(
+            name="Blank strings",
+            phone="",
+            email="",
+            website="",
+            menu_url="",
+            has_menu=True,
+            established_year=0,
+            business_hours={},
+            special_features=[],
+        ),
+        BusinessProfile.objects.create(
+            name="Complete",
+            phone="555",
+            email="a@b.c",
+            address="1 Main St",
+            city="Springfield",
+            state="IL",
+            website="https://b.example",
+            description="Pizza",
+            has_hours=True,
+            business_hours=[{"monday": "9-5"}],
+            established_year=1998,
+            has_description=True,
+            has_menu=True,
+            menu_url="https://b.example/menu",
+            image_count=25,
+            offers_takeout=True,
+            price_range="$$",
+            cuisine_type="Italian",
+            has_wifi=True,
+            special_features=["Patio"],
+            popular_dishes=["Pizza"],
+            instagram_url="https://instagram.com/b",
+            review_count=40,
+            average_rating="4.37",
+        ),
+    ]
+
+
+class ScoringTests(TestCase):
+    def test_sql_and_python_completeness_checks_agree(self):
+        profiles = edge_case_profiles()
+        counts = ScoringService()._annotate_features(BusinessProfile.objects.all())
+        by_pk = {row["pk"]: row for row in counts.values("pk", *COMPLETENESS_GROUPS)}
+        for business in profiles:
+            features = BusinessFeatures.from_profile(business)
+            for group, (items, _) in COMPLETENESS_GROUPS.items():
+                held = sum(1 for item in items if item.holds(features))
+                self.assertEqual(by_pk[business.pk][group], held, (business, group))
+
+    def test_score_many_matches_scalar_scores(self):
+        profiles = edge_case_profiles()
+        scoring = ScoringService()
+        self.assertEqual(
+            scoring.score_many(),
+            {
+                business.pk: scoring.calculate_business_score(business)
+                for business in profiles
+            },
+        )
+
+
+class StoredScoreTests(TestCase):
+    def test_save_keeps_the_stored_score_current(self):
+        business = BusinessProfile.objects.create(name="Luigi", review_count=40)
+        scoring = ScoringService()
+        self.assertEqual(business.score_version, SCORE_VERSION)
+        self.assertEqual(business.score, scoring.calculate_business_score(business))
+
+        business = BusinessProfile.objects.get(pk=business.pk)
+        self.assertTrue(business.score_is_current())
+        # In-place edits to JSON inputs count as changes too
+        business.special_features.append("Patio")
+        self.assertFalse(business.score_is_current())
+        business.save(update_fields=["special_features"])
+
+        stored = BusinessProfile.objects.get(pk=business.pk)
+        self.assertTrue(stored.score_is_current())
+        self.assertEqual(stored.score, scoring.calculate_business_score(stored))
+
+    def test_rescore_writes_only_rows_scored_under_other_weights(self):
+        profiles = edge_case_profiles()
+        outdated = profiles[0]
+        BusinessProfile.objects.filter(pk=outdated.pk).update(
+            score=None, score_version="old"
+        )
+        self.assertEqual(ScoringService().rescore(), 1)
+
+        outdated.refresh_from_db()
+        self.assertEqual(outdated.score_version, SCORE_VERSION)
+        self.assertEqual(
+            outdated.score, ScoringService().calculate_business_score(outdated)
+        )
+
+
+class CohortRankingTests(TestCase):
+    def histogram(self):
+        return sorted(
+            CohortScoreBucket.objects.filter(count__gt=0).values_list(
+                "category", "city", "score_tenths", "count"
+            )
+        )
+
+    def test_percentile_and_median_from_buckets(self):
+        business = BusinessProfile(name="Luigi", category="Pizza", city="Springfield")
+        cohorts = CohortService()
+        buckets = [(300, 1), (500, 2), (700, 1)]
+
+        ranking = cohorts._ranking(business, 50.0, buckets)
+        self.assertEqual(ranking["cohort_size"], 4)
+        # One below, two tied: ties count half above and half below
+        self.assertEqual(ranking["percentile"], 50.0)
+        self.assertEqual(ranking["median_score"], 50.0)
+        self.assertEqual(cohorts._ranking(business, 70.0, buckets)["percentile"], 87.5)
+        # An even cohort's median falls between its two middle scores
+        self.assertEqual(cohorts._median([(300, 1), (600, 1)], 2), 45.0)
+
+    def test_saves_and_deletes_keep_the_histogram_in_step(self):
+        profiles = [
+            BusinessProfile.objects.create(
+                name=f"Pizza {n}",
+                category="Pizza",
+                city=" springfield ",
+                review_count=n * 30,
+            )
+            for n in range(3)
+        ]
+        cohorts = CohortService()
+        ranking = cohorts.get_ranking(profiles[0], profiles[0].score)
+        self.assertEqual(ranking["cohort_size"], 3)
+
+        profiles[1].review_count = 300
+        profiles[1].save()
+        profiles[2].delete()
+        maintained = self.histogram()
+        cohorts.rebuild()
+        self.assertEqual(maintained, self.histogram())
+        self.assertEqual(sum(row[-1] for row in maintained), 2)
+
+
+class PlaceNormalizerTests(TestCase):
+    def test_parses_extensions_and_address(self):
+        place = dict(
+            PLACE,
+            extensions=[
+                {"service_options": ["Takeout", "Dine-in"]},
+                {"amenities": ["Free Wi-Fi", "Parking lot"]},
+                {"offerings": ["Coffee", "Beer"]},
+                {"highlights": ["Great pizza"]},
+            ],
+        )
+        record = normalize_place(place)
+        self.assertTrue(record["offers_takeout"] and record["offers_dine_in"])
+        self.assertFalse(record["offers_delivery"])
+        self.assertTrue(record["has_wifi"] and record["has_parking"])
+        self.assertEqual(record["special_features"], ["Great pizza"])
+        self.assertTrue(record["has_menu"])  # "Coffee" is a menu keyword
+        self.assertEqual(record["cuisine_type"], "Restaurant")
+        self.assertEqual(
+            (record["city"], record["postal_code"], record["country"]),
+            ("Springfield", "62701", "United States"),
+        )
+
+    def test_empty_locality_leaves_address_fields_unset(self):
+        record = normalize_place(dict(PLACE, address="1 Main St, , United States"))
+        self.assertNotIn("city", record)
+        business = BusinessProfile(name="Luigi")
+        apply_record(business, record)
+        self.assertEqual(business.data_id, PLACE["data_id"])
+        self.assertEqual(business.review_count, PLACE["reviews"])
+
+
+class InsightsCacheTests(TestCase):
+    def setUp(self):
+        self.ai = AIService()
+        self.ai.cache = PersistentTTLCache(":memory:")
+        self.ai.client = mock.Mock()
+        self.business = BusinessFeatures.from_profile(
+            BusinessProfile(name="Luigi", category="Pizza"), 40
+        ).prompt_data()
+
+    def answer(self, content):
+        choice = mock.Mock(message=mock.Mock(content=content))
+        self.ai.client.chat.completions.create.return_value = mock.Mock(
+            choices=[choice], usage=None
+        )
+
+    def test_batch_reuses_a_single_analysis(self):
+        self.answer('{"summary": "Single", "suggestions": ["a"]}')
+        single = self.ai.generate_business_insights(self.business)
+        self.assertEqual(self.ai.generate_batch_insights([self.business]), [single])
+        self.assertEqual(self.ai.client.chat.completions.create.call_count, 1)
+
+    def test_single_analysis_reuses_a_batch_item(self):
+        self.answer('{"b1": {"summary": "Batched", "suggestions": ["a"]}}')
+        [batched] = self.ai.generate_batch_insights([self.business])
+        self.assertEqual(self.ai.generate_business_insights(self.business), batched)
+        self.assertEqual(self.ai.client.chat.completions.create.call_count, 1)
+
+
+LOCAL_RESULT = dict(
+    PLACE,
+    place_id="ChIJ1",
+    phone="555",
+    website="https://luigi.example",
+    operating_hours={"monday": "9 AM-5 PM"},
+    extensions=[],
+)
+
+
+class LocalResolutionTests(TestCase):
+    def search(self, local_result):
+        serpapi = SerpAPIService()
+        serpapi.cache = None
+        search = {"local_results": [local_result, {"title": "Other"}]}
+        with mock.patch.object(
+            serpapi, "_get_json", return_value=search
+        ), mock.patch.object(
+            serpapi, "get_place_details", return_value=dict(PLACE)
+        ) as details, track_usage() as usage:
+            place, others = serpapi.search_places("Luigi")
+        return place, others, details, usage
+
+    def test_complete_local_result_skips_place_details(self):
+        place, others, details, usage = self.search(LOCAL_RESULT)
+        details.assert_not_called()
+        self.assertTrue(place["from_local_result"])
+        self.assertEqual(place["hours"], [{"monday": "9 AM-5 PM"}])
+        self.assertEqual(others, [{"title": "Other"}])
+        self.assertEqual(usage.as_dict()["avoided"], {"place_details": 1})
+
+    def test_incomplete_local_result_fetches_place_details(self):
+        incomplete = {k: v for k, v in LOCAL_RESULT.items() if k != "phone"}
+        place, _, details, usage = self.search(incomplete)
+        details.assert_called_once_with("ChIJ1")
+        self.assertEqual(place, PLACE)
+        self.assertEqual(usage.as_dict()["avoided"], {})
+
+
+class FetchPlannerTests(TestCase):
+    def test_standard_plan_fetches_only_what_the_place_lacks(self):
+        planner = FetchPlanner("standard")
+        reviews = {"most_relevant": [{"rating": 5}] * 5}
+        images = [{"thumbnail": "https://images.example/1.jpg"}]
+
+        self.assertEqual(planner.plan(PLACE).calls, ("reviews", "photos"))
+        plan = planner.plan(dict(PLACE, user_reviews=reviews, images=images))
+        self.assertEqual((plan.calls, plan.skipped), ((), ("reviews", "photos")))
+        # Fewer reviews than the call returns suffice when that is all there are
+        few = dict(PLACE, reviews=2, user_reviews={"most_relevant": [{}, {}]})
+        self.assertEqual(planner.plan(few).calls, ("photos",))
+
+    def test_detail_levels_and_places_without_data_id(self):
+        planner = FetchPlanner("standard")
+        self.assertEqual(planner.plan(PLACE, "basic").calls, ())
+        self.assertEqual(planner.plan(PLACE, "full").calls, ("reviews", "photos"))
+        no_id = planner.plan(dict(PLACE, data_id=None))
+        self.assertEqual((no_id.calls, no_id.skipped), ((), ()))
+        self.assertEqual(FetchPlanner("bogus").detail, "standard")
+
+    def test_enrichment_makes_only_the_planned_calls(self):
+        service = stub_business_service()
+        serpapi = service.serpapi_service
+        serpapi.get_photos.return_value = [{"image": "x"}]
+        plan = FetchPlanner().plan(
+            dict(PLACE, user_reviews={"most_relevant": [{}] * 5})
+        )
+
+        self.assertEqual(service._fetch_enrichment(plan), ([], [{"image": "x"}]))
+        serpapi.get_reviews.assert_not_called()
+        serpapi.record_skipped_enrichment.assert_called_once_with(
+            "reviews", PLACE["data_id"], 5
+        )
+
+
+class CompetitorRankingTests(TestCase):
+    def test_places_missing_a_coordinate_rank_without_distance(self):
+        business = BusinessProfile(
+            name="Luigi", category="Pizza restaurant", latitude=1.0, longitude=2.0
+        )
+        candidates = [
+            {"title": "No longitude", "gps_coordinates": {"latitude": 1.0}},
+            {"title": "No coordinates", "type": "Pizza restaurant"},
+            dict(PLACE, title="Nearby", data_id="0x3:0x4"),
+        ]
+        ranked = CompetitorService(mock.Mock(), mock.Mock())._rank(business, candidates)
+        distances = {c["place"]["title"]: c["distance_km"] for c in ranked}
+        self.assertIsNone(distances["No longitude"])
+        self.assertIsNone(distances["No coordinates"])
+        self.assertEqual(distances["Nearby"], 0.0)
+
+
+class JobServiceTests(TransactionTestCase):
+    def setUp(self):
+        self.analysis = mock.Mock()
+        self.analysis.analyze_business.return_value = {"score": 1}
+        self.jobs = JobService(self.analysis, visibility_timeout=60)
+
+    def expire_lease(self, job):
+        AnalysisJob.objects.filter(pk=job.pk).update(
+            locked_until=timezone.now() - timedelta(seconds=1)
+        )
+
+    def test_claim_runs_and_records_a_job(self):
+        queued = self.jobs.enqueue_analysis("Luigi")
+        self.assertEqual(self.jobs.run_worker("w1", threading.Event(), once=True), 1)
+        job = AnalysisJob.objects.get(pk=queued.pk)
+        self.assertEqual(job.status, AnalysisJob.STATUS_SUCCEEDED)
+        self.assertEqual(job.result, {"score": 1})
+        self.assertEqual((job.attempts, job.locked_by), (1, ""))
+
+    def test_lapsed_claim_is_reclaimed_and_the_old_worker_discarded(self):
+        self.jobs.enqueue_analysis("Luigi")
+        first = self.jobs.claim("w1")
+        self.assertIsNone(self.jobs.claim("w2"))
+
+        self.expire_lease(first)
+        second = self.jobs.claim("w2")
+        self.assertEqual((second.pk, second.attempts), (first.pk, 2))
+        self.assertFalse(self.jobs.heartbeat(first))
+        self.assertTrue(self.jobs.heartbeat(second))
+
+        # The first worker finishing late must not overwrite the new claim
+        self.jobs._finish(first, status=AnalysisJob.STATUS_SUCCEEDED)
+        job = AnalysisJob.objects.get(pk=first.pk)
+        self.assertEqual(
+            (job.status, job.locked_by), (AnalysisJob.STATUS_RUNNING, "w2")
+        )
+
+    def test_lapsed_claim_out_of_attempts_fails(self):
+        queued = self.jobs.enqueue_analysis("Luigi")
+        AnalysisJob.objects.filter(pk=queued.pk).update(max_attempts=1)
+        self.expire_lease(self.jobs.claim("w1"))
+        self.assertIsNone(self.jobs.claim("w2"))
+        self.assertEqual(
+            AnalysisJob.objects.get(pk=queued.pk).status, AnalysisJob.STATUS_FAILED
+        )
+
+    def test_failed_job_is_requeued_with_backoff(self):
+        self.analysis.analyze_business.side_effect = RuntimeError("boom")
+        queued = self.jobs.enqueue_analysis("Luigi")
+        self.assertFalse(self.jobs.process(self.jobs.claim("w1")))
+        job = AnalysisJob.objects.get(pk=queued.pk)
+        self.assertEqual((job.status, job.error), (AnalysisJob.STATUS_QUEUED, "boom"))
+        self.assertGreater(job.available_at, timezone.now())
+
+    def test_worker_survives_an_error_recording_the_outcome(self):
+        self.analysis.analyze_business.side_effect = RuntimeError("boom")
+        self.jobs.enqueue_analysis("First")
+        self.jobs.enqueue_analysis("Second")
+        with mock.patch.object(
+            self.jobs, "_fail", side_effect=RuntimeError("database is locked")
+        ):
+            processed = self.jobs.run_worker("w1", threading.Event(), once=True)
+        self.assertEqual(processed, 2)
+
+
+class LookupFieldsMigrationTests(TransactionTestCase):
+    before = [("comparator", "0005_businessprofile_data_id")]
+    after = [("comparator", "0006_businessprofile_normalized_name_fetched_at")]
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_only_enriched_rows_are_marked_fetched(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.before)
+        old_apps = executor.loader.project_state(self.before).apps
+        Profile = old_apps.get_model("comparator", "BusinessProfile")
+        enriched = Profile.objects.create(
+            name="Luigi's Kitchen!", data_id="0x1", average_rating=4.5
+        )
+        never_fetched = Profile.objects.create(name="Placeholder", average_rating=0)
+
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(self.after)
+        new_apps = executor.loader.project_state(self.after).apps
+        Profile = new_apps.get_model("comparator", "BusinessProfile")
+
+        enriched = Profile.objects.get(pk=enriched.pk)
+        self.assertEqual(enriched.normalized_name, "luigis kitchen")
+        self.assertEqual(enriched.fetched_at, enriched.updated_at)
+        self.assertIsNone(Profile.objects.get(pk=never_fetched.pk).fetched_at)
@@ -7,4 +7,41 @@ urlpatterns = [
     # Core business analysis APIs
     path("analyze/", views.analyze_business, name="analyze_business"),
     path("compare/", views.compare_businesses, name="compare_businesses"),
+    path("competitors/", views.find_competitors, name="find_competitors"),
+    path(
+        "compare/multi/",
+        views.compare_businesses_multi,
+        name="compare_businesses_multi",
+    ),
+    path(
+        "analyze/batch/",
+        views.analyze_businesses_batch,
+        name="analyze_businesses_batch",
+    ),
+    # Server-Sent Events progress streams
+    path(
+        "analyze/stream/",
+        views.analyze_business_stream,
+        name="analyze_business_stream",
+    ),
+    path(
+        "compare/stream/",
+        views.compare_businesses_stream,
+        name="compare_businesses_stream",
+    ),
+    # Background jobs, processed by `manage.py run_jobs`
+    path("jobs/analyze/", views.submit_analysis_job, name="submit_analysis_job"),
+    path("jobs/compare/", views.submit_comparison_job, name="submit_comparison_job"),
+    path("jobs/<uuid:job_id>/", views.job_status, name="job_status"),
+    # Async variants of the core APIs, for ASGI deployments
+    path("async/analyze/", views.analyze_business_async, name="analyze_business_async"),
+    path(
+        "async/compare/",
+        views.compare_businesses_async,
+        name="compare_businesses_async",
+    ),
+    # Metric history
+    path("trends/", views.business_trends, name="business_trends"),
+    # Operational metrics
+    path("metrics/", views.service_metrics, name="service_metrics"),
 ]
@@ -1,8 +1,27 @@
+import json
+from datetime import datetime, time
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
 from rest_framework import status
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 
-from .services import BusinessAnalysisService
+from .services import get_services
+from .services.config import (
+    BATCH_MAX_ITEMS,
+    BATCH_MAX_WORKERS,
+    BATCH_DEFAULT_CONCURRENCY,
+    COMPARE_MAX_COMPETITORS,
+    COMPETITOR_MAX_LIMIT,
+    COMPETITOR_MAX_ENRICH,
+)
+
+MAX_TREND_BUSINESSES = 50
 
 
 @api_view(["POST"])
@@ -24,7 +43,7 @@ def analyze_business(request):
         )
 
     try:
-        service = BusinessAnalysisService()
+        service = get_services().analysis
         analysis = service.analyze_business(business_name, website)
         return Response(analysis, status=status.HTTP_200_OK)
     except Exception as e:
@@ -34,6 +53,51 @@ def analyze_business(request):
         )
 
 
+@api_view(["POST"])
+def analyze_businesses_batch(request):
+    """
+    Analyze many businesses, streaming results as NDJSON in completion order
+
+    POST /api/analyze/batch/
+    {
+        "business_names": ["My Restaurant", "My Other Restaurant"],
+        "concurrency": 4
+    }
+    """
+    business_names = request.data.get("business_names")
+    concurrency = request.data.get("concurrency", BATCH_DEFAULT_CONCURRENCY)
+
+    if (
+        not isinstance(business_names, list)
+        or not business_names
+        or not all(isinstance(name, str) and name.strip() for name in business_names)
+    ):
+        return Response(
+            {"error": "business_names must be a non-empty list of names"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    if len(business_names) > BATCH_MAX_ITEMS:
+        return Response(
+            {"error": f"at most {BATCH_MAX_ITEMS} businesses per batch"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    if (
+        isinstance(concurrency, bool)
+        or not isinstance(concurrency, int)
+        or concurrency < 1
+    ):
+        return Response(
+            {"error": "concurrency must be a positive integer"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    results = get_services().analysis.analyze_many(
+        business_names, concurrency=min(concurrency, BATCH_MAX_WORKERS)
+    )
+    lines = (json.dumps(result, cls=DjangoJSONEncoder) + "\n" for result in results)
+    return StreamingHttpResponse(lines, content_type="application/x-ndjson")
+
+
 @api_view(["POST"])
 def compare_businesses(request):
     """
@@ -57,13 +121,445 @@ def compare_businesses(request):
         )
 
     try:
-        service = BusinessAnalysisService()
+        service = get_services().analysis
         comparison = service.compare_businesses(
             your_business, your_website, competitor_business, competitor_website
         )
+        if comparison.get("errors"):
+            failed = ", ".join(comparison["errors"])
+            return Response(
+                {
+                    "error": f"Comparison incomplete: could not resolve {failed}",
+                    **comparison,
+                },
+                status=status.HTTP_502_BAD_GATEWAY,
+            )
+        return Response(comparison, status=status.HTTP_200_OK)
+    except Exception as e:
+        return Response(
+            {"error": f"Comparison failed: {str(e)}"},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+
+@api_view(["POST"])
+def compare_businesses_multi(request):
+    """
+    Compare your business with several competitors in one ranked matrix
+
+    POST /api/compare/multi/
+    {
+        "your_business": "My Restaurant",
+        "competitors": ["Luigi's Kitchen", {"name": "Pizza Place", "website": "..."}]
+    }
+    """
+    your_business = request.data.get("your_business")
+    your_website = request.data.get("your_website")
+    competitors = request.data.get("competitors")
+
+    if not your_business:
+        return Response(
+            {"error": "your_business is required"}, status=status.HTTP_400_BAD_REQUEST
+        )
+    parsed = _parse_competitors(competitors)
+    if parsed is None:
+        return Response(
+            {
+                "error": "competitors must be a non-empty list of names or "
+                '{"name": ..., "website": ...} objects'
+            },
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    if len(parsed) > COMPARE_MAX_COMPETITORS:
+        return Response(
+            {"error": f"at most {COMPARE_MAX_COMPETITORS} competitors per comparison"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    try:
+        comparison = get_services().analysis.compare_many(
+            your_business, your_website, parsed
+        )
+        if comparison["comparison"] is None:
+            failed = ", ".join(comparison.get("errors", {})) or "any competitor"
+            return Response(
+                {
+                    "error": f"Comparison incomplete: could not resolve {failed}",
+                    **comparison,
+                },
+                status=status.HTTP_502_BAD_GATEWAY,
+            )
         return Response(comparison, status=status.HTTP_200_OK)
     except Exception as e:
         return Response(
             {"error": f"Comparison failed: {str(e)}"},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR,
         )
+
+
+@api_view(["POST"])
+def find_competitors(request):
+    """
+    Find likely competitors among the places found near a business
+
+    POST /api/competitors/
+    {
+        "business_name": "My Restaurant",
+        "limit": 5,
+        "enrich": 2
+    }
+    """
+    business_name = request.data.get("business_name")
+    location = request.data.get("location")
+    limit = request.data.get("limit", 5)
+    enrich = request.data.get("enrich", 0)
+
+    if not business_name:
+        return Response(
+            {"error": "business_name is required"}, status=status.HTTP_400_BAD_REQUEST
+        )
+    if (
+        isinstance(limit, bool)
+        or not isinstance(limit, int)
+        or not 1 <= limit <= COMPETITOR_MAX_LIMIT
+    ):
+        return Response(
+            {"error": f"limit must be an integer from 1 to {COMPETITOR_MAX_LIMIT}"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    if (
+        isinstance(enrich, bool)
+        or not isinstance(enrich, int)
+        or not 0 <= enrich <= COMPETITOR_MAX_ENRICH
+    ):
+        return Response(
+            {"error": f"enrich must be an integer from 0 to {COMPETITOR_MAX_ENRICH}"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    try:
+        competitors = get_services().analysis.find_competitors(
+            business_name, location=location, limit=limit, enrich=min(enrich, limit)
+        )
+        return Response(competitors, status=status.HTTP_200_OK)
+    except Exception as e:
+        return Response(
+            {"error": f"Competitor search failed: {str(e)}"},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+
+def _parse_competitors(competitors):
+    """[(name, website)] from a list of names or name/website objects, else None"""
+    if not isinstance(competitors, list) or not competitors:
+        return None
+    parsed = []
+    for competitor in competitors:
+        if isinstance(competitor, dict):
+            name, website = competitor.get("name"), competitor.get("website")
+        else:
+            name, website = competitor, None
+        if not isinstance(name, str) or not name.strip():
+            return None
+        parsed.append((name, website))
+    return parsed
+
+
+@require_GET
+def analyze_business_stream(request):
+    """
+    Analyze a business, streaming progress as Server-Sent Events
+
+    GET /api/analyze/stream/?business_name=My%20Restaurant
+
+    Emits business_resolved, profile_enriched, score_computed, insights_ready
+    and complete (the same payload as POST /api/analyze/), or error.
+    """
+    business_name = request.GET.get("business_name")
+    website = request.GET.get("website")
+
+    if not business_name:
+        return JsonResponse({"error": "business_name is required"}, status=400)
+
+    stages = get_services().analysis.iter_analysis_stages(business_name, website)
+    return _event_stream(stages, "Analysis failed")
+
+
+@require_GET
+def compare_businesses_stream(request):
+    """
+    Compare your business with a competitor, streaming progress as
+    Server-Sent Events
+
+    GET /api/compare/stream/?your_business=My%20Restaurant&competitor_business=Rival
+
+    Per-side stages carry a "side" key; complete carries the same payload as
+    POST /api/compare/.
+    """
+    your_business = request.GET.get("your_business")
+    your_website = request.GET.get("your_website")
+    competitor_business = request.GET.get("competitor_business")
+    competitor_website = request.GET.get("competitor_website")
+
+    if not your_business or not competitor_business:
+        return JsonResponse(
+            {"error": "your_business and competitor_business are required"},
+            status=400,
+        )
+
+    stages = get_services().analysis.iter_comparison_stages(
+        your_business, your_website, competitor_business, competitor_website
+    )
+    return _event_stream(stages, "Comparison failed")
+
+
+def _event_stream(stages, error_prefix: str) -> StreamingHttpResponse:
+    """Wrap a (stage, payload) iterator in a text/event-stream response"""
+
+    def events():
+        try:
+            for stage, payload in stages:
+                yield _sse_event(stage, payload)
+        except Exception as e:
+            yield _sse_event("error", {"error": f"{error_prefix}: {str(e)}"})
+
+    response = StreamingHttpResponse(events(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    # Stop nginx from buffering the stream
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+def _sse_event(event: str, payload) -> str:
+    data = json.dumps(payload, cls=DjangoJSONEncoder)
+    return f"event: {event}\ndata: {data}\n\n"
+
+
+@api_view(["POST"])
+def submit_analysis_job(request):
+    """
+    Queue a business analysis for the background worker
+
+    POST /api/jobs/analyze/
+    {
+        "business_name": "My Restaurant",
+    }
+    """
+    business_name = request.data.get("business_name")
+    website = request.data.get("website")
+
+    if not business_name:
+        return Response(
+            {"error": "business_name is required"}, status=status.HTTP_400_BAD_REQUEST
+        )
+
+    jobs = get_services().jobs
+    job = jobs.enqueue_analysis(business_name, website)
+    return Response(jobs.format_job(job), status=status.HTTP_202_ACCEPTED)
+
+
+@api_view(["POST"])
+def submit_comparison_job(request):
+    """
+    Queue a business comparison for the background worker
+
+    POST /api/jobs/compare/
+    {
+        "your_business": "My Restaurant",
+        "competitor_business": "Competitor Restaurant",
+    }
+    """
+    your_business = request.data.get("your_business")
+    your_website = request.data.get("your_website")
+    competitor_business = request.data.get("competitor_business")
+    competitor_website = request.data.get("competitor_website")
+
+    if not your_business or not competitor_business:
+        return Response(
+            {"error": "your_business and competitor_business are required"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    jobs = get_services().jobs
+    job = jobs.enqueue_comparison(
+        your_business, your_website, competitor_business, competitor_website
+    )
+    return Response(jobs.format_job(job), status=status.HTTP_202_ACCEPTED)
+
+
+@api_view(["GET"])
+def job_status(request, job_id):
+    """
+    Poll a queued job; once succeeded, "result" holds the same payload the
+    synchronous endpoint returns
+
+    GET /api/jobs/<job_id>/
+    """
+    jobs = get_services().jobs
+    job = jobs.get_job(job_id)
+    if job is None:
+        return Response({"error": "job not found"}, status=status.HTTP_404_NOT_FOUND)
+    return Response(jobs.format_job(job), status=status.HTTP_200_OK)
+
+
+@api_view(["GET"])
+def business_trends(request):
+    """
+    Downsampled metric history for one or more businesses
+
+    GET /api/trends/?business_id=1&business_id=2&bucket=week&since=2025-01-01
+    """
+    try:
+        business_ids = [int(value) for value in request.GET.getlist("business_id")]
+    except ValueError:
+        return Response(
+            {"error": "business_id must be an integer"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    if not business_ids:
+        return Response(
+            {"error": "at least one business_id is required"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    if len(business_ids) > MAX_TREND_BUSINESSES:
+        return Response(
+            {"error": f"at most {MAX_TREND_BUSINESSES} business_id values allowed"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    bounds = {}
+    for name in ("since", "until"):
+        value = request.GET.get(name)
+        if value:
+            parsed = _parse_bound(value)
+            if parsed is None:
+                return Response(
+                    {"error": f"{name} must be an ISO date or datetime"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            bounds[name] = parsed
+
+    bucket = request.GET.get("bucket", "day")
+    try:
+        series = get_services().snapshots.trend_series(
+            business_ids, bucket=bucket, **bounds
+        )
+    except ValueError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    return Response({"bucket": bucket, "series": series}, status=status.HTTP_200_OK)
+
+
+def _parse_bound(value):
+    """Parse an ISO date or datetime; naive values use the current timezone"""
+    try:
+        parsed = parse_datetime(value)
+        if parsed is None:
+            day = parse_date(value)
+            parsed = datetime.combine(day, time.min) if day else None
+    except ValueError:
+        return None
+    if parsed is not None and timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+@api_view(["GET"])
+def service_metrics(request):
+    """
+    Report process-level metrics for outbound integrations
+
+    GET /api/metrics/
+    """
+    services = get_services()
+    return Response(
+        {
+            "serpapi": services.serpapi.get_metrics(),
+            "ai": services.ai.get_metrics(),
+        },
+        status=status.HTTP_200_OK,
+    )
+
+
+def _json_body(request):
+    """Decode a JSON request body for the plain async views; None if invalid"""
+    try:
+        data = json.loads(request.body or b"{}")
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+@csrf_exempt
+@require_POST
+async def analyze_business_async(request):
+    """
+    Async variant of analyze_business for ASGI deployments
+
+    POST /api/async/analyze/
+    {
+        "business_name": "My Restaurant",
+    }
+    """
+    data = _json_body(request)
+    if data is None:
+        return JsonResponse({"error": "Request body must be a JSON object"}, status=400)
+
+    business_name = data.get("business_name")
+    website = data.get("website")
+
+    if not business_name:
+        return JsonResponse({"error": "business_name is required"}, status=400)
+
+    try:
+        analysis = await get_services().analysis.aanalyze_business(
+            business_name, website
+        )
+        return JsonResponse(analysis, status=200)
+    except Exception as e:
+        return JsonResponse({"error": f"Analysis failed: {str(e)}"}, status=500)
+
+
+@csrf_exempt
+@require_POST
+async def compare_businesses_async(request):
+    """
+    Async variant of compare_businesses for ASGI deployments
+
+    POST /api/async/compare/
+    {
+        "your_business": "My Restaurant",
+        "competitor_business": "Competitor Restaurant",
+    }
+    """
+    data = _json_body(request)
+    if data is None:
+        return JsonResponse({"error": "Request body must be a JSON object"}, status=400)
+
+    your_business = data.get("your_business")
+    your_website = data.get("your_website")
+    competitor_business = data.get("competitor_business")
+    competitor_website = data.get("competitor_website")
+
+    if not your_business or not competitor_business:
+        return JsonResponse(
+            {"error": "your_business and competitor_business are required"},
+            status=400,
+        )
+
+    try:
+        comparison = await get_services().analysis.acompare_businesses(
+            your_business, your_website, competitor_business, competitor_website
+        )
+        if comparison.get("errors"):
+            failed = ", ".join(comparison["errors"])
+            return JsonResponse(
+                {
+                    "error": f"Comparison incomplete: could not resolve {failed}",
+                    **comparison,
+                },
+                status=502,
+            )
+        return JsonResponse(comparison, status=200)
+    except Exception as e:
+        return JsonResponse({"error": f"Comparison failed: {str(e)}"}, status=500)
@@ -58,6 +58,7 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "comparator.middleware.SerpAPIUsageMiddleware",
 ]
 
 ROOT_URLCONF = "competitor_insights.urls"
@@ -159,6 +160,9 @@ CORS_ALLOW_HEADERS = [
     "x-requested-with",
 ]
 
+# Let the frontend read the per-request SerpAPI credit report
+CORS_EXPOSE_HEADERS = ["X-SerpAPI-Usage"]
+
 # REST Framework settings
 REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": [